@@ -8,136 +8,125 @@
 
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta, time
+from datetime import date, datetime, timedelta, time
 import asyncio
-import json
-import pytz
+import atexit
 import os
-import re
 import logging
 import sys
 import signal
-import shutil
-from typing import Dict, Tuple, Optional
+import threading
+import time as _time
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 import io
+import multiprocessing
+import shutil
+import tempfile
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import psutil
 from dotenv import load_dotenv
 
+from availability_index import AvailabilityIndex
+from availability_parser import AvailabilityParser
+from backup import BackupError, BackupStore, describe as describe_backup, parse_retention
+from ledger import PollLedger
+from logpipe import parse_sample_rates, setup_logging
+from metrics import Metrics, start_http_server
+from model import AvailabilityModel
+from names import NameCache
+from outbound import ACK, POLL, Outbound
+from calendar_export import IcsBuilder, VEventCache, spool_chunks
+from coalesce import ReactionCoalescer
+from eventtrace import TraceRecorder
+from games import GameRegistry
+from startup import InstanceLock, StartupTimer
+from scheduler import DEFAULT_SCHEDULE, PollSchedule, PollScheduler, poll_week
+from reports import (PoolBusy, ReportPool, RenderedSummary, SummaryCache, fmt_12h as _fmt_12h,
+                     fmt_minutes_12h as _fmt_minutes_12h, render_summary, render_summary_pages)
+from storage import open_backend, import_json_to_sqlite, set_write_observer
+from tzconvert import is_valid_tz, validate_timezone, week_converter
+
+if TYPE_CHECKING:
+    from overlap import OverlapEngine  # imported on first !besttime (NumPy is slow to import)
+
 load_dotenv()  # Loads DISCORD_TOKEN from /home/opc/.env
 
 # -----------------------
 # CONFIG
 # -----------------------
-GAMES = {
+# Seeds games.json on first start; afterwards games are managed with `!game`
+DEFAULT_GAMES = {
     'BF6': {'channel': 1426994243398008872, 'poll_msg': 'BF6 Weekly Availability'},
     'ARC': {'channel': 1429276090807091230, 'poll_msg': 'ARC RAIDERS Weekly Availability'}
 }
-DEFAULT_GAME = 'BF6'
+DEFAULT_GAME = 'BF6'  # legacy single-game data is migrated under this key
+GAMES_FILE = 'games.json'
 TZ_FILE = 'user_tzs.json'
 AVAIL_FILE = 'availability.json'
-BACKUP_DIR = '/home/opc/backup'
+BACKUP_DIR = os.getenv('AVAIL_BACKUP_DIR', '/home/opc/backup')
+BACKUP_RETENTION = parse_retention(os.getenv('AVAIL_BACKUP_RETENTION', '24,14,8'))  # hourly,daily,weekly
+LOG_FILE = os.getenv('AVAIL_LOG_FILE', '/home/opc/availabilitybot.log')
+LOG_MAX_MB = float(os.getenv('AVAIL_LOG_MAX_MB', '10'))             # rotate (gzip) the JSON log at this size…
+LOG_ROTATE_HOURS = float(os.getenv('AVAIL_LOG_ROTATE_HOURS', '24'))  # …or at this boundary (24 = UTC midnight)
+LOG_BACKUPS = int(os.getenv('AVAIL_LOG_BACKUPS', '14'))             # rotated log files kept
+LOG_SAMPLE = parse_sample_rates(os.getenv('AVAIL_LOG_SAMPLE', 'clear=5'))  # info lines/sec per chatty category
 PROCESSED_LIMIT = 2000
 DEFAULT_REACTION_START = time(18, 0)
 DEFAULT_REACTION_END = time(23, 0)
 DEFAULT_TZ = 'UTC'
 SAVE_AFTER_CHANGE = True
+SAVE_MAX_DELAY = float(os.getenv('AVAIL_SAVE_MAX_DELAY', '2.0'))  # seconds a change may sit unwritten
+DURABILITY_MODE = os.getenv('AVAIL_DURABILITY', 'batch')           # always | batch | lazy (see storage.py)
+STORAGE_BACKEND = os.getenv('AVAIL_BACKEND', 'json')                # json | sqlite
+COMPACT_EVERY = int(os.getenv('AVAIL_COMPACT_EVERY', '5000'))        # json: journal records per snapshot
+SQLITE_FILE = 'availability.db'
+LEDGER_FILE = 'poll_ledger.json'
+LOCK_FILE = 'availabilitybot.pid'                                   # flock'd single-instance guard (holds our PID)
+LOCK_WAIT = float(os.getenv('AVAIL_LOCK_WAIT', '5'))                # seconds a restart waits for the old process to exit
+METRICS_PORT = int(os.getenv('AVAIL_METRICS_PORT', '9108'))  # Prometheus text on 127.0.0.1; 0 disables
+OUTBOUND_WORKERS = int(os.getenv('AVAIL_OUTBOUND_WORKERS', '4'))     # concurrent outbound Discord calls (DMs, reactions, posts)
+REACTION_WINDOW = float(os.getenv('AVAIL_REACTION_WINDOW', '3.0'))  # quiet seconds before a burst of poll reactions is applied
+REPORT_POOL = os.getenv('AVAIL_REPORT_POOL', 'process')              # process | thread: where !summary renders
+REPORT_WORKERS = int(os.getenv('AVAIL_REPORT_WORKERS', '2'))         # concurrent summary/calendar jobs per pool
+REPORT_TIMEOUT = float(os.getenv('AVAIL_REPORT_TIMEOUT', '30'))      # seconds before a report job is reported as timed out
+SUMMARY_CACHE_SIZE = int(os.getenv('AVAIL_SUMMARY_CACHE', '64'))     # rendered summaries kept (game × tz × server)
+POLL_SCHEDULE = os.getenv('AVAIL_POLL_SCHEDULE', DEFAULT_SCHEDULE)  # weekly poll deadline (UTC) for games without their own
+POLL_CATCHUP_HOURS = float(os.getenv('AVAIL_POLL_CATCHUP_HOURS', '48'))  # after downtime, still post polls missed by up to this
+BACKFILL_CONCURRENCY = int(os.getenv('AVAIL_BACKFILL_CONCURRENCY', '4'))  # Discord reads in flight while catching up on ready
+BACKFILL_BATCH = 100                                           # poll replies ingested between yields to the event loop
+MESSAGE_CACHE = int(os.getenv('AVAIL_MESSAGE_CACHE', '100'))       # discord.py message cache; reactions don't need it, 0 disables
+LEAN_MEMORY = os.getenv('AVAIL_LEAN_MEMORY', '1') == '1'         # no member chunking/cache; names come from NameCache
+NAME_CACHE_SIZE = int(os.getenv('AVAIL_NAME_CACHE', '10000'))       # min display names kept in lean mode (grows to fit every stored user)
+NAME_CACHE_TTL = float(os.getenv('AVAIL_NAME_TTL', '86400'))        # seconds before a cached display name is looked up again
+TRACE_FILE = os.getenv('AVAIL_TRACE_FILE')                         # record handled events for benchmarks/replay.py (gzip JSON lines)
+LOOP_LAG_INTERVAL = 0.5                                        # seconds between event-loop lag probes
 REACTIONS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣']
 
-# -----------------------
-# GLOBAL TIMEZONE SHORTCUTS (100+)
-# -----------------------
-TZ_SHORTCUTS = {
-    'PH': 'Asia/Manila', 'PHK': 'Asia/Manila', 'PHT': 'Asia/Manila',
-    'JP': 'Asia/Tokyo', 'JST': 'Asia/Tokyo',
-    'KR': 'Asia/Seoul', 'KST': 'Asia/Seoul',
-    'CN': 'Asia/Shanghai', 'CST': 'Asia/Shanghai',
-    'HK': 'Asia/Hong_Kong', 'HKT': 'Asia/Hong_Kong',
-    'SG': 'Asia/Singapore', 'SGT': 'Asia/Singapore',
-    'MY': 'Asia/Kuala_Lumpur', 'MYT': 'Asia/Kuala_Lumpur',
-    'ID': 'Asia/Jakarta', 'WIB': 'Asia/Jakarta',
-    'TH': 'Asia/Bangkok', 'ICT': 'Asia/Bangkok',
-    'VN': 'Asia/Ho_Chi_Minh',
-    'IN': 'Asia/Kolkata', 'IST': 'Asia/Kolkata',
-    'PK': 'Asia/Karachi', 'PKT': 'Asia/Karachi',
-    'BD': 'Asia/Dhaka', 'BDT': 'Asia/Dhaka',
-    'LK': 'Asia/Colombo',
-    'NP': 'Asia/Kathmandu',
-    'AF': 'Asia/Kabul',
-    'AE': 'Asia/Dubai', 'GST': 'Asia/Dubai',
-    'IR': 'Asia/Tehran', 'IRST': 'Asia/Tehran',
-    'RU': 'Europe/Moscow', 'MSK': 'Europe/Moscow',
-    'KZ': 'Asia/Almaty',
-    'GB': 'Europe/London', 'GMT': 'Europe/London', 'BST': 'Europe/London',
-    'FR': 'Europe/Paris', 'CET': 'Europe/Paris', 'CEST': 'Europe/Paris',
-    'DE': 'Europe/Berlin',
-    'IT': 'Europe/Rome',
-    'ES': 'Europe/Madrid',
-    'NL': 'Europe/Amsterdam',
-    'SE': 'Europe/Stockholm',
-    'NO': 'Europe/Oslo',
-    'DK': 'Europe/Copenhagen',
-    'FI': 'Europe/Helsinki',
-    'PL': 'Europe/Warsaw',
-    'GR': 'Europe/Athens', 'EET': 'Europe/Athens',
-    'TR': 'Europe/Istanbul',
-    'UA': 'Europe/Kiev',
-    'RO': 'Europe/Bucharest',
-    'US': 'America/New_York', 'EST': 'America/New_York', 'EDT': 'America/New_York',
-    'US/PACIFIC': 'America/Los_Angeles', 'PST': 'America/Los_Angeles', 'PDT': 'America/Los_Angeles',
-    'US/CENTRAL': 'America/Chicago', 'CDT': 'America/Chicago',
-    'US/MOUNTAIN': 'America/Denver', 'MST': 'America/Denver', 'MDT': 'America/Denver',
-    'CA': 'America/Toronto',
-    'MX': 'America/Mexico_City',
-    'BR': 'America/Sao_Paulo', 'BRT': 'America/Sao_Paulo',
-    'AR': 'America/Argentina/Buenos_Aires',
-    'CL': 'America/Santiago',
-    'CO': 'America/Bogota',
-    'PE': 'America/Lima',
-    'VE': 'America/Caracas',
-    'AU': 'Australia/Sydney', 'AEST': 'Australia/Sydney', 'AEDT': 'Australia/Sydney',
-    'NZ': 'Pacific/Auckland', 'NZST': 'Pacific/Auckland',
-    'FJ': 'Pacific/Fiji',
-    'ZA': 'Africa/Johannesburg', 'SAST': 'Africa/Johannesburg',
-    'EG': 'Africa/Cairo',
-    'NG': 'Africa/Lagos', 'WAT': 'Africa/Lagos',
-    'MA': 'Africa/Casablanca',
-    'KE': 'Africa/Nairobi', 'EAT': 'Africa/Nairobi',
-    'UTC': 'UTC', 'ZULU': 'UTC', 'GMT+0': 'UTC', 'GMT-0': 'UTC',
-}
-
 # -----------------------
 # Logging
 # -----------------------
-logging.basicConfig(
-    filename="/home/opc/availabilitybot.log",
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-)
+# Handlers only enqueue records; a listener thread (started once the report workers are
+# forked) writes JSON lines to LOG_FILE and plain text to the console
+log_pipeline = setup_logging(LOG_FILE, max_bytes=int(LOG_MAX_MB * 2**20), interval=LOG_ROTATE_HOURS * 3600,
+                             backups=LOG_BACKUPS, sample_rates=LOG_SAMPLE)
+atexit.register(log_pipeline.stop)
 logger = logging.getLogger('availability_bot')
-handler = logging.StreamHandler()
-handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
-logger.addHandler(handler)
+# Phases are timed from process start, so "import" includes interpreter startup
+startup = StartupTimer(psutil.Process().create_time())
+startup.begin('import', startup.origin)
 
 # -----------------------
 # Prevent Duplicate Instances
 # -----------------------
 def prevent_duplicate_instance():
-    current_pid = os.getpid()
-    script_name = os.path.basename(__file__)
-    try:
-        for proc in psutil.process_iter(['pid', 'cmdline', 'cwd']):
-            pid = proc.info.get('pid')
-            if not pid or pid == current_pid:
-                continue
-            cmdline = proc.info.get('cmdline') or []
-            if script_name in " ".join(cmdline):
-                cwd = proc.info.get('cwd')
-                if cwd and os.path.abspath(cwd) == os.path.abspath(os.getcwd()):
-                    logger.warning(f"Another instance running (PID {pid}). Exiting.")
-                    sys.exit(1)
-    except Exception as e:
-        logger.debug(f"Duplicate check failed: {e}")
+    # Only processes started in this working directory share the lock file. Report workers
+    # forked below inherit the lock, so it is held until they have exited as well.
+    if not instance_lock.acquire(wait=LOCK_WAIT):
+        logger.warning(f"Another instance running (PID {instance_lock.owner()}). Exiting.")
+        sys.exit(1)
+
+instance_lock = InstanceLock(LOCK_FILE)
 prevent_duplicate_instance()
 
 # -----------------------
@@ -145,86 +134,212 @@ prevent_duplicate_instance()
 # -----------------------
 intents = discord.Intents.default()
 intents.message_content = True
-intents.members = True
+# Lean mode skips chunking every member of every guild at startup; reports resolve the
+# few names they need through name_cache instead
+intents.members = not LEAN_MEMORY
 intents.reactions = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Waits longer than 30s (the minimum allowed) surface as RateLimited so the outbound queue can back off
+bot = commands.Bot(command_prefix='!', intents=intents, max_ratelimit_timeout=30.0,
+                   max_messages=MESSAGE_CACHE or None,
+                   member_cache_flags=discord.MemberCacheFlags.none() if LEAN_MEMORY
+                   else discord.MemberCacheFlags.from_intents(intents),
+                   chunk_guilds_at_startup=not LEAN_MEMORY)
+name_cache = NameCache(NAME_CACHE_SIZE, NAME_CACHE_TTL)
+outbound = Outbound(workers=OUTBOUND_WORKERS, create_dm=bot.create_dm)
+# !summary is pure CPU on a small snapshot, so it gets its own processes. They are forked
+# right here, while this is still the only thread (no flusher/metrics/outbound locks to copy);
+# spawn would re-run this whole script in every worker. Calendar exports share the VEVENT
+# cache, so they use threads.
+if REPORT_POOL == 'process' and 'fork' in multiprocessing.get_all_start_methods():
+    _summary_executor = ProcessPoolExecutor(REPORT_WORKERS, mp_context=multiprocessing.get_context('fork'))
+    _summary_executor.submit(int).result()
+else:
+    _summary_executor = ThreadPoolExecutor(REPORT_WORKERS, thread_name_prefix='summary')
+log_pipeline.start()
+summary_pool = ReportPool('summary', _summary_executor, REPORT_WORKERS, timeout=REPORT_TIMEOUT)
+export_pool = ReportPool('export', ThreadPoolExecutor(REPORT_WORKERS, thread_name_prefix='export'),
+                         REPORT_WORKERS, timeout=REPORT_TIMEOUT)
+metrics = Metrics()
+set_write_observer(metrics.observe_write)
+
+GAMES = GameRegistry(GAMES_FILE, DEFAULT_GAMES)
+GAMES.load()
 
 boot_time = datetime.utcnow()
 current_polls: Dict[str, Optional[int]] = {game: None for game in GAMES}
 processed_messages = deque(maxlen=PROCESSED_LIMIT)
 bot_ready_once = False
-last_poll_run: Dict[str, Optional[datetime]] = {game: None for game in GAMES}
+event_trace: Optional[TraceRecorder] = None
 
 # -----------------------
-# JSON & Backup
+# Storage & Backup
 # -----------------------
-def load_json_file(fname: str) -> dict:
-    if os.path.exists(fname):
-        try:
-            with open(fname, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.warning(f"Failed to load {fname}: {e}")
-            shutil.copy(fname, f"{fname}.broken_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}")
-    return {}
+def open_storage():
+    backend = open_backend(STORAGE_BACKEND, AVAIL_FILE, TZ_FILE, SQLITE_FILE,
+                           max_delay=SAVE_MAX_DELAY, durability=DURABILITY_MODE,
+                           compact_every=COMPACT_EVERY, processed_limit=PROCESSED_LIMIT)
+    if backend.name == 'sqlite' and backend.is_empty() and os.path.exists(AVAIL_FILE):
+        entries, tz_count = import_json_to_sqlite(backend, AVAIL_FILE, TZ_FILE, GAMES.all_keys(), DEFAULT_GAME)
+        logger.info(f"Imported {entries} entries and {tz_count} timezones from JSON into {SQLITE_FILE}")
+    return backend
 
-def save_json_file(fname: str, obj: dict):
-    tmp = f"{fname}.tmp"
+def backup_files() -> Optional[dict]:
+    """Snapshot the data into the backup store and apply retention. Blocking: run off the loop."""
     try:
-        with open(tmp, 'w', encoding='utf-8') as f:
-            json.dump(obj, f, indent=2)
-            f.flush()
-            os.fsync(f.fileno())
-        os.replace(tmp, fname)
-    except Exception as e:
-        logger.error(f"Failed to save {fname}: {e}")
-        if os.path.exists(tmp):
-            os.remove(tmp)
-
-def backup_files():
-    os.makedirs(BACKUP_DIR, exist_ok=True)
-    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-    try:
-        if os.path.exists(TZ_FILE):
-            shutil.copy(TZ_FILE, f"{BACKUP_DIR}/user_tzs_{timestamp}.json")
-        if os.path.exists(AVAIL_FILE):
-            shutil.copy(AVAIL_FILE, f"{BACKUP_DIR}/availability_{timestamp}.json")
-        logger.info(f"Backup created: {timestamp}")
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=BACKUP_DIR) as work:
+            manifest = backup_store.create(storage.snapshot_files(work))
+        removed, dropped = backup_store.prune()
+        if manifest:
+            logger.info(f"Backup created: {manifest['id']} ({manifest['new_objects']} new objects)")
+        else:
+            logger.info("Backup skipped: nothing changed since the latest one")
+        if removed or dropped:
+            logger.info(f"Backup retention removed {removed} snapshots and {dropped} objects")
+        return manifest
     except Exception as e:
         logger.error(f"Backup failed: {e}")
+        return None
+
+def restore_data(files: Dict[str, str]) -> Tuple[AvailabilityModel, dict, AvailabilityIndex]:
+    """Put a backup's files in place and load them with a fresh index. Blocking: run off the loop."""
+    avail, tzs = storage.restore_files(files)
+    index = AvailabilityIndex()
+    index.rebuild(avail)
+    return avail, tzs, index
+
+def reload_data(avail: AvailabilityModel, tzs: dict, index: AvailabilityIndex):
+    """Point the working set at freshly loaded data (after a restore). Runs on the loop: only swaps."""
+    global availability, user_tzs, avail_index, ics_cache
+    with storage_lock:
+        availability = avail
+        user_tzs = tzs
+        avail_index = index
+        overlap_engines.clear()
+        overlap_builds.clear()
+        ics_cache = VEventCache()
+        summary_cache.bump()
 
 def migrate_data():
-    global avail_data_json
-    if not avail_data_json:
-        return
-    needs_migration = any(
-        not isinstance(user_data, dict) or
-        not any(game in user_data for game in GAMES)
-        for user_data in avail_data_json.values()
-    )
-    if not needs_migration:
+    """Move legacy single-game records ({user: {day: [...]}}) under DEFAULT_GAME."""
+    legacy = availability.legacy_users(GAMES.all_keys())
+    if not legacy:
         return
-    new_data = {}
-    for user_id, user_data in avail_data_json.items():
-        if isinstance(user_data, dict) and any(game in user_data for game in GAMES):
-            new_data[user_id] = user_data
-        else:
-            new_data[user_id] = {DEFAULT_GAME: user_data}
-    avail_data_json = new_data
-    save_json_file(AVAIL_FILE, avail_data_json)
-    logger.info("Data migrated to multi-game structure.")
+    with storage_lock:
+        for user_id in legacy:
+            availability.replace_user(user_id, {DEFAULT_GAME: availability.user_json(user_id)})
+        storage.replace_availability(availability)
+        avail_index.rebuild(availability)
+    summary_cache.bump()
+    for engine in overlap_engines.values():
+        engine.rebuild(availability.user_ids())
+    logger.info(f"Data migrated to multi-game structure ({len(legacy)} users).")
+
+def _overlap_entries(user_id: str) -> dict:
+    """A user's entries per game as (day, start_min, end_min, tz) for the overlap engine."""
+    fallback = user_tzs.get(user_id, DEFAULT_TZ)
+    return {game: [(d, st, et, tz or fallback) for d, st, et, tz in availability.week(user_id, game)]
+            for game in availability.games(user_id)}
 
-user_tzs = load_json_file(TZ_FILE)
-avail_data_json = load_json_file(AVAIL_FILE)
-migrate_data()
+def _overlap_entries_locked(user_id: str) -> dict:
+    # The worker-thread build takes the lock per user, so handlers wait at most one user's read
+    with storage_lock:
+        return _overlap_entries(user_id)
+
+async def get_overlap_engine(monday: date) -> 'OverlapEngine':
+    """
+    Overlap bitmaps for the poll week starting ``monday``. A new week's engine
+    is built on a worker thread (about 0.5 s at 50k users) and swapped in when
+    ready; users edited meanwhile are refreshed right after the swap. Engines
+    are kept for the weeks games are collecting now (games on different
+    schedules can be a week apart).
+    """
+    while monday not in overlap_engines:
+        build = overlap_builds.get(monday)
+        if build is None:
+            from overlap import OverlapEngine
+            engine = OverlapEngine(monday, _overlap_entries_locked)
+            with storage_lock:
+                user_ids = list(availability.user_ids())
+            build = overlap_builds[monday] = (
+                engine, asyncio.ensure_future(asyncio.to_thread(engine.rebuild, user_ids)), set())
+        engine, task, edited = build
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            if overlap_builds.get(monday) is build:
+                del overlap_builds[monday]
+            raise
+        if overlap_builds.get(monday) is build:
+            # A restore during the build discards it (overlap_builds cleared), and we go round again
+            del overlap_builds[monday]
+            current = {game_week(game) for game in GAMES}
+            for stale in [m for m in overlap_engines if m not in current]:
+                del overlap_engines[stale]
+            overlap_engines[monday] = engine
+            for user_id in edited:
+                engine.mark_dirty(user_id)
+    engine = overlap_engines[monday]
+    with storage_lock:
+        engine.refresh()
+    return engine
+
+def _mark_overlap_dirty(user_id: str):
+    for engine in overlap_engines.values():
+        engine.mark_dirty(user_id)
+    for build in overlap_builds.values():
+        build[2].add(user_id)
+
+def check_index_consistency():
+    """Rebuild the game/day index from primary data if it has drifted."""
+    with storage_lock:
+        problems = avail_index.verify(availability)
+        if problems:
+            logger.warning(f"Availability index drifted ({len(problems)} slots): {problems[:5]}; rebuilding")
+            avail_index.rebuild(availability)
+    return problems
+
+def load_data():
+    """Open storage and build the working set. Blocking: run_bot runs it while logging in."""
+    global storage, storage_lock, availability, user_tzs, poll_ledger
+    storage = open_storage()
+    # Held while mutating user_tzs / availability so flushes see a consistent view
+    storage_lock = storage.lock
+    availability, user_tzs = storage.load()
+    saved_polls, saved_processed = storage.load_runtime()
+    for game, poll_id in saved_polls.items():
+        if game in current_polls:
+            current_polls[game] = poll_id
+    processed_messages.extend(saved_processed)
+    avail_index.rebuild(availability)
+    poll_ledger = PollLedger(LEDGER_FILE, max_delay=SAVE_MAX_DELAY, durability=DURABILITY_MODE)
+    migrate_data()
+    logger.info(f"Loaded {storage.user_count()} users ({storage.name} storage) across {len(GAMES)} games.")
+
+async def load_data_async():
+    startup.begin('data-load')
+    await asyncio.to_thread(load_data)
+    startup.end('data-load')
+    data_loaded.set()
+
+# Filled in by load_data(); handlers wait on data_loaded before touching any of it
+storage = None
+storage_lock = threading.RLock()
+availability = AvailabilityModel()
+user_tzs: Dict[str, str] = {}
+poll_ledger: Optional[PollLedger] = None
+data_loaded: Optional[asyncio.Event] = None  # created by run_bot on the bot's loop (an Event made at import binds the wrong loop before 3.10)
+backup_store = BackupStore(BACKUP_DIR, BACKUP_RETENTION)
+avail_index = AvailabilityIndex()
+overlap_engines: Dict[date, 'OverlapEngine'] = {}
+overlap_builds: Dict[date, Tuple['OverlapEngine', asyncio.Future, set]] = {}  # (engine, build, users edited during it)
+ics_cache = VEventCache()
+# Rendered !summary pages keyed by (game, tz, week, data version, server); mutations bump the version
+summary_cache = SummaryCache(SUMMARY_CACHE_SIZE)
 
 # -----------------------
 # Time & TZ Helpers
 # -----------------------
-def _fmt_12h(t: time) -> str:
-    formatted = t.strftime("%I:%M %p").lstrip("0")
-    return formatted if formatted else "12:00 AM"
-
 def time_to_str_24h(t: time) -> str:
     return f"{t.hour:02d}:{t.minute:02d}"
 
@@ -232,263 +347,549 @@ def parse_time_str(ts: str) -> time:
     h, m = map(int, ts.split(':'))
     return time(h, m)
 
+def _minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
 def resolve_user_tz(user_id: str) -> str:
     return user_tzs.get(user_id, DEFAULT_TZ)
 
 
-def validate_timezone(tz_input: str) -> Optional[str]:
-    key = tz_input.strip().upper()
-    if key in TZ_SHORTCUTS:
-        return TZ_SHORTCUTS[key]
-    try:
-        pytz.timezone(tz_input.strip())
-        return tz_input.strip()
-    except Exception:
-        return None
-
 def get_game_channel(game: str) -> Optional[discord.TextChannel]:
     channel_id = GAMES.get(game.upper(), {}).get('channel')
     return bot.get_channel(channel_id) if channel_id else None
 
+def get_poll_channel(game: str) -> Optional[discord.TextChannel]:
+    """Channel of the game's live poll (where it was posted, even if the game has moved since)."""
+    channel_id = GAMES.poll_channel(game.upper())
+    return bot.get_channel(channel_id) if channel_id else None
+
+def _guild_id(ctx) -> Optional[int]:
+    return ctx.guild.id if ctx.guild else None
+
+def _resolve_game(ctx, game: Optional[str]) -> Optional[str]:
+    """Game key for a command argument; defaults to the channel's game, then the server's first."""
+    return GAMES.resolve(game, _guild_id(ctx), ctx.channel.id)
+
+def _invalid_game_msg(ctx) -> str:
+    return f"Invalid game. Use: {', '.join(GAMES.for_guild(_guild_id(ctx))) or 'none configured'}"
+
 # -----------------------
 # Parsing
 # -----------------------
-day_map = {
-    'monday': 0, 'mon': 0, 'm': 0,
-    'tuesday': 1, 'tue': 1, 't': 1,
-    'wednesday': 2, 'wed': 2, 'w': 2,
-    'thursday': 3, 'thu': 3, 'th': 3,
-    'friday': 4, 'fri': 4, 'f': 4,
-    'saturday': 5, 'sat': 5, 's': 5,
-    'sunday': 6, 'sun': 6, 'su': 6
-}
-
-# Enhanced regex pattern
-_avail_re = re.compile(
-    r'(?P<day>\b(?:mon|monday|tue|tuesday|wed|wednesday|thu|thursday|fri|friday|sat|saturday|sun|sunday)\b)\s*'
-    r'(?P<start>\d{1,2}(?::\d{2})?)\s*(?P<startamp>[AaPp][Mm])?\s*(?:-|to)\s*'
-    r'(?P<end>\d{1,2}(?::\d{2})?)\s*(?P<endamp>[AaPp][Mm])?'
-    r'(?:\s+(?P<tz>[A-Za-z/_+-]+))?',
-    re.IGNORECASE
-)
+_parser = AvailabilityParser(validate_timezone)
 
 
 def parse_availability_text(text: str) -> Dict[int, Tuple[time, time, Optional[str]]]:
     """
-    Enhanced parser that handles both formats:
+    Parses availability messages, e.g.:
     - Standard: "Monday 5-9 PM EST"
     - Comma-separated: "Monday 5-9 PM, Wednesday 5-9 PM, Friday 5-11PM"
+    - Ranges/lists: "Mon-Fri 6-10pm", "Sat & Sun 2pm to 6pm PST"
+    Repeated messages are served from the parser's cache.
     """
-    avail: Dict[int, Tuple[time, time, Optional[str]]] = {}
-    
-    # First, try to extract timezone from end of message if present
-    global_tz = None
-    tz_at_end = re.search(r'\b([A-Z]{2,4}|[A-Z][a-z]+(?:/[A-Z][a-z]+)+)\s*$', text)
-    if tz_at_end:
-        potential_tz = tz_at_end.group(1)
-        validated = validate_timezone(potential_tz)
-        if validated:
-            global_tz = validated
-    
-    for m in _avail_re.finditer(text):
-        day_str = m.group('day').lower()
-        if day_str not in day_map:
-            continue
-        try:
-            start_str = m.group('start')
-            end_str = m.group('end')
-            startamp = m.group('startamp')
-            endamp = m.group('endamp')
-            tz_abbr = m.group('tz')
-            
-            # Parse hours and minutes
-            sh, sm = (start_str.split(':') + ['0'])[:2]
-            eh, em = (end_str.split(':') + ['0'])[:2]
-            sh, sm, eh, em = int(sh), int(sm), int(eh), int(em)
-            
-            # Handle AM/PM for start time
-            if startamp:
-                if startamp.strip().upper() == 'PM' and sh < 12:
-                    sh += 12
-                elif startamp.strip().upper() == 'AM' and sh == 12:
-                    sh = 0
-            # If no AM/PM specified but end time has PM, assume start is also PM
-            elif endamp and endamp.strip().upper() == 'PM' and sh < 12:
-                sh += 12
-                
-            # Handle AM/PM for end time
-            if endamp:
-                if endamp.strip().upper() == 'PM' and eh < 12:
-                    eh += 12
-                elif endamp.strip().upper() == 'AM' and eh == 12:
-                    eh = 0
-            # If start has AM/PM but end doesn't, try to infer
-            elif startamp:
-                if startamp.strip().upper() == 'PM' and eh < 12 and eh > sh:
-                    eh += 12
-                    
-            start_t = time(sh % 24, sm)
-            end_t = time(eh % 24, em)
-            
-            # Use inline timezone if present, otherwise fall back to global
-            tz_full = None
-            if tz_abbr:
-                tz_full = validate_timezone(tz_abbr.strip())
-            elif global_tz:
-                tz_full = global_tz
-                
-            avail[day_map[day_str]] = (start_t, end_t, tz_full)
-            logger.info(f"Parsed: {day_str} {sh}:{sm:02d}-{eh}:{em:02d} (TZ: {tz_full})")
-        except Exception as e:
-            logger.error(f"Parse error for '{m.group(0)}': {e}")
-    
-    return avail
+    return _parser.parse(text)
+
 
 # -----------------------
 # Persistence
 # -----------------------
 def set_user_availability_json(user_id: str, game: str, day_idx: int, start_t: time, end_t: time, tz_str: Optional[str] = None):
-    user_entry = avail_data_json.setdefault(user_id, {})
-    game_entry = user_entry.setdefault(game.upper(), {})
-    game_entry[str(day_idx)] = [time_to_str_24h(start_t), time_to_str_24h(end_t), tz_str or ""]
+    game = game.upper()
+    with storage_lock:
+        availability.set(user_id, game, day_idx, _minutes(start_t), _minutes(end_t), tz_str or "")
+        avail_index.add(user_id, game, day_idx)
+        _mark_overlap_dirty(user_id)
+        ics_cache.invalidate(user_id, game)
+        summary_cache.bump(game)
+        entry = availability.raw(user_id, game, day_idx)
     if SAVE_AFTER_CHANGE:
-        save_json_file(AVAIL_FILE, avail_data_json)
+        storage.put_entry(user_id, game, day_idx, entry)
 
 def clear_user_availability(user_id: str, game: str = None):
-    if not game:
-        avail_data_json.pop(user_id, None)
-    else:
-        game = game.upper()
-        if user_id in avail_data_json and game in avail_data_json[user_id]:
-            avail_data_json[user_id].pop(game, None)
-            if not avail_data_json[user_id]:
-                avail_data_json.pop(user_id, None)
-    save_json_file(AVAIL_FILE, avail_data_json)
+    with storage_lock:
+        game = game.upper() if game else None
+        avail_index.remove_user(user_id, availability.user_days(user_id, game))
+        availability.delete(user_id, game)
+        _mark_overlap_dirty(user_id)
+        ics_cache.invalidate(user_id, game)
+        summary_cache.bump(game)
+        storage.delete_entries(user_id, game)
+
+def apply_reaction_days(user_id: str, game: str, days: Dict[int, bool]) -> Tuple[List[int], List[int]]:
+    """
+    Apply a burst of poll reaction toggles as one store update. Added days get
+    the default reaction window; removed days are cleared only while they
+    still hold that default (a typed reply for the day is kept).
+    Returns (set_days, cleared_days).
+    """
+    game = game.upper()
+    tz = resolve_user_tz(user_id)
+    default = (_minutes(DEFAULT_REACTION_START), _minutes(DEFAULT_REACTION_END))
+    added: Dict[int, list] = {}
+    cleared: List[int] = []
+    with storage_lock:
+        for di, on in sorted(days.items()):
+            if on:
+                availability.set(user_id, game, di, default[0], default[1], tz)
+                avail_index.add(user_id, game, di)
+                added[di] = availability.raw(user_id, game, di)
+            else:
+                current = availability.entry(user_id, game, di)
+                if current is not None and current[:2] == default:
+                    cleared.append(di)
+        if cleared:
+            availability.delete(user_id, game, cleared)
+            for di in cleared:
+                avail_index.remove(user_id, game, di)
+        if added or cleared:
+            _mark_overlap_dirty(user_id)
+            ics_cache.invalidate(user_id, game)
+            summary_cache.bump(game)
+    if SAVE_AFTER_CHANGE:
+        if added:
+            storage.put_entries(user_id, game, added)
+        if cleared:
+            storage.delete_entries(user_id, game, cleared)
+    return sorted(added), cleared
+
+def set_user_tz(user_id: str, tz_full: str):
+    with storage_lock:
+        user_tzs[user_id] = tz_full
+        _mark_overlap_dirty(user_id)
+        ics_cache.invalidate(user_id)
+        summary_cache.bump()  # entries without their own tz follow the user's
+        storage.put_tz(user_id, tz_full)
 
 # -----------------------
 # Events
 # -----------------------
 @bot.event
+@metrics.instrument('event')
 async def on_ready():
     global bot_ready_once
     if bot_ready_once:
         return
     bot_ready_once = True
+    startup.end('ready')
     logger.info(f"{bot.user} is online!")
-    logger.info(f"Loaded {len(avail_data_json)} users across {len(GAMES)} games.")
-    backup_files()
-    if not weekly_poll.is_running():
-        weekly_poll.start()
+    await data_loaded.wait()
+    startup.finish()
+    start_trace()
+    outbound.start()
+    start_metrics()
+    await backfill.run()
+    await asyncio.to_thread(backup_files)
+    poll_scheduler.start()
     if not backup_task.is_running():
         backup_task.start()
 
+def start_trace():
+    global event_trace
+    if TRACE_FILE and event_trace is None:
+        games = {game: {'channel': cfg['channel'], 'poll_msg': cfg['poll_msg'], 'guild': cfg.get('guild'),
+                        'poll': current_polls.get(game)} for game, cfg in GAMES.items()}
+        event_trace = TraceRecorder(TRACE_FILE, games)
+        logger.info(f"Recording handled events to {TRACE_FILE}")
+
 @bot.event
+@metrics.instrument('event')
 async def on_message(message: discord.Message):
-    if message.author.bot or message.id in processed_messages:
+    if message.author.bot:
+        return
+    if event_trace is not None:
+        event_trace.message(message)
+    name_cache.remember_member(message.author)
+    await data_loaded.wait()
+    if message.id in processed_messages:
         return
     processed_messages.append(message.id)
 
-    game = next((g for g, c in GAMES.items() if c['channel'] == message.channel.id), None)
+    game = GAMES.by_channel(message.channel.id)
     if not game:
         await bot.process_commands(message)
         return
+    # Only game-channel messages change data, so only they need to survive a restart
+    storage.record_processed(message.id)
 
     poll_id = current_polls.get(game.upper())
     if message.reference and message.reference.message_id == poll_id:
-        user_id = str(message.author.id)
-        parsed = parse_availability_text(message.content)
-        if parsed:
-            for di, (st, et, tz) in parsed.items():
-                set_user_availability_json(user_id, game, di, st, et, tz)
-            try:
-                dm = await message.author.create_dm()
-                day_names = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']
-                lines = [f"• {day_names[di]}: {_fmt_12h(st)} - {_fmt_12h(et)} ({tz or resolve_user_tz(user_id)})" 
-                         for di, (st, et, tz) in sorted(parsed.items())]
-                await dm.send(f"✅ **{game.upper()} availability recorded:**\n" + "\n".join(lines))
-                await message.add_reaction('✅')
-            except Exception as e:
-                logger.error(f"DM failed: {e}")
-                await message.add_reaction('✅')
-        else:
-            # No valid entries parsed
-            try:
-                await message.add_reaction('❌')
-                dm = await message.author.create_dm()
-                await dm.send(
-                    f"⚠️ Couldn't parse your availability. Please use format:\n"
-                    f"`Monday 5-9 PM`\n"
-                    f"or\n"
-                    f"`Monday 5-9 PM, Wednesday 5-9 PM, Friday 5-11 PM`"
-                )
-            except:
-                pass
+        ingest_poll_reply(message, game.upper(), poll_id)
     await bot.process_commands(message)
 
+def ingest_poll_reply(message: discord.Message, game: str, poll_id: int, notify: bool = True) -> dict:
+    """
+    Store a reply to ``game``'s poll and queue its ✅/❌ and (with ``notify``) the DM.
+    Shared with the backfill, which doesn't DM. Returns the parsed days.
+    """
+    user_id = str(message.author.id)
+    poll_ledger.record_reply(game, poll_id, user_id, message.id)
+    parsed = parse_availability_text(message.content)
+    if parsed:
+        for di, (st, et, tz) in parsed.items():
+            set_user_availability_json(user_id, game, di, st, et, tz)
+        # The ✅ is queued ahead of the DM; neither holds up this handler
+        outbound.react(message, '✅', ACK)
+        if not notify:
+            return parsed
+        day_names = ['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday']
+        lines = [f"• {day_names[di]}: {_fmt_12h(st)} - {_fmt_12h(et)} ({tz or resolve_user_tz(user_id)})" 
+                 for di, (st, et, tz) in sorted(parsed.items())]
+        outbound.dm(message.author, f"✅ **{game} availability recorded:**\n" + "\n".join(lines))
+    else:
+        # No valid entries parsed
+        outbound.react(message, '❌', ACK)
+        if notify:
+            outbound.dm(
+                message.author,
+                f"⚠️ Couldn't parse your availability. Please use format:\n"
+                f"`Monday 5-9 PM`\n"
+                f"or\n"
+                f"`Monday 5-9 PM, Wednesday 5-9 PM, Friday 5-11 PM`"
+            )
+    return parsed
+
+def _reaction_day(emoji) -> Optional[int]:
+    """0-based weekday for a poll reaction (1️⃣-7️⃣ or a bare digit), else None."""
+    key = str(emoji)
+    if key in REACTIONS:
+        return REACTIONS.index(key)
+    if key.isdigit() and 1 <= int(key) <= 7:
+        return int(key) - 1
+    return None
+
+def _poll_game(payload: discord.RawReactionActionEvent) -> Optional[str]:
+    """Game whose current poll the reaction is on: a channel index lookup and an ID compare."""
+    game = GAMES.by_channel(payload.channel_id)
+    if not game or payload.message_id != current_polls.get(game.upper()):
+        return None
+    return game
+
+def _reaction_user(payload: discord.RawReactionActionEvent):
+    """Who reacted, without fetching: the gateway member on adds, else the user cache or a bare ID."""
+    return payload.member or bot.get_user(payload.user_id) or discord.Object(payload.user_id)
+
+# Raw events fire whether or not the poll is in discord.py's message cache
 @bot.event
-async def on_reaction_add(reaction: discord.Reaction, user: discord.User):
-    if user.bot:
+@metrics.instrument('event')
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    user = _reaction_user(payload)
+    if getattr(user, 'bot', False) or payload.user_id == bot.user.id:
         return
-    game = next((g for g, c in GAMES.items() if c['channel'] == reaction.message.channel.id), None)
-    if not game or reaction.message.id != current_polls.get(game.upper()):
+    if event_trace is not None:
+        event_trace.reaction(payload, added=True)
+    if payload.member is not None:
+        name_cache.remember_member(payload.member)
+    await data_loaded.wait()
+    game = _poll_game(payload)
+    if not game:
         return
-    emoji_map = {r: i for i, r in enumerate(REACTIONS, 1)}
-    di = emoji_map.get(str(reaction.emoji))
-    if di is None and str(reaction.emoji).isdigit():
-        di = int(str(reaction.emoji))
-    if di is None or di not in range(1, 8):
+    poll_ledger.record_reaction(game.upper(), payload.message_id, str(payload.user_id), str(payload.emoji))
+    backfill.touch(game.upper(), str(payload.user_id), str(payload.emoji))
+    di = _reaction_day(payload.emoji)
+    if di is not None:
+        reaction_batcher.add(user, game.upper(), di)
+
+@bot.event
+@metrics.instrument('event')
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    user = _reaction_user(payload)
+    if getattr(user, 'bot', False) or payload.user_id == bot.user.id:
         return
-    di -= 1
-    user_id = str(user.id)
-    tz = resolve_user_tz(user_id)
-    set_user_availability_json(user_id, game, di, DEFAULT_REACTION_START, DEFAULT_REACTION_END, tz)
-    try:
-        dm = await user.create_dm()
-        await dm.send(f"{game.upper()} Quick availability set for {['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][di]} {_fmt_12h(DEFAULT_REACTION_START)}–{_fmt_12h(DEFAULT_REACTION_END)} ({tz}).")
-    except:
-        pass
+    if event_trace is not None:
+        event_trace.reaction(payload, added=False)
+    await data_loaded.wait()
+    game = _poll_game(payload)
+    if not game:
+        return
+    poll_ledger.forget_reaction(game.upper(), payload.message_id, str(payload.user_id), str(payload.emoji))
+    backfill.touch(game.upper(), str(payload.user_id), str(payload.emoji))
+    di = _reaction_day(payload.emoji)
+    if di is not None:
+        reaction_batcher.remove(user, game.upper(), di)
+
+async def _apply_reaction_batch(user_id: str, game: str, days: Dict[int, bool], user):
+    """Store a user's coalesced reactions, then send one DM covering every day."""
+    added, cleared = apply_reaction_days(user_id, game, days)
+    if not added and not cleared:
+        return
+    short = ['Mon','Tue','Wed','Thu','Fri','Sat','Sun']
+    lines = [f"**{game}** quick availability updated ({resolve_user_tz(user_id)}):"]
+    if added:
+        lines.append(f"✅ {', '.join(short[d] for d in added)} {_fmt_12h(DEFAULT_REACTION_START)}–{_fmt_12h(DEFAULT_REACTION_END)}")
+    if cleared:
+        lines.append(f"🗑️ Removed: {', '.join(short[d] for d in cleared)}")
+    outbound.dm(user, "\n".join(lines))
+
+reaction_batcher = ReactionCoalescer(_apply_reaction_batch, window=REACTION_WINDOW)
 
 # -----------------------
-# Tasks
+# Backfill (replies and reactions made while the bot was down)
 # -----------------------
-@tasks.loop(minutes=1)
-async def weekly_poll():
-    now = datetime.utcnow()
-    if now.weekday() == 6 and now.hour == 0 and now.minute in (0, 1):
-        for game, config in GAMES.items():
-            last_run = last_poll_run.get(game)
-            if last_run and (now - last_run).total_seconds() < 3600:
+class PollBackfill:
+    """
+    Run once on ready: for each game's current poll, ingest the replies posted
+    since we last saw the channel and reconcile reactions against the poll
+    ledger. Reply dedupe is the persisted processed-message ring; reaction
+    dedupe is the ledger. Reactions the live handlers see while a poll is
+    being scanned win over the scan's (older) view of them. A missed reaction
+    never overwrites a day a backfilled reply just set or a typed entry, polls
+    the ledger never registered are left alone (every reactor would look
+    new), and nothing here DMs users.
+    """
+
+    def __init__(self, concurrency: int = 4, batch: int = 100):
+        self.concurrency = concurrency
+        self.batch = batch
+        self._live: Optional[set] = None
+        self._replied: set = set()  # (game, user_id, day) written by this run's replies
+        self.replies = 0
+        self.reactions = 0
+        self.seconds = 0.0
+
+    def touch(self, game: str, user_id: str, emoji: str):
+        if self._live is not None:
+            self._live.add((game, user_id, emoji))
+
+    async def run(self):
+        polls = [(game, poll_id) for game, poll_id in current_polls.items() if poll_id and game in GAMES]
+        if not polls:
+            return
+        started, replies, reactions = _time.perf_counter(), self.replies, self.reactions
+        self._live = set()
+        slots = asyncio.Semaphore(self.concurrency)
+        try:
+            results = await asyncio.gather(*(self._poll(slots, game, poll_id) for game, poll_id in polls),
+                                           return_exceptions=True)
+        finally:
+            self._live = None
+            self._replied = set()
+        for (game, _), result in zip(polls, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Backfill of {game} poll failed: {result}")
+        self.seconds = _time.perf_counter() - started
+        logger.info(f"Backfill: {self.replies - replies} replies, {self.reactions - reactions} reaction changes "
+                    f"across {len(polls)} polls in {self.seconds:.1f}s")
+
+    async def _poll(self, slots: asyncio.Semaphore, game: str, poll_id: int):
+        channel = get_poll_channel(game)
+        if not channel:
+            return
+        async with slots:
+            await self._replies(channel, game, poll_id)
+        async with slots:
+            await self._reactions(channel, game, poll_id)
+
+    async def _replies(self, channel, game: str, poll_id: int):
+        # Once the ring is full, anything older than its oldest entry was seen before it rotated out
+        floor = poll_id
+        if len(processed_messages) == processed_messages.maxlen:
+            floor = max(floor, min(processed_messages))
+        batch = []
+        async for message in channel.history(limit=None, after=discord.Object(floor), oldest_first=True):
+            batch.append(message)
+            if len(batch) >= self.batch:
+                self._ingest(batch, game, poll_id)
+                batch = []
+                await asyncio.sleep(0)
+        self._ingest(batch, game, poll_id)
+
+    def _ingest(self, messages: List[discord.Message], game: str, poll_id: int):
+        for message in messages:
+            if message.author.bot or message.id in processed_messages:
                 continue
-            channel = bot.get_channel(config['channel'])
-            if not channel:
+            processed_messages.append(message.id)
+            storage.record_processed(message.id)
+            # Commands sent while we were down are not run; only poll replies are replayed
+            if message.reference and message.reference.message_id == poll_id:
+                parsed = ingest_poll_reply(message, game, poll_id, notify=False)
+                self._replied.update((game, str(message.author.id), di) for di in parsed)
+                self.replies += 1
+
+    def _keeps_entry(self, game: str, user_id: str, day: int) -> bool:
+        """True if a missed reaction must not replace what the user has for ``day``."""
+        if (game, user_id, day) in self._replied:
+            return True
+        current = availability.entry(user_id, game, day)
+        default = (_minutes(DEFAULT_REACTION_START), _minutes(DEFAULT_REACTION_END))
+        return current is not None and current[:2] != default
+
+    async def _reactions(self, channel, game: str, poll_id: int):
+        if not poll_ledger.has_poll(game, poll_id):
+            logger.info(f"Backfill: {game} poll {poll_id} predates the ledger; leaving its reactions alone")
+            return
+        try:
+            poll = await channel.fetch_message(poll_id)
+        except discord.NotFound:
+            logger.warning(f"{game} poll {poll_id} no longer exists; skipping its reactions")
+            return
+        recorded = poll_ledger.reactors(game, poll_id)
+        changes: Dict[str, Dict[int, bool]] = {}
+        for reaction in poll.reactions:
+            emoji = str(reaction.emoji)
+            di = _reaction_day(reaction.emoji)
+            if di is None:
                 continue
-            start_date = now + timedelta(days=1)
-            end_date = start_date + timedelta(days=6)
-            embed = discord.Embed(
-                title=f"{config['poll_msg']} ({start_date.strftime('%b %d')} - {end_date.strftime('%b %d')})",
-                description="React for quick entry!\nReply with times.\n`!settz <tz>`",
-                color=0x00ff00
-            )
-            msg = await channel.send(embed=embed)
-            current_polls[game.upper()] = msg.id
-            for e in REACTIONS:
-                await msg.add_reaction(e)
-            await channel.send(f"@everyone Mark {game.upper()} availability! Use `!mycalendar {game.lower()}` to export.")
-            last_poll_run[game] = now
-            logger.info(f"{game.upper()} Weekly poll created: {msg.id}")
-
-@weekly_poll.before_loop
-async def before_poll():
-    await bot.wait_until_ready()
+            seen = set()
+            async for user in reaction.users():
+                if user.bot:
+                    continue
+                uid = str(user.id)
+                seen.add(uid)
+                if uid not in recorded.get(emoji, ()) and (game, uid, emoji) not in self._live:
+                    poll_ledger.record_reaction(game, poll_id, uid, emoji)
+                    if not self._keeps_entry(game, uid, di):
+                        changes.setdefault(uid, {})[di] = True
+            recorded.setdefault(emoji, set()).difference_update(seen)
+        for emoji, gone in recorded.items():
+            di = _reaction_day(emoji)
+            if di is None:
+                continue
+            for uid in gone:
+                if (game, uid, emoji) in self._live:
+                    continue
+                poll_ledger.forget_reaction(game, poll_id, uid, emoji)
+                changes.setdefault(uid, {})[di] = False
+        # Applied straight to the store: the coalescer would DM every one of these users
+        for uid, days in changes.items():
+            added, cleared = apply_reaction_days(uid, game, days)
+            self.reactions += len(added) + len(cleared)
+
+backfill = PollBackfill(BACKFILL_CONCURRENCY, BACKFILL_BATCH)
 
-@tasks.loop(hours=6)
+# -----------------------
+# Tasks
+# -----------------------
+async def post_poll(game: str, week_start, announce: bool) -> Optional[discord.Message]:
+    """Post ``game``'s poll for the week starting ``week_start``; None if its channel is unreachable."""
+    channel = get_game_channel(game)
+    if not channel:
+        return None
+    end_date = week_start + timedelta(days=6)
+    description = ("React for quick entry!\nReply with times.\n`!settz <tz>`" if announce
+                   else "React or reply with times.\n`!settz <tz>`")
+    embed = discord.Embed(
+        title=f"{GAMES[game]['poll_msg']} ({week_start.strftime('%b %d')} - {end_date.strftime('%b %d')})",
+        description=description,
+        color=0x00ff00
+    )
+    msg = await outbound.send(channel, embed=embed, priority=POLL)
+    current_polls[game] = msg.id
+    storage.record_poll(game, msg.id)
+    GAMES.poll_posted(game)
+    if event_trace is not None:
+        event_trace.poll(game, channel.id, msg.id)
+    poll_ledger.open_poll(game, msg.id)
+    # Number emojis go on in order (Discord shows reactions in the order added), paced by this
+    # channel's reaction bucket; other games' polls react in parallel on their own routes.
+    outbound.react_many(msg, REACTIONS, POLL)
+    if announce:
+        outbound.send(channel, f"@everyone Mark {game} availability! Use `!mycalendar {game.lower()}` to export.")
+    return msg
+
+def schedule_for(game: str) -> PollSchedule:
+    spec = GAMES.get(game, {}).get('schedule')
+    try:
+        return PollSchedule.parse(spec or POLL_SCHEDULE)
+    except ValueError:
+        logger.error(f"{game} has an invalid poll schedule {spec!r}; using {DEFAULT_SCHEDULE}")
+        return PollSchedule.parse(DEFAULT_SCHEDULE)
+
+def poll_schedules() -> Dict[str, PollSchedule]:
+    return {game: schedule_for(game) for game in GAMES}
+
+def game_week(game: str, now: Optional[datetime] = None) -> date:
+    """Monday of the week ``game``'s latest poll collects (a Friday poll already collects next week)."""
+    return poll_week(schedule_for(game).previous(now or datetime.utcnow()))
+
+def last_poll_time(game: str) -> Optional[datetime]:
+    # Poll IDs are snowflakes, so the persisted current poll also says when it was posted
+    poll_id = current_polls.get(game)
+    return discord.utils.snowflake_time(poll_id).replace(tzinfo=None) if poll_id else None
+
+@metrics.instrument('task')
+async def scheduled_poll(game: str, deadline: datetime) -> bool:
+    late = datetime.utcnow() - deadline
+    msg = await post_poll(game, poll_week(deadline), announce=True)
+    if msg is None:
+        return False
+    caught_up = f" (caught up {_fmt_hms(int(late.total_seconds()))} late)" if late > timedelta(minutes=5) else ""
+    logger.info(f"{game} Weekly poll created: {msg.id}{caught_up}")
+    return True
+
+poll_scheduler = PollScheduler(poll_schedules, last_poll_time, scheduled_poll,
+                               catch_up=timedelta(hours=POLL_CATCHUP_HOURS))
+
+@tasks.loop(hours=1)
+@metrics.instrument('task')
 async def backup_task():
-    backup_files()
+    check_index_consistency()
+    if event_trace is not None:
+        event_trace.flush()  # a crash loses at most an hour of trace
+    # Unchanged data costs only a hash per file; retention thins the hourly snapshots
+    await asyncio.to_thread(backup_files)
 
 @backup_task.before_loop
 async def before_backup():
     await bot.wait_until_ready()
 
+# -----------------------
+# Metrics
+# -----------------------
+_lag_probe_task: Optional[asyncio.Task] = None
+
+def start_metrics():
+    global _lag_probe_task
+    if _lag_probe_task is None:
+        _lag_probe_task = asyncio.create_task(metrics.run_lag_probe(LOOP_LAG_INTERVAL))
+    if METRICS_PORT:
+        start_http_server(metrics, '127.0.0.1', METRICS_PORT)
+
+metrics.gauge('users', "Users with saved availability", lambda: storage.user_count())
+metrics.gauge('uptime_seconds', "Seconds since the bot process started", lambda: (datetime.utcnow() - boot_time).total_seconds())
+metrics.gauge('rss_bytes', "Resident memory of the bot process", lambda: psutil.Process().memory_info().rss)
+metrics.gauge('gateway_latency_seconds', "Discord heartbeat latency", lambda: bot.latency)
+metrics.gauge('parser_cache_hits', "Availability parser cache hits", lambda: _parser.hits)
+metrics.gauge('parser_cache_misses', "Availability parser cache misses", lambda: _parser.misses)
+metrics.gauge('ics_cache_entries', "Cached VEVENT blocks", lambda: len(ics_cache))
+metrics.gauge('summary_cache_hits', "!summary requests served from the render cache", lambda: summary_cache.hits)
+metrics.gauge('summary_cache_misses', "!summary requests that had to render", lambda: summary_cache.misses)
+metrics.gauge('name_cache_entries', "Display names cached for lean-memory mode", lambda: len(name_cache))
+metrics.gauge('name_cache_fetched', "Display names looked up from Discord on a cache miss", lambda: name_cache.fetched)
+metrics.gauge('log_queue_depth', "Log records waiting for the writer thread", lambda: log_pipeline.depth())
+metrics.gauge('log_dropped', "Log records dropped because the queue was full", lambda: log_pipeline.handler.dropped)
+metrics.gauge('log_suppressed', "Chatty-category log records sampled out", lambda: log_pipeline.sampler.suppressed)
+metrics.gauge('outbound_queue_depth', "Outbound actions waiting for a worker", lambda: outbound.depth())
+metrics.gauge('outbound_in_flight', "Outbound actions submitted and not yet finished (incl. deferred)", lambda: outbound.in_flight())
+metrics.gauge('outbound_sent', "Outbound actions completed", lambda: outbound.sent)
+metrics.gauge('outbound_failed', "Outbound actions that failed", lambda: outbound.failed)
+metrics.gauge('outbound_rate_limited', "429 responses seen by the outbound queue", lambda: outbound.rate_limited)
+metrics.gauge('reaction_events', "Poll reaction adds/removes received", lambda: reaction_batcher.events)
+metrics.gauge('reaction_batches', "Coalesced reaction updates applied", lambda: reaction_batcher.batches)
+for _pool in (summary_pool, export_pool):
+    metrics.gauge(f'{_pool.name}_pool_running', f"{_pool.name} jobs running", lambda p=_pool: p.running)
+    metrics.gauge(f'{_pool.name}_pool_waiting', f"{_pool.name} jobs waiting for a slot", lambda p=_pool: p.waiting)
+    metrics.gauge(f'{_pool.name}_pool_timeouts', f"{_pool.name} jobs that timed out", lambda p=_pool: p.timeouts)
+metrics.gauge('polls_scheduled', "Polls posted by the scheduler (including catch-ups)", lambda: poll_scheduler.posted)
+metrics.gauge('polls_caught_up', "Scheduled polls posted late after downtime", lambda: poll_scheduler.caught_up)
+metrics.gauge('poll_next_deadline_seconds', "Seconds until the next scheduled poll",
+              lambda: (poll_scheduler.next_deadline - datetime.utcnow()).total_seconds() if poll_scheduler.next_deadline else 0)
+metrics.gauge('backfill_replies', "Poll replies ingested by the on-ready backfill", lambda: backfill.replies)
+metrics.gauge('backfill_reactions', "Poll reaction changes applied by the on-ready backfill", lambda: backfill.reactions)
+# JSON backend only; gauges that raise are left out of the output
+metrics.gauge('journal_records_pending', "Journal records not yet folded into the snapshot", lambda: storage.journal.since_rotate)
+metrics.gauge('journal_compactions', "Journal compactions since start", lambda: storage.compactions)
+
+@bot.before_invoke
+async def _start_command_timer(ctx):
+    ctx.metrics_started = _time.perf_counter()
+
+@bot.after_invoke
+async def _record_command(ctx):
+    # Runs after every command, failed or not; commands stopped by checks never start the timer
+    started = getattr(ctx, 'metrics_started', None)
+    if started is not None and ctx.command is not None:
+        metrics.observe('command', ctx.command.qualified_name, _time.perf_counter() - started, ctx.command_failed)
+
 # -----------------------
 # Commands
 # -----------------------
@@ -498,12 +899,10 @@ async def set_tz(ctx, *, tz_str: str = None):
         await ctx.send("Usage: `!settz <timezone>` e.g. `!settz PHK`")
         return
     tz_full = validate_timezone(tz_str) or tz_str.strip()
-    try:
-        pytz.timezone(tz_full)
-        user_tzs[str(ctx.author.id)] = tz_full
-        save_json_file(TZ_FILE, user_tzs)
+    if is_valid_tz(tz_full):
+        set_user_tz(str(ctx.author.id), tz_full)
         await ctx.send(f"Timezone set to **{tz_full}**")
-    except:
+    else:
         await ctx.send("Invalid timezone! Try `!settz PHK` or `!settz America/New_York`")
 
 @bot.command(name='clear')
@@ -525,17 +924,17 @@ async def clear_availability(ctx, game: str = None):
     
     # Auto-detect game from channel if not specified
     if not game:
-        game = next((g for g, c in GAMES.items() if c['channel'] == ctx.channel.id), None)
+        game = GAMES.by_channel(ctx.channel.id)
     
     # If still no game, ask for confirmation
     if not game:
-        await ctx.send("⚠️ This will clear ALL your availability data for all games.\nType `!clear confirm` to proceed, or use `!clear BF6` or `!clear ARC` to clear specific games.")
+        await ctx.send(f"⚠️ This will clear ALL your availability data for all games.\nType `!clear confirm` to proceed, or use `!clear <game>` ({', '.join(GAMES.for_guild(_guild_id(ctx)))}) to clear specific games.")
         return
     
     # Clear specific game
     game = game.upper()
-    if game not in GAMES:
-        await ctx.send(f"Invalid game. Use: {', '.join(GAMES.keys())}")
+    if not GAMES.visible(game, _guild_id(ctx)):
+        await ctx.send(_invalid_game_msg(ctx))
         return
     
     # Clear reactions and messages for this specific game
@@ -562,8 +961,6 @@ async def clear_game_user_data(user, game: str) -> Tuple[bool, list]:
     Returns: (success: bool, errors: list)
     """
     errors = []
-    reactions_removed = 0
-    messages_deleted = 0
     
     try:
         poll_id = current_polls.get(game.upper())
@@ -572,7 +969,7 @@ async def clear_game_user_data(user, game: str) -> Tuple[bool, list]:
             logger.warning(f"No poll_id for {game} in current_polls: {current_polls}")
             return False, errors
         
-        channel_id = GAMES.get(game.upper(), {}).get('channel')
+        channel_id = GAMES.poll_channel(game.upper())
         if not channel_id:
             errors.append(f"Channel configuration missing for {game}")
             logger.error(f"No channel_id in GAMES config for {game}")
@@ -584,67 +981,18 @@ async def clear_game_user_data(user, game: str) -> Tuple[bool, list]:
             logger.error(f"Failed to get channel {channel_id}")
             return False, errors
         
-        # Get the poll message
-        try:
-            poll_message = await channel.fetch_message(poll_id)
-            logger.info(f"Found poll message {poll_id} for {game}")
-        except discord.NotFound:
-            errors.append(f"Poll message not found (may have been deleted)")
-            logger.warning(f"Poll message {poll_id} not found in channel {channel_id}")
-            return False, errors
-        except discord.Forbidden:
-            errors.append(f"Bot lacks permission to read messages in {game} channel")
-            logger.error(f"Permission denied reading message {poll_id}")
-            return False, errors
-        except Exception as e:
-            errors.append(f"Error fetching poll message: {str(e)}")
-            logger.error(f"Exception fetching message {poll_id}: {e}")
-            return False, errors
-        
-        # Remove user's reactions from poll
-        for reaction in poll_message.reactions:
-            try:
-                # Check if user has this reaction
-                users = [u async for u in reaction.users()]
-                if user in users:
-                    await reaction.remove(user)
-                    reactions_removed += 1
-                    logger.info(f"Removed reaction {reaction.emoji} from user {user.id}")
-            except discord.Forbidden:
-                errors.append(f"Bot lacks permission to remove reactions")
-                logger.error(f"Permission denied removing reaction {reaction.emoji}")
-            except discord.NotFound:
-                # Reaction was already removed, that's fine
-                pass
-            except Exception as e:
-                logger.error(f"Error removing reaction {reaction.emoji}: {e}")
-        
-        # Delete user's availability reply messages
-        try:
-            async for message in channel.history(limit=100):
-                if message.author.id == user.id and message.reference:
-                    if message.reference.message_id == poll_id:
-                        try:
-                            await message.delete()
-                            messages_deleted += 1
-                            logger.info(f"Deleted reply message {message.id} from user {user.id}")
-                        except discord.Forbidden:
-                            errors.append(f"Bot lacks permission to delete messages")
-                            logger.error(f"Permission denied deleting message {message.id}")
-                        except discord.NotFound:
-                            # Message was already deleted
-                            pass
-                        except Exception as e:
-                            logger.error(f"Error deleting message {message.id}: {e}")
-        except discord.Forbidden:
-            errors.append(f"Bot lacks permission to read message history")
-            logger.error(f"Permission denied reading history in channel {channel_id}")
-        except Exception as e:
-            errors.append(f"Error reading message history: {str(e)}")
-            logger.error(f"Exception reading history: {e}")
+        if poll_ledger.has_poll(game.upper(), poll_id):
+            reactions_removed, messages_deleted = await _clear_from_ledger(user, game.upper(), poll_id, channel, errors)
+        else:
+            # Poll predates the ledger: fall back to scanning reactions and recent history
+            result = await _clear_by_scan(user, game, poll_id, channel, errors)
+            if result is None:
+                return False, errors
+            reactions_removed, messages_deleted = result
         
         # Log summary
-        logger.info(f"Clear complete for user {user.id}, game {game}: {reactions_removed} reactions, {messages_deleted} messages")
+        logger.info(f"Clear complete for user {user.id}, game {game}: {reactions_removed} reactions, {messages_deleted} messages",
+                    extra={'user': user.id, 'game': game, 'reactions': reactions_removed, 'messages': messages_deleted})
         
         if reactions_removed > 0 or messages_deleted > 0:
             return True, errors
@@ -660,16 +1008,157 @@ async def clear_game_user_data(user, game: str) -> Tuple[bool, list]:
         return False, errors
 
 
+async def _clear_from_ledger(user, game: str, poll_id: int, channel, errors: list) -> Tuple[int, int]:
+    """Targeted removal of exactly what the ledger recorded: no poll fetch, no history scan."""
+    user_id = str(user.id)
+    replies, reactions = poll_ledger.take(game, poll_id, user_id)
+    poll_message = channel.get_partial_message(poll_id)
+    
+    reactions_removed = 0
+    failed_reactions = []
+    results = await asyncio.gather(*(poll_message.remove_reaction(e, user) for e in reactions), return_exceptions=True)
+    for emoji, result in zip(reactions, results):
+        if result is None:
+            reactions_removed += 1
+        elif isinstance(result, discord.NotFound):
+            # Reaction (or poll) already gone, that's fine
+            pass
+        elif isinstance(result, discord.Forbidden):
+            failed_reactions.append(emoji)
+            if "Bot lacks permission to remove reactions" not in errors:
+                errors.append("Bot lacks permission to remove reactions")
+            logger.error(f"Permission denied removing reaction {emoji}")
+        else:
+            failed_reactions.append(emoji)
+            logger.error(f"Error removing reaction {emoji}: {result}")
+    
+    messages_deleted, failed_replies = await _delete_replies(channel, replies, errors)
+    poll_ledger.restore(game, poll_id, user_id, failed_replies, failed_reactions)
+    return reactions_removed, messages_deleted
+
+
+async def _delete_replies(channel, message_ids: list, errors: list) -> Tuple[int, list]:
+    """Bulk-delete replies younger than 14 days (100 per call); older ones one by one, concurrently."""
+    if not message_ids:
+        return 0, []
+    bulk_cutoff = discord.utils.utcnow() - timedelta(days=13, hours=23)
+    recent = [m for m in message_ids if discord.utils.snowflake_time(m) > bulk_cutoff]
+    singles = [m for m in message_ids if m not in recent]
+    deleted = 0
+    failed = []
+    if len(recent) < 2:
+        singles.extend(recent)
+        recent = []
+    for i in range(0, len(recent), 100):
+        chunk = recent[i:i + 100]
+        try:
+            await channel.delete_messages([discord.Object(id=m) for m in chunk])
+            deleted += len(chunk)
+        except discord.Forbidden:
+            failed.extend(chunk)
+            if "Bot lacks permission to delete messages" not in errors:
+                errors.append("Bot lacks permission to delete messages")
+            logger.error(f"Permission denied bulk-deleting {len(chunk)} messages")
+        except discord.HTTPException as e:
+            # e.g. one of them is already gone; retry individually
+            logger.warning(f"Bulk delete failed ({e}); deleting {len(chunk)} messages individually")
+            singles.extend(chunk)
+    results = await asyncio.gather(*(channel.get_partial_message(m).delete() for m in singles), return_exceptions=True)
+    for message_id, result in zip(singles, results):
+        if result is None:
+            deleted += 1
+        elif isinstance(result, discord.NotFound):
+            # Message was already deleted
+            pass
+        elif isinstance(result, discord.Forbidden):
+            failed.append(message_id)
+            if "Bot lacks permission to delete messages" not in errors:
+                errors.append("Bot lacks permission to delete messages")
+            logger.error(f"Permission denied deleting message {message_id}")
+        else:
+            failed.append(message_id)
+            logger.error(f"Error deleting message {message_id}: {result}")
+    return deleted, failed
+
+
+async def _clear_by_scan(user, game: str, poll_id: int, channel, errors: list) -> Optional[Tuple[int, int]]:
+    """Legacy path for polls posted before the ledger existed. Returns None if the poll can't be read."""
+    reactions_removed = 0
+    messages_deleted = 0
+    channel_id = channel.id
+    
+    # Get the poll message
+    try:
+        poll_message = await channel.fetch_message(poll_id)
+        logger.info(f"Found poll message {poll_id} for {game}", extra={'category': 'clear'})
+    except discord.NotFound:
+        errors.append(f"Poll message not found (may have been deleted)")
+        logger.warning(f"Poll message {poll_id} not found in channel {channel_id}")
+        return None
+    except discord.Forbidden:
+        errors.append(f"Bot lacks permission to read messages in {game} channel")
+        logger.error(f"Permission denied reading message {poll_id}")
+        return None
+    except Exception as e:
+        errors.append(f"Error fetching poll message: {str(e)}")
+        logger.error(f"Exception fetching message {poll_id}: {e}")
+        return None
+    
+    # Remove user's reactions from poll
+    for reaction in poll_message.reactions:
+        try:
+            # Check if user has this reaction
+            users = [u async for u in reaction.users()]
+            if user in users:
+                await reaction.remove(user)
+                reactions_removed += 1
+                logger.info(f"Removed reaction {reaction.emoji} from user {user.id}", extra={'category': 'clear'})
+        except discord.Forbidden:
+            errors.append(f"Bot lacks permission to remove reactions")
+            logger.error(f"Permission denied removing reaction {reaction.emoji}")
+        except discord.NotFound:
+            # Reaction was already removed, that's fine
+            pass
+        except Exception as e:
+            logger.error(f"Error removing reaction {reaction.emoji}: {e}")
+    
+    # Delete user's availability reply messages
+    try:
+        async for message in channel.history(limit=100):
+            if message.author.id == user.id and message.reference:
+                if message.reference.message_id == poll_id:
+                    try:
+                        await message.delete()
+                        messages_deleted += 1
+                        logger.info(f"Deleted reply message {message.id} from user {user.id}", extra={'category': 'clear'})
+                    except discord.Forbidden:
+                        errors.append(f"Bot lacks permission to delete messages")
+                        logger.error(f"Permission denied deleting message {message.id}")
+                    except discord.NotFound:
+                        # Message was already deleted
+                        pass
+                    except Exception as e:
+                        logger.error(f"Error deleting message {message.id}: {e}")
+    except discord.Forbidden:
+        errors.append(f"Bot lacks permission to read message history")
+        logger.error(f"Permission denied reading history in channel {channel_id}")
+    except Exception as e:
+        errors.append(f"Error reading message history: {str(e)}")
+        logger.error(f"Exception reading history: {e}")
+    
+    return reactions_removed, messages_deleted
+
+
 async def clear_all_user_data(user) -> Tuple[bool, list]:
     """
-    Clear user's reactions and messages from all games
+    Clear user's reactions and messages from all games, concurrently
     Returns: (success: bool, errors: list)
     """
     all_errors = []
     all_success = True
     
-    for game in GAMES.keys():
-        success, errors = await clear_game_user_data(user, game)
+    results = await asyncio.gather(*(clear_game_user_data(user, game) for game in GAMES.keys()))
+    for success, errors in results:
         if not success:
             all_success = False
         all_errors.extend(errors)
@@ -682,12 +1171,18 @@ async def help_command(ctx):
     embed.add_field(name="`!settz <tz>`", value="Set timezone\n`!settz PHK` = Philippines", inline=False)
     embed.add_field(name="React 1-7", value="Quick 18:00–23:00", inline=False)
     embed.add_field(name="Reply to poll", value="Examples:\n`Monday 5-9 PM`\n`Mon 5-9 PM, Wed 5-9 PM, Fri 5-11PM`", inline=False)
-    embed.add_field(name="`!summary [BF6|ARC] [tz]`", value="View availability", inline=False)
-    embed.add_field(name="`!mycalendar [BF6|ARC]`", value="Download .ics", inline=False)
-    embed.add_field(name="`!clear [BF6|ARC]`", value="Remove your data", inline=False)
-    embed.add_field(name="`!start_polls [BF6|ARC]`", value="Manual poll", inline=False)
+    game_names = '|'.join(GAMES.for_guild(_guild_id(ctx))) or 'game'
+    embed.add_field(name=f"`!summary [{game_names}] [tz]`", value="View availability", inline=False)
+    embed.add_field(name=f"`!besttime [{game_names}|A+B] [hours] [tz]`", value="Best times to play together", inline=False)
+    embed.add_field(name=f"`!mycalendar [{game_names}]`", value="Download .ics", inline=False)
+    embed.add_field(name=f"`!teamcalendar [{game_names}]`", value="Download everyone's .ics", inline=False)
+    embed.add_field(name=f"`!clear [{game_names}]`", value="Remove your data", inline=False)
+    embed.add_field(name=f"`!start_polls [{game_names}]`", value="Manual poll", inline=False)
     embed.add_field(name="`!uptime`", value="Bot stats", inline=False)
-    embed.set_footer(text="Auto-poll: Sundays 00:00 UTC")
+    embed.add_field(name="`!metrics`", value="Handler latencies & loop lag (admin)", inline=False)
+    embed.add_field(name="`!backups` / `!backup` / `!restore <id>`", value="List, take or roll back to a backup (admin)", inline=False)
+    embed.add_field(name="`!game [add|channel|title|schedule|retire]`", value="Manage games, poll channels and poll times (admin)", inline=False)
+    embed.set_footer(text=f"Auto-poll: {POLL_SCHEDULE} UTC (per game: !game schedule)")
     await ctx.send(embed=embed)
 
 @bot.command(name='debugclear')
@@ -695,17 +1190,17 @@ async def help_command(ctx):
 async def debug_clear(ctx, game: str = None):
     """Admin command to debug clear functionality"""
     if not game:
-        game = next((g for g, c in GAMES.items() if c['channel'] == ctx.channel.id), None)
+        game = GAMES.by_channel(ctx.channel.id)
     
     if not game:
-        await ctx.send("Please specify a game: !debugclear BF6 or !debugclear ARC")
+        await ctx.send(f"Please specify a game: !debugclear <{'|'.join(GAMES.for_guild(_guild_id(ctx)))}>")
         return
     
     game = game.upper()
     
     # Show current state
     poll_id = current_polls.get(game)
-    channel_id = GAMES.get(game, {}).get('channel')
+    channel_id = GAMES.poll_channel(game)
     channel = bot.get_channel(channel_id) if channel_id else None
     
     debug_info = [
@@ -714,6 +1209,11 @@ async def debug_clear(ctx, game: str = None):
         f"Channel ID: {channel_id}",
         f"Channel accessible: {channel is not None}",
     ]
+    if poll_id:
+        ledger_entry = poll_ledger.data.get(game, {}).get(str(poll_id), {}).get(str(ctx.author.id), {})
+        debug_info.append(f"Ledger tracks poll: {poll_ledger.has_poll(game, poll_id)}")
+        debug_info.append(f"Ledger for you: {len(ledger_entry.get('replies', []))} replies, "
+                          f"reactions {' '.join(ledger_entry.get('reactions', [])) or 'none'}")
     
     if poll_id and channel:
         try:
@@ -746,121 +1246,249 @@ async def debug_clear(ctx, game: str = None):
     
     await ctx.send("\n".join(debug_info))
 
+def _display_name(guild, uid: str) -> str:
+    member = guild.get_member(int(uid)) if guild else None
+    if member:
+        return member.display_name
+    name = name_cache.get(guild.id, uid) if guild else None
+    return name or f"User {uid[:6]}"  # GONE ('') for users who left
+
+async def resolve_names(guild, user_ids):
+    """
+    Look up the names in ``user_ids`` that aren't cached. The cache is first grown
+    to hold every stored user: a roster larger than the bound would evict itself
+    and re-query the whole game (a gateway request per 100 users) on every report.
+    """
+    name_cache.reserve(len(availability) * 5 // 4)
+    await name_cache.resolve(guild, user_ids)
+
+def game_user_ids(game: str) -> set:
+    with storage_lock:
+        return {uid for di in range(7) for uid in avail_index.users(game, di)}
+
+def summary_snapshot(game: str, name_for) -> list:
+    """
+    Per weekday, (name, start minute, end minute, tz) for everyone available.
+    Only lookups happen here on the loop; tz math runs in the worker.
+    """
+    names: Dict[str, str] = {}
+    days = []
+    with storage_lock:
+        for di in range(7):
+            rows = []
+            for uid in avail_index.users(game, di):
+                entry = availability.entry(uid, game, di)
+                if entry is None:
+                    continue
+                name = names.get(uid)
+                if name is None:
+                    name = names[uid] = name_for(uid)
+                rows.append((name, entry[0], entry[1], entry[2] or user_tzs.get(uid, DEFAULT_TZ)))
+            days.append(rows)
+    return days
+
+def build_summary(game: str, display_tz: str, name_for) -> str:
+    """Summary text for one game, rendered inline (benchmarks and tests)."""
+    return render_summary(game, display_tz, game_week(game), summary_snapshot(game, name_for))
+
+class SummaryView(discord.ui.View):
+    """◀ ▶ paging over a cached summary; pages come from the cache entry, never re-rendered."""
+
+    def __init__(self, rendered: RenderedSummary, author_id: int):
+        super().__init__(timeout=300)
+        self.rendered = rendered
+        self.author_id = author_id
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+        self._sync_buttons()
+
+    def embed(self) -> discord.Embed:
+        embed = discord.Embed(title=self.rendered.title, description=self.rendered.pages[self.page], color=0x00ff00)
+        embed.set_footer(text=f"Page {self.page + 1}/{len(self.rendered.pages)}")
+        return embed
+
+    def _sync_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= len(self.rendered.pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id == self.author_id:
+            return True
+        await interaction.response.send_message("Run `!summary` to page through your own copy.", ephemeral=True)
+        return False
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        self.page = max(0, min(page, len(self.rendered.pages) - 1))
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label='◀', style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label='▶', style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page + 1)
+
+    @discord.ui.button(label='summary.txt', emoji='📄', style=discord.ButtonStyle.secondary)
+    async def full_text(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # In memory: concurrent summaries must not share a file on disk
+        data = io.BytesIO(self.rendered.text.encode())
+        await interaction.response.send_message(file=discord.File(data, "summary.txt"), ephemeral=True)
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+async def run_report(ctx, label: str, pool: ReportPool, fn, *args):
+    """
+    Post a "working…" placeholder, run ``fn`` on ``pool`` and return
+    (result, placeholder). On failure the placeholder already says why and
+    result is None.
+    """
+    placeholder = await ctx.send(f"⏳ Working on {label}…")
+    try:
+        return await pool.run(fn, *args), placeholder
+    except PoolBusy:
+        await placeholder.edit(content=f"⚠️ Too many reports running, try {label} again in a moment.")
+    except asyncio.TimeoutError:
+        await placeholder.edit(content=f"⚠️ {label[0].upper() + label[1:]} took longer than {pool.timeout:g}s and was abandoned.")
+    except Exception as e:
+        logger.error(f"Report {label} failed: {e}")
+        await placeholder.edit(content=f"❌ Couldn't build {label}.")
+    return None, placeholder
+
 @bot.command(name='summary')
-async def summary(ctx, game: str = DEFAULT_GAME, *, tz: str = None):
-    game = game.upper()
-    if game not in GAMES:
-        await ctx.send(f"Invalid game. Use: {', '.join(GAMES.keys())}")
+async def summary(ctx, game: str = None, *, tz: str = None):
+    game = _resolve_game(ctx, game)
+    if not game:
+        await ctx.send(_invalid_game_msg(ctx))
         return
     display_tz = tz or user_tzs.get(str(ctx.author.id), DEFAULT_TZ)
-    try:
-        pytz.timezone(display_tz)
-    except:
+    if not is_valid_tz(display_tz):
         await ctx.send("Invalid display timezone.")
         return
-    days = ['Mon','Tue','Wed','Thu','Fri','Sat','Sun']
-    lines = [f"**{game} Availability Summary ({display_tz})**\n"]
-    total = 0
-    def _name_for(uid: str) -> str:
-        member = ctx.guild.get_member(int(uid)) if ctx.guild else None
-        return member.display_name if member else f"User {uid[:6]}"
-    for di in range(7):
-        entries = []
-        for uid, user_raw in avail_data_json.items():
-            game_raw = user_raw.get(game, {})
-            if str(di) not in game_raw:
-                continue
-            st_str, et_str, stored_tz = (game_raw[str(di)] + [''])[:3]
-            from_tz = stored_tz or user_tzs.get(uid, DEFAULT_TZ)
-            try:
-                tz_from = pytz.timezone(from_tz)
-                ref_date = datetime.now(tz_from).date()
-                st = parse_time_str(st_str)
-                et = parse_time_str(et_str)
-                st_conv = tz_from.localize(datetime.combine(ref_date, st)).astimezone(pytz.timezone(display_tz)).time()
-                et_conv = tz_from.localize(datetime.combine(ref_date, et)).astimezone(pytz.timezone(display_tz)).time()
-                entries.append(f"{_name_for(uid)}: {_fmt_12h(st_conv)}–{_fmt_12h(et_conv)}")
-            except:
-                entries.append(f"{_name_for(uid)}: {_fmt_12h(parse_time_str(st_str))}–{_fmt_12h(parse_time_str(et_str))} (raw)")
-        if entries:
-            lines.append(f"**{days[di]}** ({len(entries)}):")
-            lines.extend(entries)
-            lines.append("")
-            total += len(entries)
+    # Read the version under the same lock as the snapshot, so a render is never filed under a newer one
+    with storage_lock:
+        key = (game, display_tz, game_week(game), summary_cache.version(game), _guild_id(ctx))
+        rendered = summary_cache.get(key)
+    placeholder = None
+    if rendered is None:
+        # Names missing from the cache are looked up 100 at a time before the snapshot
+        await resolve_names(ctx.guild, game_user_ids(game))
+        with storage_lock:
+            key = (game, display_tz, game_week(game), summary_cache.version(game), _guild_id(ctx))
+            days = summary_snapshot(game, lambda uid: _display_name(ctx.guild, uid))
+        rendered, placeholder = await run_report(ctx, f"the {game} summary", summary_pool,
+                                                 render_summary_pages, game, display_tz, key[2], days)
+        if rendered is None:
+            return
+        summary_cache.put(key, rendered)
+    if len(rendered.text) <= 1900:
+        if placeholder:
+            await placeholder.edit(content=rendered.text)
         else:
-            lines.append(f"**{days[di]}**: None\n")
-    lines.append(f"**Total**: {total}")
-    msg = "\n".join(lines)
-    if len(msg) > 1900:
-        with open("summary.txt", "w") as f:
-            f.write(msg)
-        await ctx.send(file=discord.File("summary.txt"))
-        os.remove("summary.txt")
+            await ctx.send(rendered.text)
+        return
+    view = SummaryView(rendered, ctx.author.id)
+    if placeholder:
+        await placeholder.edit(content=None, embed=view.embed(), view=view)
+        view.message = placeholder
     else:
-        await ctx.send(msg)
+        view.message = await ctx.send(embed=view.embed(), view=view)
+
+@bot.command(name='besttime')
+async def besttime(ctx, games: str = None, hours: float = 2.0, *, tz: str = None):
+    """Top windows where the most players are free; `BF6+ARC` needs players free for both."""
+    game_list = [_resolve_game(ctx, g) for g in games.split('+') if g] if games else [_resolve_game(ctx, None)]
+    if not game_list or None in game_list:
+        await ctx.send(f"{_invalid_game_msg(ctx)} (combine with `+`)")
+        return
+    display_tz = tz or user_tzs.get(str(ctx.author.id), DEFAULT_TZ)
+    if not is_valid_tz(display_tz):
+        await ctx.send("Invalid display timezone.")
+        return
+    # Combined games on different schedules are compared in the later of their weeks
+    engine = await get_overlap_engine(max(game_week(g) for g in game_list))
+    from overlap import SLOT_MINUTES
+    min_slots = max(1, int(round(hours * 60 / SLOT_MINUTES)))
+    windows = engine.best_windows(game_list, min_slots=min_slots, top_k=5, min_players=2)
+    label = '+'.join(game_list)
+    if not windows:
+        await ctx.send(f"No {hours:g}h window where 2+ players are free for **{label}** yet.")
+        return
+    days = ['Mon','Tue','Wed','Thu','Fri','Sat','Sun']
+    lines = [f"**Best times for {label} (≥{hours:g}h, {display_tz})**"]
+    for i, (start, end, players) in enumerate(windows, 1):
+        sd, sm = engine.converter.from_utc(start * SLOT_MINUTES, display_tz)
+        ed, em = engine.converter.from_utc(end * SLOT_MINUTES, display_tz)
+        end_day = f"{days[ed % 7]} " if ed != sd else ""
+        lines.append(f"{i}. {days[sd % 7]} {_fmt_minutes_12h(sm)} – {end_day}{_fmt_minutes_12h(em)} · **{players}** players")
+    await ctx.send("\n".join(lines))
+
+def user_calendar_job(user_id: str, game: str, entries: list, bot_id):
+    """Bind the builder (and its cache epoch) now, on the loop; the returned callable may run on a worker."""
+    builder = IcsBuilder(week_converter(game_week(game)), ics_cache, bot_id)
+    fallback_tz = user_tzs.get(user_id, DEFAULT_TZ)
+    return lambda: "".join(builder.iter_user_calendar(user_id, game, entries, fallback_tz))
+
+def build_user_calendar(user_id: str, game: str, bot_id) -> str:
+    with storage_lock:
+        entries = availability.week(user_id, game)
+    return user_calendar_job(user_id, game, entries, bot_id)()
 
 @bot.command(name='mycalendar')
-async def mycalendar(ctx, game: str = DEFAULT_GAME):
-    game = game.upper()
-    if game not in GAMES:
-        await ctx.send(f"Invalid game. Use: {', '.join(GAMES.keys())}")
+async def mycalendar(ctx, game: str = None):
+    game = _resolve_game(ctx, game)
+    if not game:
+        await ctx.send(_invalid_game_msg(ctx))
         return
     user_id = str(ctx.author.id)
-    user_data = avail_data_json.get(user_id, {}).get(game)
-    if not user_data:
+    with storage_lock:
+        entries = availability.week(user_id, game)
+    if not entries:
         await ctx.send(f"No {game} availability saved. React or reply to the {game} poll!")
         return
-    tz_str = user_tzs.get(user_id, DEFAULT_TZ)
-    tz = pytz.timezone(tz_str)
-    today = datetime.now(tz)
-    monday = today.date() - timedelta(days=today.weekday())
-    ics = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//AvailabilityBot//EN"]
-    for k, v in user_data.items():
-        di = int(k)
-        st = parse_time_str(v[0])
-        et = parse_time_str(v[1])
-        event_date = monday + timedelta(days=di)
-        start_local = datetime.combine(event_date, st)
-        end_local = datetime.combine(event_date, et)
-        start_utc = tz.localize(start_local).astimezone(pytz.utc)
-        end_utc = tz.localize(end_local).astimezone(pytz.utc)
-        uid = f"{user_id}-{game}-{di}@{bot.user.id}"
-        ics.extend([
-            "BEGIN:VEVENT",
-            f"UID:{uid}",
-            f"DTSTART:{start_utc.strftime('%Y%m%dT%H%M%SZ')}",
-            f"DTEND:{end_utc.strftime('%Y%m%dT%H%M%SZ')}",
-            f"SUMMARY:{game} Available",
-            "END:VEVENT"
-        ])
-    ics.append("END:VCALENDAR")
-    content = "\n".join(ics)
+    content, placeholder = await run_report(ctx, "your calendar", export_pool,
+                                            user_calendar_job(user_id, game, entries, bot.user.id))
+    if content is None:
+        return
     file = discord.File(io.BytesIO(content.encode()), f"{game.lower()}_avail_{user_id}.ics")
-    await ctx.send(file=file)
+    await placeholder.edit(content=None, attachments=[file])
+
+@bot.command(name='teamcalendar')
+async def teamcalendar(ctx, game: str = None):
+    """Everyone's availability for a game as one .ics, streamed into a bounded upload buffer."""
+    game = _resolve_game(ctx, game)
+    if not game:
+        await ctx.send(_invalid_game_msg(ctx))
+        return
+    builder = IcsBuilder(week_converter(game_week(game)), ics_cache, bot.user.id)
+    # week() returns fresh tuples, so the worker never sees later edits
+    with storage_lock:
+        rows = [(uid, availability.week(uid, game), user_tzs.get(uid, DEFAULT_TZ))
+                for uid in availability.user_ids() if availability.has_game(uid, game)]
+    await resolve_names(ctx.guild, [uid for uid, _, _ in rows])
+    names = {uid: _display_name(ctx.guild, uid) for uid, _, _ in rows}
+    buf, placeholder = await run_report(ctx, f"the {game} team calendar", export_pool,
+                                        lambda: spool_chunks(builder.iter_team_calendar(game, rows, names.__getitem__)))
+    if buf is None:
+        return
+    await placeholder.edit(content=None, attachments=[discord.File(buf, f"{game.lower()}_team_avail.ics")])
 
 @bot.command(name='start_polls')
-async def start_polls(ctx, game: str = DEFAULT_GAME):
-    game = game.upper()
-    if game not in GAMES:
-        await ctx.send(f"Invalid game. Use: {', '.join(GAMES.keys())}")
+async def start_polls(ctx, game: str = None):
+    game = _resolve_game(ctx, game)
+    if not game:
+        await ctx.send(_invalid_game_msg(ctx))
         return
-    channel = get_game_channel(game)
-    if not channel:
+    msg = await post_poll(game, (datetime.utcnow() + timedelta(days=1)).date(), announce=False)
+    if msg is None:
         await ctx.send("Channel not accessible.")
         return
-    now = datetime.utcnow()
-    start_date = now + timedelta(days=1)
-    end_date = start_date + timedelta(days=6)
-    config = GAMES[game]
-    embed = discord.Embed(
-        title=f"{config['poll_msg']} ({start_date.strftime('%b %d')} - {end_date.strftime('%b %d')})",
-        description="React or reply with times.\n`!settz <tz>`",
-        color=0x00ff00
-    )
-    msg = await channel.send(embed=embed)
-    current_polls[game] = msg.id
-    for e in REACTIONS:
-        await msg.add_reaction(e)
     await ctx.send(f"{game} Manual poll started!")
 
 def _fmt_hms(seconds: int) -> str:
@@ -869,6 +1497,141 @@ def _fmt_hms(seconds: int) -> str:
     s = seconds % 60
     return f"{h}h {m}m {s}s"
 
+@bot.command(name='metrics')
+@commands.has_permissions(administrator=True)
+async def metrics_command(ctx):
+    """Admin: handler counts/latencies, storage writes and event-loop lag since start."""
+    lines = metrics.summary_lines()
+    lines.append(f"users {len(availability)} · parser cache {_parser.hits}/{_parser.hits + _parser.misses} hits"
+                 f" · ics cache {len(ics_cache)}")
+    await ctx.send("```\n" + "\n".join(lines)[:1900] + "\n```")
+
+@bot.command(name='backups')
+@commands.has_permissions(administrator=True)
+async def backups_command(ctx, count: int = 10):
+    """Admin: most recent backup snapshots and store size."""
+    snaps = await asyncio.to_thread(backup_store.snapshots)
+    objects, size = await asyncio.to_thread(backup_store.usage)
+    lines = [describe_backup(s) for s in reversed(snaps[-max(1, count):])] or ["No backups yet."]
+    lines.append(f"{len(snaps)} snapshots · {objects} objects · {size / (1024 * 1024):.1f} MB")
+    await ctx.send("```\n" + "\n".join(lines)[:1900] + "\n```")
+
+@bot.command(name='backup')
+@commands.has_permissions(administrator=True)
+async def backup_command(ctx):
+    """Admin: take a backup now."""
+    manifest = await asyncio.to_thread(backup_files)
+    await ctx.send(f"Backup `{manifest['id']}` created." if manifest else "No changes since the latest backup.")
+
+@bot.command(name='restore')
+@commands.has_permissions(administrator=True)
+async def restore_command(ctx, snapshot_id: str = None):
+    """Admin: roll availability and timezones back to a backup (id, id prefix or 'latest')."""
+    if not snapshot_id:
+        await ctx.send("Usage: `!restore <id|latest>` — see `!backups`")
+        return
+    try:
+        manifest = backup_store.find(snapshot_id)
+    except BackupError as e:
+        await ctx.send(str(e))
+        return
+    started = _time.perf_counter()
+    status = await ctx.send(f"Restoring `{manifest['id']}`…")
+    # Current state first, so the rollback itself can be undone
+    safety = await asyncio.to_thread(backup_files)
+    work = tempfile.mkdtemp(dir=BACKUP_DIR)
+    try:
+        files = await asyncio.to_thread(backup_store.extract, manifest, work)
+        restored = await asyncio.to_thread(restore_data, files)
+        # Only the swap runs on the loop, so no handler sees half the old data and half the new
+        reload_data(*restored)
+    except BackupError as e:
+        logger.error(f"Restore of {manifest['id']} failed verification: {e}")
+        await status.edit(content=f"Restore aborted, backup failed verification: {e}")
+        return
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    logger.info(f"Restored backup {manifest['id']} by {ctx.author} ({len(availability)} users)")
+    undo = safety['id'] if safety else 'latest'
+    await status.edit(content=f"Restored `{manifest['id']}` ({len(availability)} users) in "
+                              f"{_time.perf_counter() - started:.1f}s. Undo with `!restore {undo}`.")
+
+@bot.group(name='game', invoke_without_command=True)
+@commands.has_permissions(administrator=True)
+async def game_admin(ctx):
+    """Admin: list this server's games."""
+    lines = GAMES.describe(_guild_id(ctx)) or ["No games configured."]
+    lines.append("`!game add <KEY> <#channel> [poll title]` · `!game channel <KEY> <#channel>` · "
+                 "`!game title <KEY> <title>` · `!game schedule <KEY> <DAY HH:MM>` · `!game retire <KEY>`")
+    lines.append(f"Polls without their own schedule post {POLL_SCHEDULE} UTC.")
+    await ctx.send("\n".join(lines)[:1900])
+
+@game_admin.command(name='add')
+@commands.has_permissions(administrator=True)
+async def game_add(ctx, key: str, channel: discord.TextChannel, *, title: str = None):
+    """Admin: add a game (or bring a retired one back) polling in ``channel``."""
+    try:
+        GAMES.add(key, channel.id, title, _guild_id(ctx), is_owner=await bot.is_owner(ctx.author))
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    key = key.upper()
+    current_polls.setdefault(key, None)
+    poll_scheduler.reschedule()
+    logger.info(f"Game {key} added in {channel.id} by {ctx.author}")
+    await ctx.send(f"✅ **{key}** now uses {channel.mention}. Post its first poll with `!start_polls {key.lower()}`.")
+
+@game_admin.command(name='channel')
+@commands.has_permissions(administrator=True)
+async def game_channel(ctx, key: str, channel: discord.TextChannel):
+    """Admin: move a game to another channel (its live poll keeps counting until the next one)."""
+    try:
+        GAMES.move(key, channel.id, _guild_id(ctx), live_poll=current_polls.get(key.upper()) is not None,
+                   is_owner=await bot.is_owner(ctx.author))
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    logger.info(f"Game {key.upper()} moved to {channel.id} by {ctx.author}")
+    await ctx.send(f"✅ **{key.upper()}** now uses {channel.mention}.")
+
+@game_admin.command(name='title')
+@commands.has_permissions(administrator=True)
+async def game_title(ctx, key: str, *, title: str):
+    """Admin: change a game's poll title."""
+    try:
+        GAMES.update(key, _guild_id(ctx), await bot.is_owner(ctx.author), poll_msg=title)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    await ctx.send(f"✅ **{key.upper()}** polls are now titled “{title}”.")
+
+@game_admin.command(name='schedule')
+@commands.has_permissions(administrator=True)
+async def game_schedule(ctx, key: str, *, spec: str):
+    """Admin: set a game's weekly poll deadline, e.g. `SUN 00:00` (UTC), or `default`."""
+    try:
+        schedule = None if spec.strip().lower() == 'default' else str(PollSchedule.parse(spec))
+        GAMES.update(key, _guild_id(ctx), await bot.is_owner(ctx.author), schedule=schedule)
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    poll_scheduler.reschedule()
+    logger.info(f"Game {key.upper()} poll schedule set to {schedule or 'default'} by {ctx.author}")
+    await ctx.send(f"✅ **{key.upper()}** polls post {schedule or POLL_SCHEDULE} UTC each week.")
+
+@game_admin.command(name='retire')
+@commands.has_permissions(administrator=True)
+async def game_retire(ctx, key: str):
+    """Admin: stop routing and polling a game. Saved availability is kept."""
+    try:
+        GAMES.retire(key, _guild_id(ctx), await bot.is_owner(ctx.author))
+    except ValueError as e:
+        await ctx.send(f"❌ {e}")
+        return
+    poll_scheduler.reschedule()
+    logger.info(f"Game {key.upper()} retired by {ctx.author}")
+    await ctx.send(f"✅ **{key.upper()}** retired. Its data is kept; `!game add` brings it back.")
+
 @bot.command(name='uptime')
 async def uptime(ctx):
     delta = datetime.utcnow() - boot_time
@@ -895,9 +1658,21 @@ async def uptime(ctx):
 # Graceful Shutdown
 # -----------------------
 def save_on_exit():
-    save_json_file(TZ_FILE, user_tzs)
-    save_json_file(AVAIL_FILE, avail_data_json)
+    for user_id, game, days in reaction_batcher.drain():
+        apply_reaction_days(user_id, game, days)
+    summary_pool.shutdown()
+    export_pool.shutdown()
+    if event_trace is not None:
+        event_trace.close()
+    if data_loaded is None or not data_loaded.is_set():
+        # Stopped before the data finished loading: nothing in memory is newer than the disk
+        logger.info("Exiting before data was loaded; nothing to save.")
+        return
+    storage.flush()
+    poll_ledger.close()
     backup_files()
+    storage.close()
+    instance_lock.release()
     logger.info("Data saved on exit.")
 
 def signal_handler(sig, frame):
@@ -911,17 +1686,37 @@ signal.signal(signal.SIGTERM, signal_handler)
 # -----------------------
 # Run
 # -----------------------
-async def run_bot():
-    token = os.getenv("DISCORD_TOKEN")
-    if not token:
-        logger.error("DISCORD_TOKEN not set!")
-        return
+async def run_session(token: str):
     while True:
         try:
-            await bot.start(token)
+            startup.begin('login')
+            await bot.login(token)
+            startup.end('login')
+            startup.begin('ready')
+            await bot.connect()
         except Exception as e:
             logger.error(f"Bot crashed: {e}")
             await asyncio.sleep(10)
 
+async def run_bot():
+    global data_loaded
+    token = os.getenv("DISCORD_TOKEN")
+    if not token:
+        logger.error("DISCORD_TOKEN not set!")
+        return
+    data_loaded = asyncio.Event()
+    # The data loads in a thread while we log in and wait for the gateway's READY
+    loader = asyncio.create_task(load_data_async())
+    session = asyncio.create_task(run_session(token))
+    await asyncio.wait({loader, session}, return_when=asyncio.FIRST_COMPLETED)
+    if loader.done() and loader.exception() is not None:
+        logger.critical(f"Loading data failed: {loader.exception()}")
+        session.cancel()
+        await bot.close()
+        raise loader.exception()
+    await session
+
+startup.end('import')
+
 if __name__ == "__main__":
     asyncio.run(run_bot())
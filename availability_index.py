@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Availability Index — game → weekday → users
+# =========================================================
+# Secondary index over the availability model so team-wide queries
+# only touch users who actually filled in a given game/day.
+# =========================================================
+
+from typing import Dict, Iterable, List, Tuple
+
+from model import AvailabilityModel
+
+DAYS_PER_WEEK = 7
+
+
+class AvailabilityIndex:
+    """
+    Inverted index ``game -> [users for Mon..Sun]``.
+
+    Each day slot is a dict used as an insertion-ordered set, so iteration
+    order matches the order users first appeared in the primary data.
+    """
+
+    def __init__(self):
+        self._games: Dict[str, List[Dict[str, None]]] = {}
+
+    def _slots(self, game: str) -> List[Dict[str, None]]:
+        slots = self._games.get(game)
+        if slots is None:
+            slots = self._games[game] = [{} for _ in range(DAYS_PER_WEEK)]
+        return slots
+
+    def add(self, user_id: str, game: str, day: int):
+        self._slots(game)[day][user_id] = None
+
+    def remove(self, user_id: str, game: str, day: int):
+        slots = self._games.get(game)
+        if slots is not None:
+            slots[day].pop(user_id, None)
+
+    def remove_user(self, user_id: str, days: Iterable[Tuple[str, int]]):
+        """Drop ``user_id`` from each (game, day) in ``days`` before the primary data is removed."""
+        for game, day in days:
+            self.remove(user_id, game, day)
+
+    def users(self, game: str, day: int) -> Iterable[str]:
+        slots = self._games.get(game)
+        return tuple(slots[day]) if slots else ()
+
+    def count(self, game: str, day: int) -> int:
+        slots = self._games.get(game)
+        return len(slots[day]) if slots else 0
+
+    def games(self) -> List[str]:
+        return list(self._games)
+
+    def rebuild(self, avail: AvailabilityModel):
+        self._games = self._build(avail)
+
+    @staticmethod
+    def _build(avail: AvailabilityModel) -> Dict[str, List[Dict[str, None]]]:
+        games: Dict[str, List[Dict[str, None]]] = {}
+        for user_id, game, day in avail.iter_days():
+            slots = games.get(game)
+            if slots is None:
+                slots = games[game] = [{} for _ in range(DAYS_PER_WEEK)]
+            slots[day][user_id] = None
+        return games
+
+    def verify(self, avail: AvailabilityModel) -> List[str]:
+        """Compare against a fresh build from primary data; returns human-readable mismatches."""
+        expected = self._build(avail)
+        problems = []
+        for game in set(expected) | set(self._games):
+            want = expected.get(game) or [{} for _ in range(DAYS_PER_WEEK)]
+            have = self._games.get(game) or [{} for _ in range(DAYS_PER_WEEK)]
+            for day in range(DAYS_PER_WEEK):
+                missing = want[day].keys() - have[day].keys()
+                extra = have[day].keys() - want[day].keys()
+                if missing or extra:
+                    problems.append(f"{game}/{day}: {len(missing)} missing, {len(extra)} stale")
+        return problems
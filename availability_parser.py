@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Availability Parser — single-pass tokenizer
+# =========================================================
+# Handles:
+# - "Monday 5-9 PM EST"
+# - "Mon 5-9 PM, Wed 5-9 PM, Fri 5-11PM"
+# - "Mon-Fri 6-10pm", "Sat & Sun 2pm to 6pm PST"
+# - overnight spans: "Fri 10pm-2am", "Sat 9-1 AM"
+# - signed offsets: "Mon 5-9 PM GMT+8", "Tue 7-10pm UTC-5"
+# =========================================================
+
+import re
+from collections import OrderedDict
+from datetime import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+Availability = Dict[int, Tuple[time, time, Optional[str]]]
+
+DAY_WORDS = {
+    'monday': 0, 'mon': 0,
+    'tuesday': 1, 'tue': 1, 'tues': 1,
+    'wednesday': 2, 'wed': 2, 'weds': 2,
+    'thursday': 3, 'thu': 3, 'thur': 3, 'thurs': 3,
+    'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5,
+    'sunday': 6, 'sun': 6,
+}
+RANGE_WORDS = {'to', 'till', 'til', 'until', 'through', 'thru'}
+# Zone names that are also everyday words: only a zone when written in caps ("EAT", not "gotta eat")
+WORD_ZONES = {'eat', 'wat', 'wet', 'met', 'ist', 'turkey', 'universal'}
+
+# One pass over the message: every token is a time (with optional am/pm), a GMT/UTC offset, a word,
+# a dash or a separator.
+# Groups: hour, minute, am/pm, offset sign, offset hours, offset minutes, word, other (dash or separator)
+_TOKEN_RE = re.compile(
+    r'(\d{1,2})(?:[:.](\d{2}))?(?:\s*([ap])\.?m\b\.?|(?![\d:]))'
+    r'|\b(?:GMT|UTC)\s*([+\-−])\s*(\d{1,2})(?::?(\d{2}))?(?![\d:])'
+    r'|([A-Za-z][A-Za-z_]*(?:/[A-Za-z0-9_+\-]+)*)'
+    r'|([-–—~,;&/\n|+])',
+    re.IGNORECASE,
+)
+_DASH_CHARS = '-–—~'
+_WORD_CACHE_LIMIT = 20000
+
+_DAY, _TIME, _DASH, _SEP, _TZ, _WORD = range(6)
+
+
+class AvailabilityParser:
+    """
+    Parses free-text availability into ``{weekday: (start, end, tz)}``.
+
+    ``resolve_tz`` maps a candidate token (e.g. "EST", "Asia/Manila") to a
+    canonical tz name or None. Results are memoized per normalized message.
+    """
+
+    def __init__(self, resolve_tz: Callable[[str], Optional[str]], cache_size: int = 1024):
+        self.resolve_tz = resolve_tz
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, Tuple[time, time, Optional[str]]], ...]]" = OrderedDict()
+        self._tz_cache: Dict[str, Optional[str]] = {}
+        self._word_cache: Dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, text: str) -> Availability:
+        key = " ".join(text.split())
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return dict(cached)
+        self.misses += 1
+        result = self._parse(key)
+        self._cache[key] = tuple(result.items())
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def _tz(self, word: str) -> Optional[str]:
+        if word in self._tz_cache:
+            return self._tz_cache[word]
+        # Two-letter country shortcuts and word-like zones only count when written in caps ("in", "eat")
+        wordlike = len(word) < 3 or word.lower() in WORD_ZONES
+        resolved = None if wordlike and not word.isupper() else self.resolve_tz(word)
+        if len(self._tz_cache) >= _WORD_CACHE_LIMIT:
+            self._tz_cache.clear()
+        self._tz_cache[word] = resolved
+        return resolved
+
+    def _offset_token(self, sign: str, hours: str, minutes: str) -> tuple:
+        """
+        "GMT+8" / "UTC-5" as the fixed zone Etc/GMT-8 / Etc/GMT+5 (the Etc names
+        flip the sign). Offsets off the whole hour have no such zone and are refused.
+        """
+        hours = int(hours)
+        if minutes and int(minutes):
+            return (_WORD, 'offset')
+        name = f"Etc/GMT{'+' if sign != '+' else '-'}{hours}" if hours else 'Etc/GMT'
+        tz = self._tz(name)
+        return (_TZ, tz) if tz else (_WORD, 'offset')
+
+    def _word_tokens(self, word: str) -> tuple:
+        tz = self._tz(word) if '/' in word else None
+        if tz:
+            return ((_TZ, tz),)
+        # "Mon/Wed" is two days, not a tz path
+        out = []
+        for i, part in enumerate(word.split('/')):
+            if i:
+                out.append((_SEP,))
+            lower = part.lower()
+            if lower in DAY_WORDS:
+                out.append((_DAY, DAY_WORDS[lower]))
+            elif lower in RANGE_WORDS:
+                out.append((_DASH,))
+            elif part:
+                tz = self._tz(part)
+                out.append((_TZ, tz) if tz else (_WORD, lower))
+        return tuple(out)
+
+    def _tokenize(self, text: str) -> List[tuple]:
+        tokens = []
+        words = self._word_cache
+        for hour, minute, ampm, sign, off_hours, off_minutes, word, other in _TOKEN_RE.findall(text):
+            if hour:
+                tokens.append((_TIME, int(hour), int(minute) if minute else 0, ampm.lower() + 'm' if ampm else None))
+            elif sign:
+                tokens.append(self._offset_token(sign, off_hours, off_minutes))
+            elif word:
+                toks = words.get(word)
+                if toks is None:
+                    if len(words) >= _WORD_CACHE_LIMIT:
+                        words.clear()
+                    toks = words[word] = self._word_tokens(word)
+                tokens.extend(toks)
+            elif other in _DASH_CHARS:
+                tokens.append((_DASH,))
+            else:
+                tokens.append((_SEP,))
+        return tokens
+
+    @staticmethod
+    def _resolve_span(start: tuple, end: tuple) -> Optional[Tuple[time, time]]:
+        """Apply am/pm (explicit or inferred) and return 24h (start, end)."""
+        _, sh, sm, samp = start
+        _, eh, em, eamp = end
+        if sh > 24 or eh > 24 or sm > 59 or em > 59:
+            return None
+
+        def to24(h: int, amp: str) -> int:
+            if amp == 'pm' and h < 12:
+                return h + 12
+            if amp == 'am' and h == 12:
+                return 0
+            return h
+
+        if samp:
+            sh = to24(sh, samp)
+        if eamp:
+            eh = to24(eh, eamp)
+        if not samp and eamp and sh < 12:
+            if eamp == 'pm' and end[1] == 12:
+                # "9-12 PM": evening until midnight
+                sh, eh = sh + 12, 0
+            elif eamp == 'pm' and sh + 12 <= eh:
+                # "5-9 PM": start shares the PM
+                sh += 12
+            elif eamp == 'am' and end[1] < 12 and sh > end[1]:
+                # "9-1 AM": an evening start running past midnight
+                sh += 12
+        elif samp == 'pm' and not eamp:
+            if eh == 12:
+                # "8pm-12": until midnight
+                eh = 0
+            elif eh < 12 and eh + 12 > sh:
+                # "5pm-9": end shares the PM
+                eh += 12
+        return time(sh % 24, sm), time(eh % 24, em)
+
+    def _parse(self, text: str) -> Availability:
+        avail: Availability = {}
+        tokens = self._tokenize(text)
+
+        # A zone as the last token applies to every entry without one of its own
+        global_tz = None
+        for tok in reversed(tokens):
+            if tok[0] == _SEP:
+                continue
+            if tok[0] == _TZ:
+                global_tz = tok[1]
+            break
+
+        entries: List[Tuple[List[int], Tuple[time, time], Optional[str]]] = []
+        days: List[int] = []
+        start = end = None
+        pending_dash = False   # a dash/"to" follows the last day or start time
+        span = None
+        prev = None            # token before the current one: an inline zone must follow a span's end time
+
+        def finish():
+            nonlocal days, start, end, span, pending_dash
+            if days and span:
+                entries.append((days, span, None))
+            days, start, end, span, pending_dash = [], None, None, None, False
+
+        for tok in tokens:
+            kind = tok[0]
+            if kind == _DAY:
+                if span:
+                    finish()
+                if days and start is None:
+                    if pending_dash:
+                        # "Mon-Fri": expand the range (wrapping past Sunday if needed)
+                        first = days[-1]
+                        step = (tok[1] - first) % 7
+                        days.extend((first + i) % 7 for i in range(1, step + 1))
+                    elif tok[1] not in days:
+                        days.append(tok[1])
+                    pending_dash = False
+                    continue
+                days, start, end, span, pending_dash = [tok[1]], None, None, None, False
+            elif kind == _TIME:
+                if not days or span:
+                    continue
+                if start is None:
+                    start = tok
+                    pending_dash = False
+                elif pending_dash:
+                    end = tok
+                    span = self._resolve_span(start, end)
+                    if span is None:
+                        days, start, end, pending_dash = [], None, None, False
+                else:
+                    # Two times without a dash: treat the later one as a fresh start
+                    start = tok
+            elif kind == _DASH:
+                pending_dash = True
+            elif kind == _TZ:
+                if span and prev is end:
+                    entries.append((days, span, tok[1]))
+                    days, start, end, span, pending_dash = [], None, None, None, False
+            # separators and other words carry no meaning on their own
+            prev = tok
+        finish()
+
+        for entry_days, (st, et), tz in entries:
+            for di in entry_days:
+                avail[di] = (st, et, tz or global_tz)
+        return avail
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Backups — content-addressed, compressed, deduplicated
+# =========================================================
+# Each file is stored once per distinct content as
+#   objects/<sha256[:2]>/<sha256>.gz
+# and every snapshot is a small manifest in snapshots/
+# naming the objects it uses. A snapshot whose files all
+# match the latest one is not written at all. Retention
+# keeps hourly/daily/weekly tiers and drops objects no
+# manifest references. Restores check every hash first.
+# =========================================================
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('availability_bot')
+
+# Snapshots kept per tier: newest per hour / day / ISO week
+DEFAULT_RETENTION = (24, 14, 8)
+_CHUNK = 1 << 20
+_ID_FORMAT = '%Y%m%d_%H%M%S'
+
+
+def file_sha256(path: str) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def parse_retention(spec: str) -> Tuple[int, int, int]:
+    """'24,14,8' -> (hourly, daily, weekly)."""
+    hourly, daily, weekly = (int(x) for x in spec.split(','))
+    return hourly, daily, weekly
+
+
+class BackupError(Exception):
+    pass
+
+
+class BackupStore:
+    """
+    Snapshot store under ``root``. Manifests look like
+    ``{"id": ..., "created": iso, "files": {name: {"sha256": ..., "size": ...}}}``.
+    Methods are thread-safe and meant to run off the event loop.
+    """
+
+    def __init__(self, root: str, retention: Tuple[int, int, int] = DEFAULT_RETENTION, level: int = 6):
+        self.root = root
+        self.retention = retention
+        self.level = level
+        self.objects_dir = os.path.join(root, 'objects')
+        self.snapshots_dir = os.path.join(root, 'snapshots')
+        self._lock = threading.Lock()
+
+    # -----------------------
+    # Objects & manifests
+    # -----------------------
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], f"{sha}.gz")
+
+    def _put_object(self, path: str, sha: str) -> bool:
+        """Compress ``path`` into the store unless that content is already there."""
+        dest = self._object_path(sha)
+        if os.path.exists(dest):
+            return False
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.tmp"
+        with open(path, 'rb') as src, open(tmp, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self.level, mtime=0) as gz:
+                shutil.copyfileobj(src, gz, _CHUNK)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, dest)
+        return True
+
+    def snapshots(self) -> List[dict]:
+        """All manifests, oldest first."""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        out = []
+        for fname in sorted(os.listdir(self.snapshots_dir)):
+            if not fname.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.snapshots_dir, fname), 'r', encoding='utf-8') as f:
+                    out.append(json.load(f))
+            except Exception as e:
+                logger.warning(f"Unreadable backup manifest {fname}: {e}")
+        return out
+
+    def find(self, snapshot_id: str = 'latest') -> dict:
+        """Manifest by id, unique id prefix, or 'latest'."""
+        snaps = self.snapshots()
+        if not snaps:
+            raise BackupError("No backups yet")
+        if snapshot_id == 'latest':
+            return snaps[-1]
+        matches = [s for s in snaps if s['id'].startswith(snapshot_id)]
+        if len(matches) != 1:
+            raise BackupError(f"{len(matches)} backups match {snapshot_id!r}")
+        return matches[0]
+
+    # -----------------------
+    # Create / prune
+    # -----------------------
+    def create(self, files: Dict[str, str], now: Optional[datetime] = None) -> Optional[dict]:
+        """
+        Snapshot ``files`` ({name: path}). Returns the new manifest, or None when
+        every file matches the latest snapshot.
+        """
+        with self._lock:
+            entries = {}
+            stored = 0
+            for name, path in sorted(files.items()):
+                sha, size = file_sha256(path)
+                stored += self._put_object(path, sha)
+                entries[name] = {'sha256': sha, 'size': size}
+            snaps = self.snapshots()
+            if snaps and snaps[-1].get('files') == entries:
+                return None
+            now = now or datetime.utcnow()
+            snapshot_id = now.strftime(_ID_FORMAT)
+            taken = {s['id'] for s in snaps}
+            n = 1
+            while snapshot_id in taken:
+                n += 1
+                snapshot_id = f"{now.strftime(_ID_FORMAT)}_{n}"
+            manifest = {'id': snapshot_id, 'created': now.isoformat(), 'files': entries, 'new_objects': stored}
+            os.makedirs(self.snapshots_dir, exist_ok=True)
+            tmp = os.path.join(self.snapshots_dir, f".{snapshot_id}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, os.path.join(self.snapshots_dir, f"{snapshot_id}.json"))
+            return manifest
+
+    def plan_retention(self, snaps: List[dict]) -> List[dict]:
+        """Snapshots to keep: the newest overall plus the newest in each of the last N hours/days/weeks."""
+        if not snaps:
+            return []
+        hourly, daily, weekly = self.retention
+        tiers = (
+            (hourly, lambda t: t.strftime('%Y%m%d%H')),
+            (daily, lambda t: t.strftime('%Y%m%d')),
+            (weekly, lambda t: '%d-%02d' % t.isocalendar()[:2]),
+        )
+        ordered = sorted(snaps, key=lambda s: s['created'], reverse=True)
+        keep = {ordered[0]['id']}
+        for limit, bucket_of in tiers:
+            seen = set()
+            for snap in ordered:
+                bucket = bucket_of(datetime.fromisoformat(snap['created']))
+                if bucket in seen:
+                    continue
+                if len(seen) >= limit:
+                    break
+                seen.add(bucket)
+                keep.add(snap['id'])
+        return [s for s in snaps if s['id'] in keep]
+
+    def prune(self) -> Tuple[int, int]:
+        """Apply retention and delete unreferenced objects. Returns (snapshots, objects) removed."""
+        with self._lock:
+            snaps = self.snapshots()
+            kept = self.plan_retention(snaps)
+            kept_ids = {s['id'] for s in kept}
+            removed = 0
+            for snap in snaps:
+                if snap['id'] not in kept_ids:
+                    os.remove(os.path.join(self.snapshots_dir, f"{snap['id']}.json"))
+                    removed += 1
+            live = {entry['sha256'] for snap in kept for entry in snap['files'].values()}
+            dropped = 0
+            if os.path.isdir(self.objects_dir):
+                for sub in os.listdir(self.objects_dir):
+                    subdir = os.path.join(self.objects_dir, sub)
+                    for fname in os.listdir(subdir):
+                        if fname.split('.', 1)[0] not in live:
+                            os.remove(os.path.join(subdir, fname))
+                            dropped += 1
+            return removed, dropped
+
+    # -----------------------
+    # Verify / restore
+    # -----------------------
+    def verify(self, manifest: dict) -> List[str]:
+        """Decompress every object of ``manifest`` and check size + hash. Returns problems."""
+        problems = []
+        for name, entry in sorted(manifest['files'].items()):
+            path = self._object_path(entry['sha256'])
+            try:
+                digest = hashlib.sha256()
+                size = 0
+                with gzip.open(path, 'rb') as gz:
+                    for chunk in iter(lambda: gz.read(_CHUNK), b''):
+                        digest.update(chunk)
+                        size += len(chunk)
+            except (OSError, EOFError) as e:
+                problems.append(f"{name}: {e}")
+                continue
+            if digest.hexdigest() != entry['sha256'] or size != entry['size']:
+                problems.append(f"{name}: content does not match manifest")
+        return problems
+
+    def extract(self, manifest: dict, dest_dir: str) -> Dict[str, str]:
+        """
+        Decompress a snapshot into ``dest_dir`` and verify each file as it is
+        written. Returns {name: path}; raises BackupError on any mismatch.
+        """
+        out = {}
+        for name, entry in sorted(manifest['files'].items()):
+            dest = os.path.join(dest_dir, os.path.basename(name))
+            digest = hashlib.sha256()
+            try:
+                with gzip.open(self._object_path(entry['sha256']), 'rb') as gz, open(dest, 'wb') as f:
+                    for chunk in iter(lambda: gz.read(_CHUNK), b''):
+                        digest.update(chunk)
+                        f.write(chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except (OSError, EOFError) as e:
+                raise BackupError(f"{manifest['id']}/{name}: {e}")
+            if digest.hexdigest() != entry['sha256']:
+                raise BackupError(f"{manifest['id']}/{name}: checksum mismatch")
+            if name.endswith('.json'):
+                try:
+                    with open(dest, 'r', encoding='utf-8') as f:
+                        json.load(f)
+                except ValueError as e:
+                    raise BackupError(f"{manifest['id']}/{name}: not valid JSON ({e})")
+            out[name] = dest
+        return out
+
+    def usage(self) -> Tuple[int, int]:
+        """(object count, bytes on disk)."""
+        count = size = 0
+        if os.path.isdir(self.objects_dir):
+            for sub in os.listdir(self.objects_dir):
+                subdir = os.path.join(self.objects_dir, sub)
+                for fname in os.listdir(subdir):
+                    count += 1
+                    size += os.path.getsize(os.path.join(subdir, fname))
+        return count, size
+
+
+def describe(manifest: dict, now: Optional[datetime] = None) -> str:
+    now = now or datetime.utcnow()
+    age = now - datetime.fromisoformat(manifest['created'])
+    total = sum(e['size'] for e in manifest['files'].values())
+    if age < timedelta(hours=1):
+        ago = f"{int(age.total_seconds() // 60)}m"
+    elif age < timedelta(days=2):
+        ago = f"{int(age.total_seconds() // 3600)}h"
+    else:
+        ago = f"{age.days}d"
+    return f"{manifest['id']}  {ago:>4} ago  {total / 1024:8.1f} KB  {','.join(sorted(manifest['files']))}"
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from storage import open_backend
+
+    parser = argparse.ArgumentParser(description="PixelB0T backups: list, create, verify, prune, restore")
+    parser.add_argument('command', choices=['list', 'create', 'verify', 'prune', 'restore'])
+    parser.add_argument('snapshot', nargs='?', default='latest', help="snapshot id/prefix or 'latest'")
+    parser.add_argument('--store', default=os.getenv('AVAIL_BACKUP_DIR', '/home/opc/backup'))
+    parser.add_argument('--backend', default=os.getenv('AVAIL_BACKEND', 'json'), choices=['json', 'sqlite'])
+    parser.add_argument('--data-dir', default='.', help="directory holding availability.json / availability.db")
+    parser.add_argument('--retention', default=os.getenv('AVAIL_BACKUP_RETENTION', '24,14,8'),
+                        help="hourly,daily,weekly snapshots to keep")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    store = BackupStore(args.store, parse_retention(args.retention))
+    if args.command == 'list':
+        for snap in store.snapshots():
+            print(describe(snap))
+        count, size = store.usage()
+        print(f"{count} objects, {size / 1024:.1f} KB on disk")
+        sys.exit(0)
+    if args.command == 'prune':
+        removed, dropped = store.prune()
+        logger.info(f"Pruned {removed} snapshots and {dropped} objects")
+        sys.exit(0)
+    if args.command == 'verify':
+        snaps = store.snapshots() if args.snapshot == 'all' else [store.find(args.snapshot)]
+        failed = 0
+        for snap in snaps:
+            problems = store.verify(snap)
+            failed += bool(problems)
+            print(f"{snap['id']}: {'OK' if not problems else '; '.join(problems)}")
+        sys.exit(1 if failed else 0)
+
+    # create / restore work on the data files; run these with the bot stopped
+    os.chdir(args.data_dir)
+    backend = open_backend(args.backend, 'availability.json', 'user_tzs.json', 'availability.db')
+    backend.load()
+    try:
+        if args.command == 'create':
+            with tempfile.TemporaryDirectory() as work:
+                manifest = store.create(backend.snapshot_files(work))
+            logger.info(f"Backup {manifest['id']} created" if manifest else "No changes since the latest backup")
+        else:
+            manifest = store.find(args.snapshot)
+            with tempfile.TemporaryDirectory() as work:
+                backend.restore_files(store.extract(manifest, work))
+            logger.info(f"Restored {manifest['id']} ({backend.user_count()} users)")
+    except BackupError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    finally:
+        backend.close()
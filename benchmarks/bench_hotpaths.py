@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Hot-path benchmarks — the bot's pure code paths, offline
+# =========================================================
+# Imports availability_bot without connecting to Discord (the
+# bot is never started), in a scratch directory so no real data,
+# log or backup files are touched. For each user count it loads
+# synthetic data and times:
+#   parse      parse_availability_text on unique replies
+#   save       full availability write through the storage backend
+#   summary    build_summary for one game
+#   mycalendar build_user_calendar for one user (cold VEVENT cache)
+#   migrate    migrate_data on legacy single-game records
+#
+# Usage:
+#   python benchmarks/bench_hotpaths.py --sizes 1000,10000,100000
+#   python benchmarks/bench_hotpaths.py --compare benchmarks/results/old.json
+# =========================================================
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_SIZES = '1000,10000,100000'
+# A p50 this much slower than the baseline counts as a regression
+REGRESSION_RATIO = 1.25
+
+
+def import_bot(workdir: str, backend: str):
+    """Import the bot module with its files redirected into ``workdir``."""
+    os.environ['AVAIL_LOG_FILE'] = os.path.join(workdir, 'availabilitybot.log')
+    os.environ['AVAIL_BACKUP_DIR'] = os.path.join(workdir, 'backup')
+    os.environ['AVAIL_BACKEND'] = backend
+    os.environ.setdefault('AVAIL_DURABILITY', 'lazy')
+    os.chdir(workdir)
+    import availability_bot
+    availability_bot.logger.setLevel('WARNING')
+    availability_bot.load_data()
+    availability_bot.data_loaded = asyncio.Event()
+    availability_bot.data_loaded.set()
+    return availability_bot
+
+
+def load_dataset(bot, avail: dict, tzs: dict):
+    """Swap synthetic data into the bot's working set."""
+    with bot.storage_lock:
+        bot.availability = bot.AvailabilityModel.from_json(avail)
+        bot.storage.replace_availability(bot.availability)
+        bot.user_tzs.clear()
+        bot.user_tzs.update(tzs)
+        bot.avail_index.rebuild(bot.availability)
+        bot.overlap_engines.clear()
+        bot.ics_cache = bot.VEventCache()
+
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': pct(50) * 1000,
+        'p90_ms': pct(90) * 1000,
+        'p99_ms': pct(99) * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def measure(fn, setup=None, samples: int = 30, budget: float = 10.0) -> dict:
+    """
+    Time ``fn`` up to ``samples`` times (at least 3, stopping early past ``budget``
+    seconds), then run it once more under tracemalloc for peak allocation.
+    ``setup`` runs untimed before every call and its result is passed to ``fn``.
+    """
+    times = []
+    started = time.perf_counter()
+    for _ in range(samples):
+        arg = setup() if setup else None
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - t0)
+        if len(times) >= 3 and time.perf_counter() - started > budget:
+            break
+    arg = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    fn(arg) if setup else fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = percentiles(times)
+    result['peak_alloc_kb'] = peak // 1024
+    return result
+
+
+def bench_size(bot, n_users: int, args) -> dict:
+    games = list(bot.GAMES)
+    game = games[0]
+    avail, tzs = synthetic.generate(n_users, games, seed=args.seed)
+    rng = random.Random(args.seed)
+    users = list(avail)
+    gc.collect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    ops = {}
+
+    # parse: unique messages so the result cache never hits
+    msgs = iter(synthetic.messages(args.samples * 4 + 10, seed=n_users))
+    ops['parse'] = measure(lambda: bot.parse_availability_text(next(msgs)),
+                           samples=args.samples, budget=args.budget)
+
+    load_dataset(bot, avail, tzs)
+
+    def _save():
+        bot.storage.replace_availability(bot.availability)
+        bot.storage.flush()
+    ops['save'] = measure(_save, samples=args.samples, budget=args.budget)
+
+    ops['summary'] = measure(lambda: bot.build_summary(game, 'America/New_York', lambda uid: f"User {uid[:6]}"),
+                             samples=args.samples, budget=args.budget)
+
+    in_game = [uid for uid in users if game in avail[uid]]
+
+    def _pick_user():
+        uid = rng.choice(in_game)
+        bot.ics_cache.invalidate(uid)
+        return uid
+    ops['mycalendar'] = measure(lambda uid: bot.build_user_calendar(uid, game, 0),
+                                setup=_pick_user, samples=args.samples * 10, budget=args.budget)
+
+    legacy = synthetic.legacy_layout(avail)
+
+    def _legacy_copy():
+        with bot.storage_lock:
+            bot.availability = bot.AvailabilityModel.from_json(legacy)
+    ops['migrate'] = measure(lambda _: bot.migrate_data(), setup=_legacy_copy,
+                             samples=args.samples, budget=args.budget)
+
+    load_dataset(bot, avail, tzs)
+    entries = sum(len(days) for user in avail.values() for days in user.values())
+    return {
+        'users': n_users,
+        'entries': entries,
+        'max_rss_kb_before': rss_before,
+        'max_rss_kb_after': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'ops': ops,
+    }
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def compare(current: dict, baseline: dict) -> int:
+    """Print p50 ratios against a previous run; returns the number of regressions."""
+    regressions = 0
+    base_sizes = {str(r['users']): r for r in baseline.get('results', [])}
+    print(f"\nvs {baseline.get('git_rev', '?')} ({baseline.get('timestamp', '?')}):")
+    for run in current['results']:
+        base = base_sizes.get(str(run['users']))
+        if not base:
+            continue
+        for op, stats in run['ops'].items():
+            old = base['ops'].get(op)
+            if not old or not old['p50_ms']:
+                continue
+            ratio = stats['p50_ms'] / old['p50_ms']
+            flag = ''
+            if ratio > REGRESSION_RATIO:
+                flag = '  << REGRESSION'
+                regressions += 1
+            print(f"  {run['users']:>7} {op:<11} p50 {old['p50_ms']:9.3f} -> {stats['p50_ms']:9.3f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline latency/memory benchmarks for the bot's hot paths")
+    ap.add_argument('--sizes', default=DEFAULT_SIZES, help="comma-separated user counts")
+    ap.add_argument('--samples', type=int, default=30, help="timed runs per operation")
+    ap.add_argument('--budget', type=float, default=10.0, help="seconds per operation before sampling stops early")
+    ap.add_argument('--backend', default='json', choices=['json', 'sqlite'])
+    ap.add_argument('--seed', type=int, default=42)
+    ap.add_argument('--output', help="results file (default: benchmarks/results/hotpaths_<timestamp>.json)")
+    ap.add_argument('--compare', help="previous results file; exit 1 if any p50 regressed")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    output = os.path.abspath(args.output or os.path.join(RESULTS_DIR, f'hotpaths_{timestamp}.json'))
+    baseline_file = os.path.abspath(args.compare) if args.compare else None
+
+    workdir = tempfile.mkdtemp(prefix='availbench_')
+    bot = import_bot(workdir, args.backend)
+    report = {
+        'timestamp': timestamp,
+        'git_rev': _git_rev(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': args.backend,
+        'samples': args.samples,
+        'results': [],
+    }
+    for n in sizes:
+        print(f"== {n} users")
+        run = bench_size(bot, n, args)
+        report['results'].append(run)
+        for op, stats in run['ops'].items():
+            print(f"  {op:<11} p50 {stats['p50_ms']:9.3f}  p90 {stats['p90_ms']:9.3f}  p99 {stats['p99_ms']:9.3f} ms"
+                  f"  peak {stats['peak_alloc_kb']:>8} KB  (n={stats['n']})")
+        print(f"  max RSS {run['max_rss_kb_after'] // 1024} MB, {run['entries']} entries")
+
+    bot.storage.close()
+    bot.poll_ledger.close()
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline_file:
+        with open(baseline_file, 'r') as f:
+            baseline = json.load(f)
+        if compare(report, baseline):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
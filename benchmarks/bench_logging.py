@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Logging benchmark — synchronous file logging vs the queue
+# =========================================================
+# Time spent *in the caller* (i.e. on the event loop) per log
+# call and per handler, for:
+#   sync   the old setup: basicConfig FileHandler + a console
+#          StreamHandler, both written inline
+#   queue  logpipe: enqueue only; a listener thread writes
+#          JSON lines and rotates
+# Handlers modelled:
+#   reply  one info line (a typical event)
+#   clear  the history-scan !clear: one line per removed
+#          reaction/message (100), then a summary line
+# Each setup runs in its own process; the console goes to
+# /dev/null so terminal speed doesn't count.
+#
+# Usage:
+#   python benchmarks/bench_logging.py --calls 20000
+# =========================================================
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6
+    return {'p50_us': round(pick(0.50), 1), 'p99_us': round(pick(0.99), 1), 'max_us': round(samples[-1] * 1e6, 1)}
+
+
+def run_setup(setup: str, calls: int, workdir: str) -> dict:
+    path = os.path.join(workdir, f'{setup}.log')
+    sys.stderr = open(os.devnull, 'w')
+    if setup == 'sync':
+        logging.basicConfig(filename=path, level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+        logger = logging.getLogger('availability_bot')
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        logger.addHandler(console)
+        pipeline = None
+    else:
+        from logpipe import correlate, setup_logging
+        pipeline = setup_logging(path, sample_rates={'clear': 5})
+        pipeline.start()
+        logger = logging.getLogger('availability_bot')
+        correlate('bench')
+
+    def reply(i):
+        logger.info(f"Availability recorded for user {100000 + i}, game BF6: 3 days")
+
+    def clear(i):
+        for n in range(100):
+            logger.info(f"Removed reaction 1️⃣ from user {100000 + i} ({n})", extra={'category': 'clear'})
+        logger.info(f"Clear complete for user {100000 + i}, game BF6: 100 reactions, 0 messages")
+
+    results = {'setup': setup}
+    for name, fn, n in (('reply', reply, calls), ('clear', clear, max(1, calls // 100))):
+        samples = []
+        for i in range(n):
+            t0 = time.perf_counter()
+            fn(i)
+            samples.append(time.perf_counter() - t0)
+            if name == 'clear':
+                time.sleep(0.002)  # clears are spread out, as they are in practice
+        results[name] = percentiles(samples)
+    t0 = time.perf_counter()
+    if pipeline is not None:
+        pipeline.stop()
+        results['suppressed'] = pipeline.sampler.suppressed
+        results['dropped'] = pipeline.handler.dropped
+    results['drain_s'] = round(time.perf_counter() - t0, 3)
+    results['file_kb'] = round(os.path.getsize(path) / 1024)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Caller-side latency of synchronous vs queued logging")
+    ap.add_argument('--calls', type=int, default=20000, help="single-line handler invocations")
+    ap.add_argument('--setup', choices=['sync', 'queue'], help=argparse.SUPPRESS)
+    ap.add_argument('--workdir', help=argparse.SUPPRESS)
+    ap.add_argument('--output', help="write results as JSON here")
+    args = ap.parse_args()
+
+    if args.setup:
+        print(json.dumps(run_setup(args.setup, args.calls, args.workdir)), file=sys.__stdout__)
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for setup in ('sync', 'queue'):
+            out = subprocess.run([sys.executable, __file__, '--setup', setup, '--calls', str(args.calls),
+                                  '--workdir', workdir], capture_output=True, text=True, check=True)
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    for r in results:
+        print(f"  {r['setup']:<5} reply p50 {r['reply']['p50_us']:>7} us  p99 {r['reply']['p99_us']:>7} us   "
+              f"clear p50 {r['clear']['p50_us']:>8} us  p99 {r['clear']['p99_us']:>8} us   "
+              f"file {r['file_kb']} KB" + (f"  ({r['suppressed']} sampled out)" if 'suppressed' in r else ""))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
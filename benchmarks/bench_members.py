@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Member-cache benchmark — full member cache vs lean mode
+# =========================================================
+# Stands in for a large guild without connecting: a real
+# discord.py ConnectionState/Guild is fed member payloads the
+# way chunking at startup would, and RSS growth is measured.
+#   full   members intent on: every member is chunked and
+#          cached as a Member (plus its User)
+#   lean   members intent off, MemberCacheFlags.none(): only
+#          the users who show up (posted or reacted) land in
+#          the bounded NameCache
+# Each mode runs in its own process so the numbers don't mix.
+#
+# Usage:
+#   python benchmarks/bench_members.py --members 100000 --active 2000
+# =========================================================
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def member_payload(i: int) -> dict:
+    return {
+        'user': {'id': 10**17 + i, 'username': f'player{i}', 'discriminator': '0',
+                 'avatar': f'{i:032x}', 'global_name': f'Player {i}'},
+        'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False,
+        'nick': f'nick{i}' if i % 3 == 0 else None, 'flags': 0,
+    }
+
+
+def run_mode(mode: str, members: int, active: int) -> dict:
+    import discord
+    import psutil
+    from discord.state import ConnectionState
+    from names import NameCache
+
+    lean = mode == 'lean'
+    intents = discord.Intents.default()
+    intents.members = not lean
+    flags = discord.MemberCacheFlags.none() if lean else discord.MemberCacheFlags.from_intents(intents)
+    state = ConnectionState(dispatch=lambda *a: None, handlers={}, hooks={}, http=None, intents=intents,
+                            member_cache_flags=flags, chunk_guilds_at_startup=not lean)
+    guild = discord.Guild(data={'id': 1, 'name': 'stand-in', 'roles': [], 'emojis': [],
+                                'member_count': members}, state=state)
+    names = NameCache()
+    gc.collect()
+    before = psutil.Process().memory_info().rss
+    if lean:
+        # Only active users are ever seen, as message authors / reaction members
+        for i in range(active):
+            member = discord.Member(data=member_payload(i), guild=guild, state=state)
+            names.remember_member(member)
+    else:
+        for i in range(members):
+            guild._add_member(discord.Member(data=member_payload(i), guild=guild, state=state))
+    gc.collect()
+    after = psutil.Process().memory_info().rss
+    return {'mode': mode, 'members': members, 'active': active,
+            'cached_members': len(guild._members), 'cached_names': len(names),
+            'rss_before_mb': round(before / 2**20, 1), 'rss_after_mb': round(after / 2**20, 1),
+            'rss_growth_mb': round((after - before) / 2**20, 1)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="RSS of discord.py's member cache vs lean mode's name cache")
+    ap.add_argument('--members', type=int, default=100000, help="guild size the stand-in chunks")
+    ap.add_argument('--active', type=int, default=2000, help="users who post or react (lean mode caches these)")
+    ap.add_argument('--mode', choices=['full', 'lean'], help=argparse.SUPPRESS)
+    ap.add_argument('--output', help="write results as JSON here")
+    args = ap.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.members, args.active)))
+        return 0
+
+    results = []
+    for mode in ('full', 'lean'):
+        out = subprocess.run([sys.executable, __file__, '--mode', mode, '--members', str(args.members),
+                              '--active', str(args.active)], capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    for r in results:
+        print(f"  {r['mode']:<5} {r['cached_members']:>7} members / {r['cached_names']:>6} names cached   "
+              f"RSS {r['rss_before_mb']:>6} -> {r['rss_after_mb']:>6} MB (+{r['rss_growth_mb']} MB)")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Model benchmark — nested JSON dicts vs AvailabilityModel
+# =========================================================
+# Loads the same synthetic availability both ways, as the bot
+# would from availability.json, and reports:
+#   memory     bytes held by each representation (tracemalloc)
+#   load/dump  json dict -> model, model -> json dict
+#   entry      one (user, game, day) lookup as minutes
+#   week       one user's week as (day, start, end, tz) rows
+#   scan       every entry of one game (what !summary touches)
+# and checks that to_json() gives back exactly the input.
+#
+# Usage:
+#   python benchmarks/bench_model.py --users 100000
+# =========================================================
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+from model import AvailabilityModel  # noqa: E402
+from tzconvert import hhmm_to_minutes  # noqa: E402
+
+
+def held_bytes(build):
+    """(object, bytes still allocated once ``build`` returns)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def per_call_us(fn, args, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for a in args:
+            fn(*a)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(args) * 1e6
+
+
+# The readers as they were: dict walk plus string parsing on every access
+def dict_entry(avail, uid, game, day):
+    raw = avail.get(uid, {}).get(game, {}).get(str(day))
+    if raw is None:
+        return None
+    return hhmm_to_minutes(raw[0]), hhmm_to_minutes(raw[1]), (raw[2] if len(raw) > 2 else '')
+
+
+def dict_week(avail, uid, game):
+    return [(int(k), hhmm_to_minutes(v[0]), hhmm_to_minutes(v[1]), (list(v) + [''])[2])
+            for k, v in avail.get(uid, {}).get(game, {}).items()]
+
+
+def dict_scan(avail, game):
+    n = 0
+    for user_data in avail.values():
+        for k, v in user_data.get(game, {}).items():
+            n += hhmm_to_minutes(v[0]) + hhmm_to_minutes(v[1]) + int(k)
+    return n
+
+
+def model_scan(model, game):
+    n = 0
+    for uid in model.user_ids():
+        for d, st, et, _ in model.week(uid, game):
+            n += st + et + d
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Memory/access cost of the availability model vs raw JSON dicts")
+    ap.add_argument('--users', type=int, default=100000)
+    ap.add_argument('--lookups', type=int, default=100000)
+    ap.add_argument('--seed', type=int, default=42)
+    ap.add_argument('--output', help="write results as JSON here")
+    args = ap.parse_args()
+
+    games = ['BF6', 'ARC']
+    avail, _ = synthetic.generate(args.users, games, seed=args.seed)
+    # Round-trip through text so the dicts look like a fresh json.load (no shared strings)
+    text = json.dumps(avail)
+    del avail
+
+    as_dict, dict_bytes = held_bytes(lambda: json.loads(text))
+    model, model_bytes = held_bytes(lambda: AvailabilityModel.from_json(as_dict))
+    del model
+    gc.collect()
+    t0 = time.perf_counter()  # timed again untraced: tracemalloc slows allocation-heavy code
+    model = AvailabilityModel.from_json(as_dict)
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    dumped = model.to_json()
+    dump_s = time.perf_counter() - t0
+    lossless = dumped == as_dict
+    del dumped
+
+    rng = random.Random(args.seed)
+    users = model.user_ids()
+    picks = [(rng.choice(users), rng.choice(games), rng.randrange(7)) for _ in range(args.lookups)]
+    week_picks = [(uid, game) for uid, game, _ in picks]
+    entries = sum(1 for _ in model.iter_days())
+
+    results = {
+        'users': args.users,
+        'entries': entries,
+        'lossless_round_trip': lossless,
+        'dict_mb': round(dict_bytes / 2**20, 1),
+        'model_mb': round(model_bytes / 2**20, 1),
+        'bytes_per_entry_dict': round(dict_bytes / entries),
+        'bytes_per_entry_model': round(model_bytes / entries),
+        'from_json_s': round(load_s, 2),
+        'to_json_s': round(dump_s, 2),
+        'entry_us_dict': round(per_call_us(lambda u, g, d: dict_entry(as_dict, u, g, d), picks), 3),
+        'entry_us_model': round(per_call_us(model.entry, picks), 3),
+        'week_us_dict': round(per_call_us(lambda u, g: dict_week(as_dict, u, g), week_picks), 3),
+        'week_us_model': round(per_call_us(model.week, week_picks), 3),
+        'scan_ms_dict': round(per_call_us(lambda g: dict_scan(as_dict, g), [('BF6',)], repeat=3) / 1000, 1),
+        'scan_ms_model': round(per_call_us(lambda g: model_scan(model, g), [('BF6',)], repeat=3) / 1000, 1),
+    }
+    print(f"{args.users} users, {entries} entries, lossless round-trip: {lossless}")
+    print(f"  memory     dict {results['dict_mb']:>7} MB ({results['bytes_per_entry_dict']} B/entry)"
+          f"   model {results['model_mb']:>7} MB ({results['bytes_per_entry_model']} B/entry)")
+    print(f"  load/dump  from_json {results['from_json_s']}s   to_json {results['to_json_s']}s")
+    for op, unit in (('entry', 'us'), ('week', 'us'), ('scan', 'ms')):
+        print(f"  {op:<10} dict {results[f'{op}_{unit}_dict']:>9} {unit}   model {results[f'{op}_{unit}_model']:>9} {unit}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if lossless else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Parser benchmark — golden corpus check + throughput
+# =========================================================
+# Usage: python benchmarks/bench_parser.py [--count N] [--repeat R]
+# Exits non-zero if any golden case parses differently.
+# =========================================================
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from availability_parser import AvailabilityParser  # noqa: E402
+from benchmarks.synthetic import messages as synthetic_messages  # noqa: E402
+from tzconvert import validate_timezone  # noqa: E402
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_golden.json')
+
+
+def _fmt(result) -> dict:
+    return {str(k): [v[0].strftime('%H:%M'), v[1].strftime('%H:%M'), v[2]] for k, v in sorted(result.items())}
+
+
+def check_golden(parser: AvailabilityParser) -> int:
+    with open(GOLDEN_FILE, 'r') as f:
+        cases = json.load(f)
+    failures = 0
+    for case in cases:
+        got = _fmt(parser.parse(case['text']))
+        if got != case['expected']:
+            failures += 1
+            print(f"MISMATCH {case['text']!r}\n  expected {case['expected']}\n  got      {got}")
+    print(f"golden: {len(cases) - failures}/{len(cases)} cases match")
+    return failures
+
+
+def throughput(parser: AvailabilityParser, messages: list) -> float:
+    t0 = time.perf_counter()
+    for msg in messages:
+        parser.parse(msg)
+    return len(messages) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check the parser against the golden corpus and measure msgs/sec")
+    ap.add_argument('--count', type=int, default=20000, help="unique synthetic messages")
+    ap.add_argument('--repeat', type=int, default=5, help="passes over a small hot set for the warm run")
+    args = ap.parse_args()
+
+    if check_golden(AvailabilityParser(validate_timezone, cache_size=0)):
+        sys.exit(1)
+
+    messages = synthetic_messages(args.count)
+    cold = throughput(AvailabilityParser(validate_timezone, cache_size=args.count), messages)
+    print(f"cold (unique messages):  {cold:,.0f} msgs/sec")
+
+    warm_parser = AvailabilityParser(validate_timezone)
+    hot = messages[:500] * args.repeat
+    warm_parser.parse(messages[0])
+    warm = throughput(warm_parser, hot)
+    print(f"warm (repeated, cached): {warm:,.0f} msgs/sec  (hits={warm_parser.hits}, misses={warm_parser.misses})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Replay — drive the real bot with a recorded or synthetic
+#          event trace against an in-process fake Discord
+# =========================================================
+# Events from a trace (eventtrace.py; record one with
+# AVAIL_TRACE_FILE, or generate a Sunday rush) are dispatched
+# to the bot's own on_message / on_raw_reaction_add/remove,
+# each as its own task the way discord.py dispatches them, so
+# commands go through the real command framework. The fake
+# Discord answers every REST call after --api-latency and
+# counts it. Reported:
+#   ack latency   reply -> ✅/❌ on it, reaction -> its DM,
+#                 command -> first message sent in reply
+#   handler       event -> its handler returned
+#   store writes  physical writes per file (storage metrics)
+#   API calls     per call type, as the fake saw them
+#   loop lag      worst event-loop stall during the replay
+#
+# Usage:
+#   python benchmarks/replay.py generate --users 10000 --out rush.trace.gz
+#   python benchmarks/replay.py run rush.trace.gz --speed 10
+#   python benchmarks/replay.py run --synthetic 10000 --speed max --output replay.json
+# =========================================================
+
+import argparse
+import asyncio
+import contextvars
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+from eventtrace import read_trace, write_trace  # noqa: E402
+
+BOT_ID = 999000000000000001
+# Channels of the built-in games, so synthetic traces route without a games.json
+DEFAULT_CHANNELS = {'BF6': 1426994243398008872, 'ARC': 1429276090807091230}
+ACK_EMOJIS = ('✅', '❌')
+
+# Index of the trace event whose handler is running (inherited by the task it runs in)
+_current_event: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('replay_event', default=None)
+
+
+# -----------------------
+# Fake Discord
+# -----------------------
+class FakeDiscord:
+    """Stands in for the REST API: every call sleeps ``latency`` and is counted."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self.channels: Dict[int, 'FakeChannel'] = {}
+        self.guilds: Dict[int, 'FakeGuild'] = {}
+        self.names: Dict[int, str] = {}
+        self.ids = itertools.count(1 << 60)
+        self.clock = time.perf_counter
+        self.acks: Dict[int, float] = {}                  # message ID -> ✅/❌ time
+        self.dms: Dict[int, List[float]] = defaultdict(list)  # user ID -> reaction-DM times
+        self.first_reply: Dict[int, float] = {}           # event index -> first message sent
+
+    async def api(self, kind: str):
+        self.calls[kind] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def guild(self, guild_id: Optional[int]) -> Optional['FakeGuild']:
+        if guild_id is None:
+            return None
+        if guild_id not in self.guilds:
+            self.guilds[guild_id] = FakeGuild(self, guild_id)
+        return self.guilds[guild_id]
+
+    def channel(self, channel_id: int, guild_id: Optional[int] = None) -> 'FakeChannel':
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(self, channel_id, self.guild(guild_id))
+        return self.channels[channel_id]
+
+    def get_channel(self, channel_id: int) -> Optional['FakeChannel']:
+        return self.channels.get(channel_id)
+
+    def member(self, user_id: int, guild: Optional['FakeGuild']) -> 'FakeMember':
+        return FakeMember(self, user_id, self.names.get(user_id, f"user{user_id % 100000}"), guild)
+
+    async def create_dm(self, user) -> 'FakeDM':
+        await self.api('dm_open')
+        return FakeDM(self, user.id)
+
+    def replied(self):
+        index = _current_event.get()
+        if index is not None and index not in self.first_reply:
+            self.first_reply[index] = self.clock()
+
+
+class FakeGuild:
+    def __init__(self, fake: FakeDiscord, guild_id: int):
+        self.fake = fake
+        self.id = guild_id
+        self.name = f"guild{guild_id}"
+
+    def get_member(self, user_id: int):
+        return None  # lean mode: nothing is cached
+
+    async def query_members(self, user_ids=None, limit=5, cache=True, **_):
+        await self.fake.api('query_members')
+        return [self.fake.member(uid, self) for uid in user_ids or ()]
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, fake: FakeDiscord, user_id: int, name: str, guild: Optional[FakeGuild]):
+        self.fake = fake
+        self.id = user_id
+        self.name = self.display_name = name
+        self.guild = guild
+        self.dm_channel = None
+        self.mention = f"<@{user_id}>"
+
+    async def create_dm(self):
+        return await self.fake.create_dm(self)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeDM:
+    def __init__(self, fake: FakeDiscord, user_id: int):
+        self.fake = fake
+        self.user_id = user_id
+
+    async def send(self, content=None, **_):
+        await self.fake.api('dm_send')
+        if content and 'quick availability' in content:
+            self.fake.dms[self.user_id].append(self.fake.clock())
+
+
+class FakeChannel:
+    def __init__(self, fake: FakeDiscord, channel_id: int, guild: Optional[FakeGuild]):
+        self.fake = fake
+        self.id = channel_id
+        self.guild = guild
+        self.mention = f"<#{channel_id}>"
+
+    async def send(self, content=None, **_):
+        await self.fake.api('send')
+        self.fake.replied()
+        return FakeMessage(self.fake, next(self.fake.ids), self, content=content or '')
+
+    def get_partial_message(self, message_id: int) -> 'FakeMessage':
+        return FakeMessage(self.fake, message_id, self)
+
+    async def fetch_message(self, message_id: int) -> 'FakeMessage':
+        await self.fake.api('fetch_message')
+        return FakeMessage(self.fake, message_id, self)
+
+    def history(self, **_):
+        async def empty():
+            await self.fake.api('history')
+            return
+            yield
+        return empty()
+
+    def permissions_for(self, _member):
+        import discord
+        return discord.Permissions.all()
+
+
+class FakeMessage:
+    _state = None
+    attachments = ()
+    mentions = ()
+    reactions = ()
+
+    def __init__(self, fake: FakeDiscord, message_id: int, channel: FakeChannel, author=None,
+                 content: str = '', reference: Optional[int] = None):
+        self.fake = fake
+        self.id = message_id
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.reference = SimpleNamespace(message_id=reference) if reference else None
+
+    async def add_reaction(self, emoji):
+        await self.fake.api('add_reaction')
+        if str(emoji) in ACK_EMOJIS:
+            self.fake.acks.setdefault(self.id, self.fake.clock())
+
+    async def remove_reaction(self, emoji, member):
+        await self.fake.api('remove_reaction')
+
+    async def edit(self, **_):
+        await self.fake.api('edit')
+        self.fake.replied()
+        return self
+
+    async def delete(self, **_):
+        await self.fake.api('delete')
+
+
+# -----------------------
+# Bot wiring
+# -----------------------
+def import_bot(workdir: str, games: Dict[str, dict]):
+    """Import the bot with its files in ``workdir`` and the trace's games configured."""
+    os.environ['AVAIL_LOG_FILE'] = os.path.join(workdir, 'availabilitybot.log')
+    os.environ['AVAIL_BACKUP_DIR'] = os.path.join(workdir, 'backup')
+    os.environ['AVAIL_METRICS_PORT'] = '0'
+    os.environ['AVAIL_LOCK_WAIT'] = '0'
+    os.environ.pop('AVAIL_TRACE_FILE', None)
+    os.chdir(workdir)
+    with open('games.json', 'w') as f:
+        json.dump({'games': {game: {'channel': cfg['channel'], 'poll_msg': cfg.get('poll_msg') or f"{game} Weekly Availability",
+                                    'guild': cfg.get('guild'), 'active': True}
+                             for game, cfg in games.items()}}, f)
+    import availability_bot
+    availability_bot.logger.setLevel('WARNING')
+    availability_bot.load_data()
+    availability_bot.data_loaded = asyncio.Event()
+    availability_bot.data_loaded.set()
+    return availability_bot
+
+
+def wire(bot, fake: FakeDiscord, games: Dict[str, dict]):
+    from discord.ext import commands
+    # Context.send goes through the connection's HTTP client; send on the fake channel instead
+    commands.Context.send = lambda ctx, *a, **k: ctx.channel.send(*a, **k)
+    bot.bot._connection.user = FakeMember(fake, BOT_ID, 'PixelB0T', None)
+    bot.bot.get_channel = fake.get_channel
+    bot.bot.get_user = lambda user_id: None
+    bot.outbound._create_dm = fake.create_dm
+    for game, cfg in games.items():
+        fake.channel(cfg['channel'], cfg.get('guild'))
+        if cfg.get('poll'):
+            open_poll(bot, game, cfg['poll'])
+
+
+def open_poll(bot, game: str, poll_id: int):
+    bot.current_polls[game] = poll_id
+    bot.storage.record_poll(game, poll_id)
+    bot.poll_ledger.open_poll(game, poll_id)
+
+
+def make_event(bot, fake: FakeDiscord, e: dict):
+    """(handler coroutine, kind) for one trace event; None for events that only change state."""
+    kind = e['k']
+    if kind == 'p':
+        open_poll(bot, e['game'], e['id'])
+        return None, None
+    if e.get('n'):
+        fake.names[e['u']] = e['n']
+    channel = fake.channel(e['ch'], e.get('g'))
+    if kind == 'm':
+        author = fake.member(e['u'], channel.guild)
+        message = FakeMessage(fake, e['id'], channel, author, e.get('c', ''), e.get('r'))
+        command = message.content.startswith('!')
+        return bot.on_message(message), 'command' if command else 'reply' if e.get('r') else 'message'
+    import discord
+    payload = SimpleNamespace(channel_id=e['ch'], message_id=e['m'], user_id=e['u'], guild_id=e.get('g'),
+                              emoji=discord.PartialEmoji(name=e['e']),
+                              member=fake.member(e['u'], channel.guild) if kind == 'ra' else None)
+    if kind == 'ra':
+        return bot.on_raw_reaction_add(payload), 'reaction'
+    return bot.on_raw_reaction_remove(payload), 'unreaction'
+
+
+def percentiles(samples: List[float]) -> dict:
+    if not samples:
+        return {'n': 0}
+    ordered = sorted(samples)
+    pct = lambda p: round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+    return {'n': len(ordered), 'p50_ms': pct(0.50), 'p95_ms': pct(0.95), 'p99_ms': pct(0.99),
+            'max_ms': round(ordered[-1] * 1000, 1)}
+
+
+async def replay(bot, fake: FakeDiscord, events: List[dict], speed: Optional[float], settle: float) -> dict:
+    bot.outbound.start()
+    lag_probe = asyncio.create_task(bot.metrics.run_lag_probe(0.05))
+    writes_before = {k: h.count for k, h in bot.metrics.writes.items()}
+    injected: Dict[int, float] = {}
+    kinds: Dict[int, str] = {}
+    message_ids: Dict[int, int] = {}
+    handler_done: Dict[int, float] = {}
+    tasks = []
+    start = time.perf_counter()
+    for i, e in enumerate(events):
+        if speed:
+            delay = start + e['t'] / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+        coro, kind = make_event(bot, fake, e)
+        if coro is None:
+            continue
+        _current_event.set(i)
+        injected[i], kinds[i] = time.perf_counter(), kind
+        if kind in ('reply', 'message'):
+            message_ids[i] = e['id']
+        task = asyncio.create_task(coro)
+        task.add_done_callback(lambda _t, i=i: handler_done.__setitem__(i, time.perf_counter()))
+        tasks.append(task)
+    _current_event.set(None)
+    injected_s = time.perf_counter() - start
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    # Let coalesced reactions fire and the outbound queue drain
+    deadline = time.perf_counter() + settle
+    while time.perf_counter() < deadline and (bot.outbound.in_flight() or bot.reaction_batcher.pending()):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(max(fake.latency * 3, 0.1))
+    total_s = time.perf_counter() - start
+    bot.storage.flush()
+    lag_probe.cancel()
+
+    acks: Dict[str, List[float]] = defaultdict(list)
+    handlers: Dict[str, List[float]] = defaultdict(list)
+    pending_dm: Dict[int, List[float]] = defaultdict(list)
+    for i, kind in kinds.items():
+        if i in handler_done:
+            handlers[kind].append(handler_done[i] - injected[i])
+        if kind == 'reply' and message_ids[i] in fake.acks:
+            acks['reply'].append(fake.acks[message_ids[i]] - injected[i])
+        elif kind == 'command' and i in fake.first_reply:
+            acks['command'].append(fake.first_reply[i] - injected[i])
+        elif kind == 'reaction':
+            pending_dm[events[i]['u']].append(injected[i])
+    for user_id, times in pending_dm.items():
+        # Each reaction is acknowledged by the first coalesced DM sent after it
+        dms = sorted(fake.dms.get(user_id, ()))
+        for t in times:
+            sent = next((d for d in dms if d >= t), None)
+            if sent is not None:
+                acks['reaction'].append(sent - t)
+    writes = {k: h.count - writes_before.get(k, 0) for k, h in bot.metrics.writes.items()}
+    return {
+        'events': len(kinds),
+        'by_kind': dict(Counter(kinds.values())),
+        'handler_errors': len(errors),
+        'inject_s': round(injected_s, 2),
+        'total_s': round(total_s, 2),
+        'events_per_s': round(len(kinds) / injected_s, 1) if injected_s else None,
+        'ack_latency': {k: percentiles(v) for k, v in sorted(acks.items())},
+        'unacked_replies': sum(1 for i, k in kinds.items() if k == 'reply' and message_ids[i] not in fake.acks),
+        'unacked_reactions': sum(1 for i, k in kinds.items() if k == 'reaction') - len(acks['reaction']),
+        'outbound_backlog': bot.outbound.in_flight(),
+        'handler_latency': {k: percentiles(v) for k, v in sorted(handlers.items())},
+        'store_writes': {k: v for k, v in sorted(writes.items()) if v},
+        'api_calls': dict(sorted(fake.calls.items())),
+        'api_calls_total': sum(fake.calls.values()),
+        'outbound_rate_limited': bot.outbound.rate_limited,
+        'loop_lag_max_ms': round(bot.metrics.loop_lag.max * 1000, 1),
+        'users': bot.storage.user_count(),
+    }
+
+
+def print_report(r: dict, label: str):
+    print(f"{label}: {r['events']} events {r['by_kind']} injected in {r['inject_s']}s "
+          f"({r['events_per_s']}/s), settled after {r['total_s']}s, {r['handler_errors']} handler errors")
+    for title, key in (('ack', 'ack_latency'), ('handler', 'handler_latency')):
+        for kind, p in r[key].items():
+            if p.get('n'):
+                print(f"  {title:<8}{kind:<11} n={p['n']:<6} p50 {p['p50_ms']:>9} ms  p95 {p['p95_ms']:>9} ms  "
+                      f"p99 {p['p99_ms']:>9} ms  max {p['max_ms']:>9} ms")
+    print(f"  unacked replies {r['unacked_replies']} · unacked reactions {r['unacked_reactions']} · "
+          f"outbound backlog {r['outbound_backlog']} · users stored {r['users']} · loop lag max {r['loop_lag_max_ms']} ms")
+    print(f"  store writes {r['store_writes']}")
+    print(f"  API calls {r['api_calls_total']} {r['api_calls']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Record/replay load test against a fake Discord")
+    sub = ap.add_subparsers(dest='cmd', required=True)
+    gen = sub.add_parser('generate', help="write a synthetic Sunday-rush trace")
+    gen.add_argument('--users', type=int, default=10000)
+    gen.add_argument('--seed', type=int, default=7)
+    gen.add_argument('--mean-delay', type=float, default=300.0, help="mean seconds from poll to a user's first action")
+    gen.add_argument('--out', required=True)
+    run = sub.add_parser('run', help="replay a trace through the bot")
+    run.add_argument('trace', nargs='?', help="trace file (gzip JSON lines)")
+    run.add_argument('--synthetic', type=int, metavar='USERS', help="replay a generated rush instead of a file")
+    run.add_argument('--seed', type=int, default=7)
+    run.add_argument('--speed', default='max', help="1, 10, … (times real time) or max")
+    run.add_argument('--api-latency', type=float, default=0.05, help="seconds each fake REST call takes")
+    run.add_argument('--settle', type=float, default=120.0, help="max seconds to wait for queued work after the last event")
+    run.add_argument('--output', help="write the report as JSON here")
+    args = ap.parse_args()
+
+    if args.cmd == 'generate':
+        header, events = synthetic.rush_trace(args.users, DEFAULT_CHANNELS, seed=args.seed, mean_delay=args.mean_delay)
+        n = write_trace(args.out, header, events)
+        print(f"{args.out}: {n} events over {events[-1]['t'] if events else 0:.0f}s, "
+              f"{os.path.getsize(args.out) / 1024:.0f} KB")
+        return 0
+
+    if args.trace:
+        header, events = read_trace(args.trace)
+        games, label = header['games'], os.path.basename(args.trace)
+    elif args.synthetic:
+        games, events = synthetic.rush_trace(args.synthetic, DEFAULT_CHANNELS, seed=args.seed)
+        label = f"synthetic rush ({args.synthetic} users)"
+    else:
+        ap.error("run needs a trace file or --synthetic USERS")
+    speed = None if args.speed == 'max' else float(args.speed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = import_bot(workdir, games)
+        fake = FakeDiscord(args.api_latency)
+        wire(bot, fake, games)
+        report = asyncio.run(replay(bot, fake, events, speed, args.settle))
+        report.update(trace=label, speed=args.speed, api_latency=args.api_latency,
+                      backend=bot.storage.name, durability=bot.DURABILITY_MODE)
+        bot.save_on_exit()
+    print_report(report, f"{label} at {'max speed' if speed is None else f'{args.speed}x'}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if not report['handler_errors'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
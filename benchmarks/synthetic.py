@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Synthetic data — users × games × days with a realistic tz mix
+# =========================================================
+# Deterministic for a given seed so runs are comparable.
+# =========================================================
+
+import random
+from typing import Dict, Iterable, List, Tuple
+
+DAYS = ['Monday', 'Mon', 'Tuesday', 'Tue', 'Wednesday', 'Wed', 'Thursday', 'Thu',
+        'Friday', 'Fri', 'Saturday', 'Sat', 'Sunday', 'Sun']
+MESSAGE_TZS = ['EST', 'PST', 'GMT', 'JST', 'PHT', 'CET', 'Asia/Manila', 'America/New_York', 'UTC']
+
+# Roughly the server's mix: SEA-heavy, then US, then Europe, a long tail elsewhere
+TZ_WEIGHTS = [
+    ('Asia/Manila', 30), ('America/New_York', 14), ('America/Los_Angeles', 10),
+    ('America/Chicago', 6), ('Europe/London', 8), ('Europe/Berlin', 6),
+    ('Asia/Singapore', 5), ('Asia/Tokyo', 4), ('Australia/Sydney', 4),
+    ('Asia/Kolkata', 3), ('America/Sao_Paulo', 3), ('UTC', 3),
+    ('Pacific/Auckland', 2), ('Asia/Kathmandu', 1), ('Africa/Lagos', 1),
+]
+_TZ_NAMES = [tz for tz, _ in TZ_WEIGHTS]
+_TZ_CUM = []
+_acc = 0
+for _, _w in TZ_WEIGHTS:
+    _acc += _w
+    _TZ_CUM.append(_acc)
+
+
+def _entry(rng: random.Random, tz: str) -> list:
+    """Mostly evening spans, some afternoon and past-midnight ones; every fifth entry carries its own tz."""
+    start_h = rng.choice([13, 15, 17, 18, 18, 19, 19, 20, 20, 21, 22])
+    start_m = rng.choice([0, 0, 0, 30])
+    length = rng.choice([60, 120, 120, 180, 180, 240, 300])
+    end = (start_h * 60 + start_m + length) % 1440
+    return [f"{start_h:02d}:{start_m:02d}", f"{end // 60:02d}:{end % 60:02d}", tz if rng.random() < 0.2 else '']
+
+
+def generate(n_users: int, games: Iterable[str], seed: int = 42,
+             game_share: float = 0.7) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """
+    Build (availability, user_tzs) in the bot's on-disk layout for ``n_users``.
+
+    Each user is in each game with probability ``game_share`` (at least one game)
+    and lists 2–5 days per game.
+    """
+    rng = random.Random(seed)
+    games = list(games)
+    avail: Dict[str, dict] = {}
+    tzs: Dict[str, str] = {}
+    for i in range(n_users):
+        uid = str(100000000000000000 + i * 7919)
+        tz = rng.choices(_TZ_NAMES, cum_weights=_TZ_CUM)[0]
+        tzs[uid] = tz
+        joined = [g for g in games if rng.random() < game_share] or [rng.choice(games)]
+        user = {}
+        for game in joined:
+            days = rng.sample(range(7), rng.randint(2, 5))
+            user[game] = {str(d): _entry(rng, tz) for d in sorted(days)}
+        avail[uid] = user
+    return avail, tzs
+
+
+def legacy_layout(avail: Dict[str, dict]) -> Dict[str, dict]:
+    """The pre-multi-game layout ({user: {day: [...]}}) using each user's first game."""
+    return {uid: next(iter(user.values())) for uid, user in avail.items() if user}
+
+
+def messages(count: int, seed: int = 1) -> List[str]:
+    """Availability replies in the shapes people actually type."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        parts = []
+        for day in rng.sample(DAYS, rng.randint(1, 4)):
+            a = rng.randint(1, 10)
+            b = rng.randint(a + 1, 11)
+            parts.append(rng.choice([
+                f"{day} {a}-{b} PM", f"{day} {a}pm-{b}pm", f"{day} {a}:30-{b}:00 PM",
+                f"{day} {a + 12}:00-{b + 12}:00", f"{day} {a} to {b} pm",
+            ]))
+        msg = rng.choice([', ', '\n', '; ']).join(parts)
+        if rng.random() < 0.3:
+            msg += ' ' + rng.choice(MESSAGE_TZS)
+        out.append(msg)
+    return out
+
+
+REACTION_EMOJIS = ['1️⃣', '2️⃣', '3️⃣', '4️⃣', '5️⃣', '6️⃣', '7️⃣']
+# What a poll's crowd does: (share of users, action)
+RUSH_MIX = [(0.55, 'react'), (0.33, 'reply'), (0.03, 'bad_reply'), (0.05, 'settz'),
+            (0.025, 'mycalendar'), (0.015, 'summary')]
+_DISCORD_EPOCH_MS = 1420070400000
+
+
+def _snowflake(ms: float, seq: int) -> int:
+    return (int(ms) - _DISCORD_EPOCH_MS) << 22 | (seq & 0x3FFFFF)
+
+
+def rush_trace(n_users: int, games: Dict[str, int], seed: int = 7, guild_id: int = 1,
+               mean_delay: float = 300.0, duration: float = 1800.0) -> Tuple[Dict[str, dict], List[dict]]:
+    """
+    A Sunday rush as an event trace: ``games`` maps game -> poll channel ID.
+    Users arrive exponentially after the polls go up (mean ``mean_delay``
+    seconds, cut at ``duration``) and each reacts, replies or runs a command
+    per RUSH_MIX. Returns (trace games header, events sorted by time).
+    """
+    rng = random.Random(seed)
+    now_ms = 1760918400000  # a Sunday 00:00 UTC
+    seq = iter(range(1, 1 << 30))
+    header = {game: {'channel': ch, 'poll_msg': f"{game} Weekly Availability", 'guild': guild_id,
+                     'poll': _snowflake(now_ms, next(seq))} for game, ch in games.items()}
+    texts = messages(max(1, n_users // 2), seed=seed)
+    actions, shares = [a for _, a in RUSH_MIX], [s for s, _ in RUSH_MIX]
+    events = []
+    keys = list(games)
+    for i in range(n_users):
+        uid = 200000000000000000 + i * 7919
+        name = f"player{i}"
+        game = keys[0] if rng.random() < 0.7 or len(keys) == 1 else rng.choice(keys[1:])
+        ch, poll = games[game], header[game]['poll']
+        t = min(rng.expovariate(1.0 / mean_delay), duration)
+        action = rng.choices(actions, weights=shares)[0]
+        if action == 'react':
+            days = rng.sample(REACTION_EMOJIS, rng.randint(1, 4))
+            for emoji in days:
+                t += rng.uniform(0.3, 2.5)
+                events.append({'t': t, 'k': 'ra', 'ch': ch, 'm': poll, 'g': guild_id, 'u': uid, 'n': name, 'e': emoji})
+            if rng.random() < 0.1:
+                t += rng.uniform(5, 60)
+                events.append({'t': t, 'k': 'rr', 'ch': ch, 'm': poll, 'g': guild_id, 'u': uid, 'e': days[0]})
+            continue
+        if action in ('reply', 'bad_reply'):
+            content = rng.choice(texts) if action == 'reply' else rng.choice(['maybe later', 'idk yet', 'lol'])
+            ref = poll
+        else:
+            content = {'settz': f"!settz {rng.choice(MESSAGE_TZS)}", 'mycalendar': f"!mycalendar {game.lower()}",
+                       'summary': f"!summary {game.lower()}"}[action]
+            ref = None
+        events.append({'t': t, 'k': 'm', 'ch': ch, 'g': guild_id, 'u': uid, 'n': name, 'c': content, 'r': ref})
+    events.sort(key=lambda e: e['t'])
+    for e in events:
+        e['t'] = round(e['t'], 3)
+        if e['k'] == 'm':
+            e['id'] = _snowflake(now_ms + e['t'] * 1000, next(seq))
+            if e['r'] is None:
+                del e['r']
+    return header, events
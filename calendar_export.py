@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Calendar Export — cached VEVENT blocks + streamed .ics
+# =========================================================
+# Event bodies are cached per (user, game, week) and dropped
+# when that user's data changes; calendars are produced by
+# generators so a team export never builds one big string.
+# =========================================================
+
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from tzconvert import WeekConverter
+
+# One filled day as the availability model hands it out: (day, start minute, end minute, tz or '')
+DayEntry = Tuple[int, int, int, str]
+
+ICS_HEADER = "BEGIN:VCALENDAR\nVERSION:2.0\nPRODID:-//AvailabilityBot//EN\n"
+ICS_FOOTER = "END:VCALENDAR"
+# Exports larger than this spill from memory to a temp file
+EXPORT_MEMORY_BUDGET = 4 * 1024 * 1024
+
+
+class VEventCache:
+    """
+    LRU of per-(user, game, week) event cores: the UID/DTSTART/DTEND lines of
+    every entry, ready to be wrapped with a SUMMARY at export time. Exports run
+    on a worker thread while the loop invalidates, so access takes a lock.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, str, object], Tuple[str, ...]]" = OrderedDict()
+        self._by_user: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        # Bumped per invalidation; a put built from data older than the user's
+        # last invalidation is dropped instead of caching stale events
+        self.epoch = 0
+        self._user_epoch: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[Tuple[str, ...]]:
+        with self._lock:
+            cores = self._cache.get(key)
+            if cores is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cores
+
+    def put(self, key, cores: Tuple[str, ...], epoch: Optional[int] = None):
+        with self._lock:
+            if epoch is not None and self._user_epoch.get(key[0], -1) > epoch:
+                return
+            self._cache[key] = cores
+            self._cache.move_to_end(key)
+            self._by_user.setdefault(key[0], set()).add(key)
+            while len(self._cache) > self.max_entries:
+                old, _ = self._cache.popitem(last=False)
+                keys = self._by_user.get(old[0])
+                if keys is not None:
+                    keys.discard(old)
+                    if not keys:
+                        self._by_user.pop(old[0], None)
+
+    def invalidate(self, user_id: str, game: Optional[str] = None):
+        with self._lock:
+            self.epoch += 1
+            self._user_epoch[user_id] = self.epoch
+            keys = self._by_user.get(user_id)
+            if not keys:
+                return
+            for key in list(keys):
+                if game is None or key[1] == game:
+                    self._cache.pop(key, None)
+                    keys.discard(key)
+            if not keys:
+                self._by_user.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class IcsBuilder:
+    """Formats one poll week's events; UTC stamps come from integer minutes via WeekConverter."""
+
+    def __init__(self, converter: WeekConverter, cache: VEventCache, bot_id):
+        self.converter = converter
+        self.cache = cache
+        self.bot_id = bot_id
+        # Taken when the data snapshot is, i.e. on the loop before any worker runs
+        self.epoch = cache.epoch
+        self._dates: Dict[int, str] = {}
+
+    def _stamp(self, minute: int) -> str:
+        day, rem = divmod(minute, 1440)
+        date_str = self._dates.get(day)
+        if date_str is None:
+            date_str = self._dates[day] = (self.converter.monday + timedelta(days=day)).strftime('%Y%m%d')
+        return f"{date_str}T{rem // 60:02d}{rem % 60:02d}00Z"
+
+    def event_cores(self, user_id: str, game: str, entries: Sequence[DayEntry], fallback_tz: str) -> Tuple[str, ...]:
+        key = (user_id, game, self.converter.monday)
+        cores = self.cache.get(key)
+        if cores is not None:
+            return cores
+        built: List[str] = []
+        for di, start, end, stored_tz in entries:
+            try:
+                start_min, end_min = self.converter.span_to_utc(di, start, end, stored_tz or fallback_tz)
+            except Exception:
+                continue
+            built.append(
+                f"UID:{user_id}-{game}-{di}@{self.bot_id}\n"
+                f"DTSTART:{self._stamp(start_min)}\n"
+                f"DTEND:{self._stamp(end_min)}\n"
+            )
+        cores = tuple(built)
+        self.cache.put(key, cores, self.epoch)
+        return cores
+
+    @staticmethod
+    def _events(cores: Iterable[str], summary: str) -> Iterator[str]:
+        for core in cores:
+            yield f"BEGIN:VEVENT\n{core}SUMMARY:{summary}\nEND:VEVENT\n"
+
+    def iter_user_calendar(self, user_id: str, game: str, entries: Sequence[DayEntry], fallback_tz: str) -> Iterator[str]:
+        yield ICS_HEADER
+        yield from self._events(self.event_cores(user_id, game, entries, fallback_tz), f"{game} Available")
+        yield ICS_FOOTER
+
+    def iter_team_calendar(self, game: str, users: Iterable[Tuple[str, Sequence[DayEntry], str]],
+                           name_for: Callable[[str], str]) -> Iterator[str]:
+        """``users`` yields (user_id, entries, fallback_tz) lazily; one VEVENT per entry."""
+        yield ICS_HEADER
+        for user_id, entries, fallback_tz in users:
+            cores = self.event_cores(user_id, game, entries, fallback_tz)
+            if cores:
+                yield from self._events(cores, f"{game}: {name_for(user_id)}")
+        yield ICS_FOOTER
+
+
+def spool_chunks(chunks: Iterable[str], budget: int = EXPORT_MEMORY_BUDGET) -> IO[bytes]:
+    """Write text chunks into a buffer that stays in memory up to ``budget`` bytes, then spills to disk."""
+    buf = tempfile.SpooledTemporaryFile(max_size=budget)
+    for chunk in chunks:
+        buf.write(chunk.encode())
+    buf.seek(0)
+    return buf
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Reaction Coalescer — one update per burst of poll taps
+# =========================================================
+# Tapping 1️⃣..5️⃣ fires five reaction events; they are folded
+# per (user, game) and applied together once the user has
+# been quiet for a short window.
+# =========================================================
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger('availability_bot')
+
+# apply(user_id, game, {day: True (added) / False (removed)}, user)
+ApplyFn = Callable[[str, str, Dict[int, bool], object], Awaitable[None]]
+
+
+class _Pending:
+    __slots__ = ('user', 'days', 'first', 'handle')
+
+    def __init__(self, user, first: float):
+        self.user = user
+        self.days: Dict[int, bool] = {}
+        self.first = first
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class ReactionCoalescer:
+    """
+    Buffers day toggles per (user_id, game). The last toggle of a day wins, so
+    add-then-remove inside one window cancels out. A key is flushed ``window``
+    seconds after its latest toggle, or ``max_wait`` after its first one so
+    constant tapping still gets applied.
+    """
+
+    def __init__(self, apply: ApplyFn, window: float = 3.0, max_wait: Optional[float] = None):
+        self.apply = apply
+        self.window = window
+        self.max_wait = max_wait if max_wait is not None else window * 4
+        self._pending: Dict[Tuple[str, str], _Pending] = {}
+        self._running: Set[asyncio.Task] = set()
+        self.events = 0
+        self.batches = 0
+
+    def add(self, user, game: str, day: int):
+        self._toggle(user, game, day, True)
+
+    def remove(self, user, game: str, day: int):
+        self._toggle(user, game, day, False)
+
+    def _toggle(self, user, game: str, day: int, on: bool):
+        loop = asyncio.get_running_loop()
+        key = (str(user.id), game)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(user, loop.time())
+        pending.user = user
+        pending.days[day] = on
+        self.events += 1
+        if pending.handle is not None:
+            pending.handle.cancel()
+        delay = min(self.window, max(0.0, pending.first + self.max_wait - loop.time()))
+        pending.handle = loop.call_later(delay, self._fire, key)
+
+    def _fire(self, key: Tuple[str, str]):
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        task = asyncio.create_task(self._run(key, pending))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, key: Tuple[str, str], pending: _Pending):
+        self.batches += 1
+        try:
+            await self.apply(key[0], key[1], pending.days, pending.user)
+        except Exception as e:
+            logger.error(f"Applying reactions for {key[0]} ({key[1]}) failed: {e}")
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def drain(self) -> List[Tuple[str, str, Dict[int, bool]]]:
+        """Cancel all timers and return the unapplied toggles (used on shutdown)."""
+        out = []
+        for (user_id, game), pending in self._pending.items():
+            if pending.handle is not None:
+                pending.handle.cancel()
+            out.append((user_id, game, pending.days))
+        self._pending.clear()
+        return out
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Event Trace — compact record of handled gateway events
+# =========================================================
+# With AVAIL_TRACE_FILE set the bot appends every message
+# and poll reaction it handles (and every poll it posts) to
+# a gzipped JSON-lines file; benchmarks/replay.py plays the
+# file back against a fake Discord. Each start writes a
+# header line (games, channels, current polls) followed by
+# events timed in seconds from that header:
+#   {"t": 1.25, "k": "m", "id", "ch", "g", "u", "n", "c", "r"}   message (r = replied-to ID)
+#   {"t": 1.30, "k": "ra" | "rr", "ch", "m", "g", "u", "n", "e"} reaction add / remove
+#   {"t": 9.00, "k": "p", "game", "ch", "id"}                    poll posted
+# Traces hold message text and user IDs: record only when
+# needed and treat the file like the data directory.
+# =========================================================
+
+import gzip
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TRACE_VERSION = 1
+
+
+class TraceRecorder:
+    """Appends events to ``path``; lines are small and gzip buffers them, so a write costs microseconds."""
+
+    def __init__(self, path: str, games: Dict[str, dict]):
+        self.path = path
+        self._f = gzip.open(path, 'at', encoding='utf-8')
+        self._start = time.monotonic()
+        self.events = 0
+        self._write({'trace': TRACE_VERSION, 'started': time.time(), 'games': games})
+
+    def _write(self, record: dict):
+        self._f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+    def _event(self, kind: str, **fields):
+        fields = {k: v for k, v in fields.items() if v is not None}
+        self._write({'t': round(time.monotonic() - self._start, 3), 'k': kind, **fields})
+        self.events += 1
+
+    def message(self, message):
+        guild = getattr(message, 'guild', None)
+        ref = message.reference.message_id if message.reference else None
+        self._event('m', id=message.id, ch=message.channel.id, g=guild.id if guild else None,
+                    u=message.author.id, n=getattr(message.author, 'display_name', None),
+                    c=message.content, r=ref)
+
+    def reaction(self, payload, added: bool):
+        member = getattr(payload, 'member', None)
+        self._event('ra' if added else 'rr', ch=payload.channel_id, m=payload.message_id, g=payload.guild_id,
+                    u=payload.user_id, n=member.display_name if member is not None else None,
+                    e=str(payload.emoji))
+
+    def poll(self, game: str, channel_id: int, message_id: int):
+        self._event('p', game=game, ch=channel_id, id=message_id)
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+def read_trace(path: str) -> Tuple[dict, List[dict]]:
+    """
+    (header, events) for a trace. A file appended to across restarts holds
+    several segments; they are played back to back, each starting just
+    after the previous one's last event, under the first header (later
+    headers' games are merged in, their polls come through as poll events).
+    """
+    header: Optional[dict] = None
+    events: List[dict] = []
+    offset = 0.0
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'trace' in record:
+                if header is None:
+                    header = record
+                else:
+                    offset = events[-1]['t'] + 0.001 if events else offset
+                    for game, cfg in record['games'].items():
+                        header['games'].setdefault(game, cfg)
+                        if cfg.get('poll'):
+                            events.append({'t': offset, 'k': 'p', 'game': game, 'ch': cfg['channel'], 'id': cfg['poll']})
+                continue
+            if offset:
+                record['t'] = round(record['t'] + offset, 3)
+            events.append(record)
+    if header is None:
+        raise ValueError(f"{path} is not an event trace (no header)")
+    return header, events
+
+
+def write_trace(path: str, games: Dict[str, dict], events: Iterable[dict]) -> int:
+    """Write a whole trace (synthetic ones); returns the number of events."""
+    n = 0
+    tmp = path + '.tmp'
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        f.write(json.dumps({'trace': TRACE_VERSION, 'started': time.time(), 'games': games}) + '\n')
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+            n += 1
+    os.replace(tmp, path)
+    return n
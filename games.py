@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Game Registry — runtime-configurable games per guild
+# =========================================================
+# Games live in games.json (seeded from the built-in config
+# on first start) and are edited with admin commands. The
+# registry keeps channel → game and guild → games indexes so
+# event routing is a dict lookup however many games exist.
+# Retired games stop routing but keep their key reserved so
+# their saved availability is never mistaken for legacy data.
+# Built-in games are shared by every server, so only the bot
+# owner may change them.
+# =========================================================
+
+import logging
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from storage import load_json, write_json_atomic
+
+logger = logging.getLogger('availability_bot')
+
+GAME_KEY_RE = re.compile(r'^[A-Z0-9_]{2,16}$')
+
+
+class GameRegistry:
+    """
+    Behaves like the old ``GAMES`` dict over *active* games
+    (``in``, ``[]``, ``get``, ``keys``, ``items``, ``len``) and adds
+    O(1) ``by_channel`` routing plus guild scoping. A game with
+    ``guild`` None (the built-in ones) is visible in every guild.
+    A game moved while its poll is live keeps that channel routed
+    (``poll_channel``) until the next poll is posted.
+    Mutations persist immediately; they are rare.
+    """
+
+    def __init__(self, fname: str, defaults: Dict[str, dict]):
+        self.fname = fname
+        self.defaults = defaults
+        self._games: Dict[str, dict] = {}
+        self._by_channel: Dict[int, str] = {}
+        self._by_guild: Dict[Optional[int], Tuple[str, ...]] = {}
+
+    def load(self):
+        data = load_json(self.fname).get('games')
+        if not data:
+            data = {key: dict(cfg, guild=cfg.get('guild'), active=True) for key, cfg in self.defaults.items()}
+            logger.info(f"Seeding {self.fname} with {len(data)} built-in games")
+        self._games = data
+        self._reindex()
+        if not os.path.exists(self.fname):
+            self._save()
+
+    def _save(self):
+        write_json_atomic(self.fname, {'games': self._games}, indent=2)
+
+    def _reindex(self):
+        # Built fresh and swapped in, so readers never see a half-updated index
+        by_channel: Dict[int, str] = {}
+        by_guild: Dict[Optional[int], List[str]] = {}
+        for key, cfg in self._games.items():
+            if not cfg.get('active', True):
+                continue
+            by_channel[cfg['channel']] = key
+            if cfg.get('poll_channel') is not None:
+                by_channel.setdefault(cfg['poll_channel'], key)
+            by_guild.setdefault(cfg.get('guild'), []).append(key)
+        self._by_channel = by_channel
+        self._by_guild = {g: tuple(keys) for g, keys in by_guild.items()}
+
+    # -----------------------
+    # Dict-style access (active games)
+    # -----------------------
+    def _active(self, key: str) -> Optional[dict]:
+        cfg = self._games.get(key)
+        return cfg if cfg is not None and cfg.get('active', True) else None
+
+    def __contains__(self, key) -> bool:
+        return self._active(key) is not None
+
+    def __getitem__(self, key: str) -> dict:
+        cfg = self._active(key)
+        if cfg is None:
+            raise KeyError(key)
+        return cfg
+
+    def get(self, key: str, default=None):
+        cfg = self._active(key)
+        return default if cfg is None else cfg
+
+    def keys(self) -> List[str]:
+        return [k for k in self._games if self._active(k) is not None]
+
+    def items(self) -> List[Tuple[str, dict]]:
+        return [(k, cfg) for k, cfg in self._games.items() if cfg.get('active', True)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self._by_channel)
+
+    def all_keys(self) -> List[str]:
+        """Every key ever registered, retired ones included (for data migration)."""
+        return list(self._games)
+
+    # -----------------------
+    # Routing & scoping
+    # -----------------------
+    def by_channel(self, channel_id: int) -> Optional[str]:
+        return self._by_channel.get(channel_id)
+
+    def poll_channel(self, key: str) -> Optional[int]:
+        """Channel holding the game's live poll: its old one if it moved since that poll was posted."""
+        cfg = self._active(key)
+        if cfg is None:
+            return None
+        return cfg.get('poll_channel') or cfg['channel']
+
+    def for_guild(self, guild_id: Optional[int]) -> Tuple[str, ...]:
+        """Active games usable in ``guild_id``: its own plus the global ones."""
+        own = self._by_guild.get(guild_id, ()) if guild_id is not None else ()
+        return own + self._by_guild.get(None, ())
+
+    def visible(self, key: str, guild_id: Optional[int]) -> bool:
+        cfg = self._active(key)
+        return cfg is not None and cfg.get('guild') in (None, guild_id)
+
+    def resolve(self, name: Optional[str], guild_id: Optional[int], channel_id: Optional[int] = None) -> Optional[str]:
+        """
+        Game key for a command argument. Without ``name``: the channel's game,
+        else the guild's first game. Returns None if the game is unknown here.
+        """
+        if name:
+            key = name.upper()
+            return key if self.visible(key, guild_id) else None
+        key = self.by_channel(channel_id) if channel_id is not None else None
+        if key:
+            return key
+        scoped = self.for_guild(guild_id)
+        return scoped[0] if scoped else None
+
+    # -----------------------
+    # Admin mutations
+    # -----------------------
+    def _editable(self, key: str, guild_id: Optional[int], is_owner: bool) -> dict:
+        if not self.visible(key, guild_id):
+            raise ValueError(f"No active game {key} here")
+        cfg = self._games[key]
+        if cfg.get('guild') is None and not is_owner:
+            raise ValueError(f"{key} is shared by every server; only the bot owner can change it")
+        return cfg
+
+    def _check_channel(self, key: str, channel_id: int):
+        owner = self.by_channel(channel_id)
+        if owner and owner != key:
+            raise ValueError(f"Channel is already used by {owner}")
+
+    def add(self, key: str, channel_id: int, poll_msg: str, guild_id: Optional[int],
+            is_owner: bool = False) -> dict:
+        key = key.upper()
+        if not GAME_KEY_RE.match(key):
+            raise ValueError("Game keys are 2-16 letters, digits or underscores")
+        self._check_channel(key, channel_id)
+        existing = self._games.get(key)
+        if existing is not None and existing.get('guild') not in (None, guild_id):
+            raise ValueError(f"{key} belongs to another server")
+        guild = existing.get('guild') if existing else guild_id
+        if guild is None and not is_owner:
+            raise ValueError(f"{key} would be shared by every server; only the bot owner can add it")
+        cfg = {'channel': channel_id, 'poll_msg': poll_msg or f"{key} Weekly Availability",
+               'guild': guild, 'active': True}
+        self._games[key] = cfg
+        self._reindex()
+        self._save()
+        return cfg
+
+    def update(self, key: str, guild_id: Optional[int], is_owner: bool = False, **fields) -> dict:
+        key = key.upper()
+        cfg = self._editable(key, guild_id, is_owner)
+        cfg.update(fields)
+        self._reindex()
+        self._save()
+        return cfg
+
+    def move(self, key: str, channel_id: int, guild_id: Optional[int], live_poll: bool,
+             is_owner: bool = False) -> dict:
+        """Point the game at ``channel_id``; with a ``live_poll``, its old channel stays routed for it."""
+        key = key.upper()
+        cfg = self._editable(key, guild_id, is_owner)
+        self._check_channel(key, channel_id)
+        if live_poll and 'poll_channel' not in cfg:
+            cfg['poll_channel'] = cfg['channel']
+        cfg['channel'] = channel_id
+        if cfg.get('poll_channel') == channel_id:
+            del cfg['poll_channel']
+        self._reindex()
+        self._save()
+        return cfg
+
+    def poll_posted(self, key: str):
+        """A new poll went out in the game's channel: stop routing the one it moved from."""
+        cfg = self._games.get(key)
+        if cfg is not None and cfg.pop('poll_channel', None) is not None:
+            self._reindex()
+            self._save()
+
+    def retire(self, key: str, guild_id: Optional[int], is_owner: bool = False) -> dict:
+        return self.update(key, guild_id, is_owner, active=False)
+
+    def describe(self, guild_id: Optional[int]) -> List[str]:
+        lines = []
+        for key, cfg in self._games.items():
+            if cfg.get('guild') not in (None, guild_id):
+                continue
+            state = '' if cfg.get('active', True) else ' (retired)'
+            scope = 'all servers' if cfg.get('guild') is None else 'this server'
+            schedule = f" · polls {cfg['schedule']} UTC" if cfg.get('schedule') else ''
+            lines.append(f"{key}{state} · <#{cfg['channel']}> · {scope} · {cfg['poll_msg']}{schedule}")
+        return lines
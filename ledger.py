@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Poll Ledger — who replied/reacted to which poll
+# =========================================================
+# Recorded at ingest time so !clear can delete exactly the
+# user's replies and reactions without re-reading history.
+# =========================================================
+
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from storage import WriteBehindFile, load_json
+
+
+class PollLedger:
+    """
+    Persisted ``game -> poll_id -> user_id -> {"replies": [...], "reactions": [...]}``.
+
+    Poll and message IDs are stored as strings (JSON keys); reply IDs as ints.
+    Only the polls registered for a game are kept, older ones are pruned
+    when a new poll opens. Records for a poll that was never registered
+    (posted before the ledger existed, or its file was lost) are ignored,
+    so ``has_poll`` stays False and !clear falls back to a history scan.
+    """
+
+    def __init__(self, fname: str, max_delay: float = 2.0, durability: str = 'batch'):
+        self.lock = threading.RLock()
+        self.data: dict = load_json(fname)
+        self._writer = WriteBehindFile(fname, lambda: self.data, self.lock, max_delay, durability)
+
+    def _user(self, game: str, poll_id: int, user_id: str) -> Optional[dict]:
+        users = self.data.get(game, {}).get(str(poll_id))
+        if users is None:
+            return None
+        return users.setdefault(user_id, {"replies": [], "reactions": []})
+
+    def open_poll(self, game: str, poll_id: int, keep: int = 1):
+        """Register a new poll, keeping the ``keep`` most recent older ones."""
+        with self.lock:
+            polls = self.data.setdefault(game, {})
+            polls.setdefault(str(poll_id), {})
+            for old in sorted(polls, key=int)[:-(keep + 1)]:
+                polls.pop(old, None)
+        self._writer.mark_dirty()
+
+    def has_poll(self, game: str, poll_id: int) -> bool:
+        with self.lock:
+            return str(poll_id) in self.data.get(game, {})
+
+    def record_reply(self, game: str, poll_id: int, user_id: str, message_id: int):
+        with self.lock:
+            entry = self._user(game, poll_id, user_id)
+            if entry is None or message_id in entry["replies"]:
+                return
+            entry["replies"].append(message_id)
+        self._writer.mark_dirty()
+
+    def record_reaction(self, game: str, poll_id: int, user_id: str, emoji: str):
+        with self.lock:
+            entry = self._user(game, poll_id, user_id)
+            if entry is None or emoji in entry["reactions"]:
+                return
+            entry["reactions"].append(emoji)
+        self._writer.mark_dirty()
+
+    def forget_reaction(self, game: str, poll_id: int, user_id: str, emoji: str):
+        with self.lock:
+            entry = self.data.get(game, {}).get(str(poll_id), {}).get(user_id)
+            if entry and emoji in entry["reactions"]:
+                entry["reactions"].remove(emoji)
+        self._writer.mark_dirty()
+
+    def reactors(self, game: str, poll_id: int) -> Dict[str, Set[str]]:
+        """emoji -> user IDs recorded as reacting on this poll."""
+        out: Dict[str, Set[str]] = {}
+        with self.lock:
+            for user_id, entry in self.data.get(game, {}).get(str(poll_id), {}).items():
+                for emoji in entry["reactions"]:
+                    out.setdefault(emoji, set()).add(user_id)
+        return out
+
+    def take(self, game: str, poll_id: int, user_id: str) -> Tuple[List[int], List[str]]:
+        """Remove and return (reply_ids, reaction_emojis) recorded for the user on this poll."""
+        with self.lock:
+            entry = self.data.get(game, {}).get(str(poll_id), {}).pop(user_id, None)
+        if entry is None:
+            return [], []
+        self._writer.mark_dirty()
+        return list(entry["replies"]), list(entry["reactions"])
+
+    def restore(self, game: str, poll_id: int, user_id: str, replies: List[int], reactions: List[str]):
+        """Put back items that could not be removed so a later clear can retry them."""
+        if not replies and not reactions:
+            return
+        with self.lock:
+            entry = self._user(game, poll_id, user_id)
+            if entry is None:
+                return
+            entry["replies"].extend(r for r in replies if r not in entry["replies"])
+            entry["reactions"].extend(e for e in reactions if e not in entry["reactions"])
+        self._writer.mark_dirty()
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
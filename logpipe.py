@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Log Pipeline — queued, structured, rotated, sampled
+# =========================================================
+# Callers only put a record on a bounded queue; a listener
+# thread formats and writes it. The log file gets one JSON
+# object per line (with the correlation ID of the event or
+# command that logged it) and rotates by size and by time,
+# gzipping old files in the listener thread. Chatty paths tag
+# records with a category that is rate-limited per second;
+# warnings and errors are never sampled.
+# =========================================================
+
+import contextvars
+import copy
+import gzip
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# (correlation ID, event/command name) of the handler currently running
+CORRELATION: contextvars.ContextVar[Optional[Tuple[str, str]]] = contextvars.ContextVar('correlation', default=None)
+_ids = itertools.count(1)
+_BOOT = f"{os.getpid():x}"
+
+# Attributes every LogRecord has; anything else was passed with extra= and is logged as a field
+_STANDARD = set(logging.LogRecord('', 0, '', 0, '', None, None).__dict__) | {'message', 'asctime'}
+
+
+def correlate(label: str) -> contextvars.Token:
+    """Start a new correlation ID for ``label``; tasks created from here inherit it."""
+    return CORRELATION.set((f"{_BOOT}-{next(_ids):x}", label))
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """``"clear=5,backfill=20"`` -> {category: records per second}."""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        category, _, rate = part.partition('=')
+        rates[category.strip()] = float(rate)
+    return rates
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the caller's correlation ID on the record (runs in the caller's context)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = CORRELATION.get()
+        if current is not None and not hasattr(record, 'cid'):
+            record.cid, record.event = current
+        return True
+
+
+class CategorySampler(logging.Filter):
+    """
+    At most ``rate`` records per second (bursts up to one second's worth)
+    for each category in ``rates``. The next record let through carries
+    ``suppressed`` = how many were dropped before it.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._buckets: Dict[str, list] = {}  # category -> [tokens, updated, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        category = getattr(record, 'category', None)
+        rate = self.rates.get(category) if category else None
+        if rate is None or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(category)
+            if bucket is None:
+                bucket = self._buckets[category] = [max(1.0, rate), now, 0]
+            bucket[0] = min(max(1.0, rate), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1.0
+            if bucket[2]:
+                record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the listener falls behind."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the message and traceback as separate fields for the JSON formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD and not key.startswith('_'):
+                out[key] = value
+        if record.exc_text:
+            out['exc'] = record.exc_text
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+def _gzip_rotate(source: str, dest: str):
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class RollingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotates when the file reaches ``max_bytes`` or at each ``interval``
+    boundary (86400 = UTC midnight), whichever comes first. Rotated files
+    are gzipped as name.1.gz … name.<backups>.gz.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, interval: float, backups: int):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=max(1, backups), encoding='utf-8', delay=True)
+        self.interval = interval
+        self.namer = lambda name: name + '.gz'
+        self.rotator = _gzip_rotate
+        self.rollover_at = self._next_boundary(time.time())
+
+    def _next_boundary(self, now: float) -> float:
+        return (now // self.interval + 1) * self.interval if self.interval > 0 else float('inf')
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self.rollover_at:
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                return True
+            # Nothing written since the last boundary: don't rotate an empty file
+            self.rollover_at = self._next_boundary(time.time())
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = self._next_boundary(time.time())
+
+
+class LogPipeline:
+    """The queue handler installed on the root logger plus the listener thread that drains it."""
+
+    def __init__(self, handler: BoundedQueueHandler, sampler: CategorySampler,
+                 listener: logging.handlers.QueueListener):
+        self.handler = handler
+        self.sampler = sampler
+        self.listener = listener
+        self._stopped = False
+
+    def depth(self) -> int:
+        return self.handler.queue.qsize()
+
+    def start(self):
+        if self.listener._thread is None and not self._stopped:
+            self.listener.start()
+
+    def stop(self):
+        """Write out everything queued (even if never started) and stop the listener; idempotent."""
+        if self._stopped:
+            return
+        self.start()
+        self._stopped = True
+        self.listener.stop()
+
+
+def setup_logging(path: str, *, console_logger: str = 'availability_bot', level: int = logging.INFO,
+                  max_bytes: int = 10 * 2**20, interval: float = 86400.0, backups: int = 14,
+                  sample_rates: Optional[Dict[str, float]] = None, queue_size: int = 10000) -> LogPipeline:
+    """
+    Route every logger through one bounded queue. The file gets JSON lines from all
+    loggers (discord.py included); the console gets ``console_logger`` as plain text.
+    Records queue up until ``start()``, so a caller that forks can start the listener
+    thread afterwards.
+    """
+    file_handler = RollingFileHandler(path, max_bytes, interval, backups)
+    file_handler.setFormatter(JsonFormatter())
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    console.addFilter(logging.Filter(console_logger))
+
+    handler = BoundedQueueHandler(queue.Queue(queue_size))
+    sampler = CategorySampler(sample_rates or {})
+    handler.addFilter(sampler)
+    handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+
+    listener = logging.handlers.QueueListener(handler.queue, file_handler, console, respect_handler_level=True)
+    return LogPipeline(handler, sampler, listener)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Metrics — handler latency histograms, loop lag, /metrics
+# =========================================================
+# Fixed-bucket histograms (one bisect + a few adds per
+# observation) so instrumentation can stay on in production.
+# Exposed as Prometheus text on localhost and via !metrics.
+# =========================================================
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from logpipe import CORRELATION, correlate
+
+logger = logging.getLogger('availability_bot')
+
+# Seconds; the implicit last bucket is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+PREFIX = 'pixelbot'
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, capped at the observed max."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+
+class HandlerStats:
+    __slots__ = ('hist', 'errors')
+
+    def __init__(self):
+        self.hist = Histogram()
+        self.errors = 0
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return "{" + inner + "}" if inner else ""
+
+
+def _render_histogram(lines: List[str], metric: str, hist: Histogram, **labels):
+    running = 0
+    for bound, c in zip(hist.buckets, hist.counts):
+        running += c
+        lines.append(f"{metric}_bucket{_labels(**labels, le=bound)} {running}")
+    lines.append(f"{metric}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+    lines.append(f"{metric}_sum{_labels(**labels)} {hist.sum:.6f}")
+    lines.append(f"{metric}_count{_labels(**labels)} {hist.count}")
+
+
+class Metrics:
+    """
+    Registry for handler stats (keyed by (kind, name)), storage writes, the
+    event-loop lag probe and callable gauges. Observations may come from the
+    flusher threads as well as the loop, so updates take a short lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handlers: Dict[Tuple[str, str], HandlerStats] = {}
+        self.writes: Dict[str, Histogram] = {}
+        self.loop_lag = Histogram(LAG_BUCKETS)
+        self.last_lag = 0.0
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    # -----------------------
+    # Recording
+    # -----------------------
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False):
+        with self.lock:
+            stats = self.handlers.get((kind, name))
+            if stats is None:
+                stats = self.handlers[(kind, name)] = HandlerStats()
+            stats.hist.observe(seconds)
+            if error:
+                stats.errors += 1
+
+    def observe_write(self, target: str, seconds: float):
+        with self.lock:
+            hist = self.writes.get(target)
+            if hist is None:
+                hist = self.writes[target] = Histogram()
+            hist.observe(seconds)
+
+    def observe_lag(self, seconds: float):
+        with self.lock:
+            self.loop_lag.observe(seconds)
+            self.last_lag = seconds
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], float]):
+        self.gauges[name] = (help_text, fn)
+
+    def instrument(self, kind: str, name: Optional[str] = None):
+        """
+        Decorator timing a coroutine function; exceptions are counted and re-raised.
+        Each call gets its own log correlation ID.
+        """
+        def decorator(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                token = correlate(label)
+                started = time.perf_counter()
+                failed = False
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException:
+                    failed = True
+                    raise
+                finally:
+                    self.observe(kind, label, time.perf_counter() - started, failed)
+                    CORRELATION.reset(token)
+            return wrapper
+        return decorator
+
+    async def run_lag_probe(self, interval: float = 0.5):
+        """Sleep ``interval`` repeatedly; any extra delay is time the loop was busy elsewhere."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.observe_lag(max(0.0, loop.time() - started - interval))
+
+    # -----------------------
+    # Reporting
+    # -----------------------
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            handlers = sorted(self.handlers.items())
+            writes = sorted(self.writes.items())
+            lines.append(f"# HELP {PREFIX}_handler_seconds Latency of bot events, commands and tasks")
+            lines.append(f"# TYPE {PREFIX}_handler_seconds histogram")
+            for (kind, name), stats in handlers:
+                _render_histogram(lines, f"{PREFIX}_handler_seconds", stats.hist, kind=kind, name=name)
+            lines.append(f"# HELP {PREFIX}_handler_errors_total Handler invocations that raised")
+            lines.append(f"# TYPE {PREFIX}_handler_errors_total counter")
+            for (kind, name), stats in handlers:
+                lines.append(f"{PREFIX}_handler_errors_total{_labels(kind=kind, name=name)} {stats.errors}")
+            lines.append(f"# HELP {PREFIX}_storage_write_seconds Duration of persisted writes/commits")
+            lines.append(f"# TYPE {PREFIX}_storage_write_seconds histogram")
+            for target, hist in writes:
+                _render_histogram(lines, f"{PREFIX}_storage_write_seconds", hist, target=target)
+            lines.append(f"# HELP {PREFIX}_event_loop_lag_seconds Extra delay seen by the loop lag probe")
+            lines.append(f"# TYPE {PREFIX}_event_loop_lag_seconds histogram")
+            _render_histogram(lines, f"{PREFIX}_event_loop_lag_seconds", self.loop_lag)
+        for name, (help_text, fn) in sorted(self.gauges.items()):
+            try:
+                value = float(fn())
+            except Exception:
+                continue
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"{PREFIX}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self, top: int = 12) -> List[str]:
+        """Compact per-handler table for chat, busiest first."""
+        with self.lock:
+            handlers = sorted(self.handlers.items(), key=lambda kv: -kv[1].hist.count)[:top]
+            rows = [(f"{kind[0]}:{name}", s.hist.count, s.errors, s.hist.quantile(0.5),
+                     s.hist.quantile(0.95), s.hist.max) for (kind, name), s in handlers]
+            writes = [(target, h.count, h.quantile(0.5), h.quantile(0.95), h.max) for target, h in sorted(self.writes.items())]
+            lag = (self.last_lag, self.loop_lag.quantile(0.99), self.loop_lag.max)
+        lines = [f"{'handler':<22}{'n':>7}{'err':>5}{'p50':>8}{'p95':>8}{'max':>8}"]
+        for label, n, err, p50, p95, mx in rows:
+            lines.append(f"{label[:21]:<22}{n:>7}{err:>5}{_ms(p50):>8}{_ms(p95):>8}{_ms(mx):>8}")
+        for target, n, p50, p95, mx in writes:
+            lines.append(f"{('w:' + target)[:21]:<22}{n:>7}{'':>5}{_ms(p50):>8}{_ms(p95):>8}{_ms(mx):>8}")
+        lines.append(f"loop lag now {_ms(lag[0])} · p99 {_ms(lag[1])} · max {_ms(lag[2])}")
+        return lines
+
+
+def _ms(seconds: float) -> str:
+    ms = seconds * 1000
+    return f"{ms:.1f}" if ms < 100 else f"{ms:.0f}"
+
+
+def start_http_server(metrics: Metrics, host: str, port: int) -> Optional[ThreadingHTTPServer]:
+    """Serve ``GET /metrics`` in a daemon thread. Returns None if the port cannot be bound."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        logger.error(f"Metrics endpoint not started on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+    return server
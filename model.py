@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Availability Model — compact in-memory availability
+# =========================================================
+# On disk (and in the journal) availability stays
+#   {user: {game: {"day": ["HH:MM", "HH:MM", tz]}}}
+# In memory each (user, game) week is one array('h') of 21
+# shorts — start minute, end minute and interned tz ID per
+# weekday — hung off a __slots__ record per user, so readers
+# get ints back and never re-parse strings. Anything that does
+# not fit that shape (legacy single-game records, odd day keys,
+# non-canonical times) is kept verbatim on the side, so
+# to_json() returns exactly what from_json() was given.
+# =========================================================
+
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DAYS_PER_WEEK = 7
+UNSET = -1          # start slot of a day with no entry
+NO_TZ = -1          # tz slot of a two-element ["HH:MM", "HH:MM"] entry
+_EMPTY_WEEK = array('h', [UNSET] * (3 * DAYS_PER_WEEK))
+_DAY_KEYS = tuple(str(d) for d in range(DAYS_PER_WEEK))
+
+# (start minute, end minute, tz) — tz '' means "the user's own timezone"
+Entry = Tuple[int, int, str]
+
+
+def minutes_to_hhmm(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+# Every canonical "HH:MM", shared by all serialized entries
+_HHMM = tuple(minutes_to_hhmm(m) for m in range(1441))
+_MINUTES = {hhmm: m for m, hhmm in enumerate(_HHMM)}
+
+
+def _hhmm(minute: int) -> str:
+    return _HHMM[minute] if 0 <= minute <= 1440 else minutes_to_hhmm(minute)
+
+
+def _parse_hhmm(value) -> Optional[int]:
+    """Minutes for a canonical "HH:MM" (00:00–24:00), else None."""
+    return _MINUTES.get(value) if isinstance(value, str) else None
+
+
+class TzTable:
+    """Interns timezone names to small IDs; ID 0 is '' (no timezone stored)."""
+
+    def __init__(self):
+        self._names: List[str] = ['']
+        self._ids: Dict[str, int] = {'': 0}
+
+    def intern(self, name: str) -> int:
+        tz_id = self._ids.get(name)
+        if tz_id is None:
+            tz_id = self._ids[name] = len(self._names)
+            self._names.append(sys.intern(name))
+        return tz_id
+
+    def name(self, tz_id: int) -> str:
+        return self._names[tz_id]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class UserRecord:
+    """One user's games as parallel tuples of game keys and 21-short week arrays."""
+    __slots__ = ('games', 'weeks')
+
+    def __init__(self):
+        self.games: Tuple[str, ...] = ()
+        self.weeks: Tuple[array, ...] = ()
+
+    def week(self, game: str) -> Optional[array]:
+        for key, week in zip(self.games, self.weeks):
+            if key == game:
+                return week
+        return None
+
+    def add_week(self, game: str) -> array:
+        week = array('h', _EMPTY_WEEK)
+        self.games += (sys.intern(game),)
+        self.weeks += (week,)
+        return week
+
+    def drop_week(self, game: str):
+        if game in self.games:
+            i = self.games.index(game)
+            self.games = self.games[:i] + self.games[i + 1:]
+            self.weeks = self.weeks[:i] + self.weeks[i + 1:]
+
+
+def _week_days(week: array) -> Iterator[int]:
+    return (d for d in range(DAYS_PER_WEEK) if week[3 * d] != UNSET)
+
+
+class AvailabilityModel:
+    """
+    Every user's availability, read and written through typed methods.
+    Mutations mirror the old dict code: deleting a game's last day drops
+    the game, and dropping a user's last game drops the user.
+    """
+
+    def __init__(self):
+        self.tzs = TzTable()
+        self._users: Dict[str, UserRecord] = {}
+        # Verbatim JSON the arrays can't hold, per user: None -> a non-dict user
+        # value; game -> a non-dict game value, or {day key: entry} for odd days
+        self._extra: Dict[str, Dict[Optional[str], object]] = {}
+        # Copy-on-write: records may be shared with a snapshot() unless they were
+        # copied (or created) since the last one
+        self._shared = False
+        self._owned: set = set()
+
+    # -----------------------
+    # JSON round-trip
+    # -----------------------
+    @classmethod
+    def from_json(cls, data: dict) -> 'AvailabilityModel':
+        return cls.from_items(data.items())
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, object]]) -> 'AvailabilityModel':
+        """Build from (user_id, on-disk record) pairs, e.g. decoded one at a time from a file."""
+        model = cls()
+        for user_id, user_data in items:
+            model._load_user(user_id, user_data)
+        return model
+
+    def _load_user(self, user_id: str, user_data):
+        record = self._users[user_id] = UserRecord()
+        if not isinstance(user_data, dict):
+            self._extra[user_id] = {None: user_data}
+            return
+        for game, game_data in user_data.items():
+            if not isinstance(game_data, dict):
+                self._extra.setdefault(user_id, {})[game] = game_data
+                continue
+            week = record.add_week(game)
+            for day_key, entry in game_data.items():
+                self._store(user_id, game, week, day_key, entry)
+
+    def _odd(self, user_id: str, game: str) -> Optional[dict]:
+        """Verbatim odd-day entries of one (user, game), if any."""
+        extra = self._extra.get(user_id)
+        odd = extra.get(game) if extra else None
+        return odd if isinstance(odd, dict) else None
+
+    def _keep_odd(self, user_id: str, game: str, day_key: str, entry):
+        self._extra.setdefault(user_id, {}).setdefault(game, {})[day_key] = entry
+
+    def _store(self, user_id: str, game: str, week: array, day_key: str, entry):
+        """Put one JSON entry into ``week``; whatever isn't canonical is also kept verbatim."""
+        odd = self._odd(user_id, game)
+        if odd is not None:
+            odd.pop(day_key, None)
+        if day_key not in _DAY_KEYS:
+            self._keep_odd(user_id, game, day_key, entry)
+            return
+        i = 3 * int(day_key)
+        shaped = isinstance(entry, list) and len(entry) in (2, 3)
+        start = _parse_hhmm(entry[0]) if shaped else None
+        end = _parse_hhmm(entry[1]) if shaped else None
+        tz = entry[2] if shaped and len(entry) == 3 else None
+        if start is None or end is None or (shaped and len(entry) == 3 and not isinstance(tz, str)):
+            # Readers used to parse these leniently, so they stay visible when they can be parsed
+            self._keep_odd(user_id, game, day_key, entry)
+            start, end = _lenient_span(entry)
+            tz = entry[2] if shaped and len(entry) == 3 and isinstance(entry[2], str) else ''
+            if start is None:
+                week[i] = UNSET
+                return
+        week[i] = start
+        week[i + 1] = end
+        week[i + 2] = NO_TZ if tz is None else self.tzs.intern(tz)
+
+    def snapshot(self) -> 'AvailabilityModel':
+        """
+        A frozen copy for serializing off the lock. Only the user dict is copied
+        here; each record is copied the first time it is written afterwards, so
+        the copy stays as it was while this model keeps changing.
+        """
+        copy = AvailabilityModel()
+        copy.tzs = self.tzs  # append-only: IDs the copy holds never change
+        copy._users = dict(self._users)
+        copy._extra = {user_id: {game: dict(value) if isinstance(value, dict) else value
+                                 for game, value in extra.items()}
+                       for user_id, extra in self._extra.items()}
+        self._shared = True
+        self._owned = set()
+        return copy
+
+    def _own(self, user_id: str) -> Optional[UserRecord]:
+        """The user's record, copied first if a snapshot may still share it."""
+        record = self._users.get(user_id)
+        if record is not None and self._shared and user_id not in self._owned:
+            own = UserRecord()
+            own.games = record.games
+            own.weeks = tuple(array('h', week) for week in record.weeks)
+            record = self._users[user_id] = own
+            self._owned.add(user_id)
+        return record
+
+    def to_json(self) -> dict:
+        return {user_id: self._user_json(user_id, record) for user_id, record in self._users.items()}
+
+    def iter_json(self) -> Iterator[Tuple[str, object]]:
+        """to_json() one user at a time: (user_id, on-disk record)."""
+        for user_id, record in self._users.items():
+            yield user_id, self._user_json(user_id, record)
+
+    def _user_json(self, user_id: str, record: UserRecord):
+        extra = self._extra.get(user_id)
+        if extra and None in extra:
+            return extra[None]
+        names = self.tzs._names
+        user_out = {}
+        for game, week in zip(record.games, record.weeks):
+            game_out = {}
+            for d in range(DAYS_PER_WEEK):
+                i = 3 * d
+                if week[i] == UNSET:
+                    continue
+                tz_id = week[i + 2]
+                if tz_id == NO_TZ:
+                    game_out[_DAY_KEYS[d]] = [_hhmm(week[i]), _hhmm(week[i + 1])]
+                else:
+                    game_out[_DAY_KEYS[d]] = [_hhmm(week[i]), _hhmm(week[i + 1]), names[tz_id]]
+            if extra and isinstance(extra.get(game), dict):
+                game_out.update(extra[game])
+            user_out[game] = game_out
+        if extra:
+            for game, value in extra.items():
+                if game not in user_out:
+                    user_out[game] = value
+        return user_out
+
+    def _raw_from_week(self, week: array, day: int) -> list:
+        i = 3 * day
+        raw = [_hhmm(week[i]), _hhmm(week[i + 1])]
+        if week[i + 2] != NO_TZ:
+            raw.append(self.tzs.name(week[i + 2]))
+        return raw
+
+    def raw(self, user_id: str, game: str, day: int) -> Optional[list]:
+        """The entry as stored on disk, for the journal / SQLite."""
+        odd = self._odd(user_id, game)
+        if odd and _DAY_KEYS[day] in odd:
+            return odd[_DAY_KEYS[day]]
+        week = self._week(user_id, game)
+        if week is None or week[3 * day] == UNSET:
+            return None
+        return self._raw_from_week(week, day)
+
+    def iter_entries(self) -> Iterator[Tuple[str, str, int, list]]:
+        """(user_id, game, day, [start, end, tz]) for every readable entry, tz '' if none."""
+        for user_id, record in self._users.items():
+            for game, week in zip(record.games, record.weeks):
+                for d in _week_days(week):
+                    st, et, tz = (list(self.raw(user_id, game, d)) + [''])[:3]
+                    yield user_id, game, d, [st, et, tz or '']
+
+    # -----------------------
+    # Reads
+    # -----------------------
+    def _week(self, user_id: str, game: str) -> Optional[array]:
+        record = self._users.get(user_id)
+        return record.week(game) if record is not None else None
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._users
+
+    def user_ids(self) -> List[str]:
+        return list(self._users)
+
+    def games(self, user_id: str) -> Tuple[str, ...]:
+        record = self._users.get(user_id)
+        return record.games if record is not None else ()
+
+    def has_game(self, user_id: str, game: str) -> bool:
+        week = self._week(user_id, game)
+        return week is not None and any(week[3 * d] != UNSET for d in range(DAYS_PER_WEEK))
+
+    def entry(self, user_id: str, game: str, day: int) -> Optional[Entry]:
+        record = self._users.get(user_id)
+        if record is None:
+            return None
+        for key, week in zip(record.games, record.weeks):
+            if key == game:
+                i = 3 * day
+                start = week[i]
+                if start == UNSET:
+                    return None
+                tz_id = week[i + 2]
+                return start, week[i + 1], self.tzs._names[tz_id] if tz_id != NO_TZ else ''
+        return None
+
+    def week(self, user_id: str, game: str) -> List[Tuple[int, int, int, str]]:
+        """(day, start, end, tz) for each filled day, Monday first. A fresh list: safe to hand to a worker."""
+        week = self._week(user_id, game)
+        if week is None:
+            return []
+        name = self.tzs.name
+        return [(d, week[3 * d], week[3 * d + 1], name(week[3 * d + 2]) if week[3 * d + 2] != NO_TZ else '')
+                for d in _week_days(week)]
+
+    def user_days(self, user_id: str, game: Optional[str] = None) -> List[Tuple[str, int]]:
+        record = self._users.get(user_id)
+        if record is None:
+            return []
+        return [(g, d) for g, week in zip(record.games, record.weeks)
+                if game is None or g == game for d in _week_days(week)]
+
+    def iter_days(self) -> Iterator[Tuple[str, str, int]]:
+        """(user_id, game, day) for every filled day, in insertion order."""
+        for user_id, record in self._users.items():
+            for game, week in zip(record.games, record.weeks):
+                for d in _week_days(week):
+                    yield user_id, game, d
+
+    # -----------------------
+    # Writes
+    # -----------------------
+    def _week_for_write(self, user_id: str, game: str) -> array:
+        record = self._own(user_id)
+        if record is None:
+            record = self._users[user_id] = UserRecord()
+            self._owned.add(user_id)
+        extra = self._extra.get(user_id)
+        if extra:
+            # A write turns a malformed user / game value into a real record, as the dict code did
+            extra.pop(None, None)
+            if game in extra and not isinstance(extra[game], dict):
+                del extra[game]
+        week = record.week(game)
+        if week is None:
+            week = record.add_week(game)
+        return week
+
+    def set(self, user_id: str, game: str, day: int, start: int, end: int, tz: str = ''):
+        week = self._week_for_write(user_id, game)
+        odd = self._odd(user_id, game)
+        if odd:
+            odd.pop(_DAY_KEYS[day], None)
+        i = 3 * day
+        week[i] = start
+        week[i + 1] = end
+        week[i + 2] = self.tzs.intern(tz)
+
+    def set_raw(self, user_id: str, game: str, day: int, entry: list):
+        """Store an on-disk shaped entry (journal replay, SQLite rows)."""
+        self._store(user_id, game, self._week_for_write(user_id, game), str(int(day)), entry)
+
+    def delete(self, user_id: str, game: Optional[str] = None, days: Optional[Iterable[int]] = None):
+        record = self._own(user_id)
+        if record is None:
+            return
+        if game is None:
+            self._users.pop(user_id, None)
+            self._extra.pop(user_id, None)
+            return
+        extra = self._extra.get(user_id) or {}
+        if days is None:
+            record.drop_week(game)
+            extra.pop(game, None)
+        else:
+            week = record.week(game)
+            odd = self._odd(user_id, game)
+            for d in days:
+                if week is not None:
+                    week[3 * int(d)] = UNSET
+                if odd is not None:
+                    odd.pop(str(d), None)
+            if odd is not None and not odd:
+                extra.pop(game, None)
+            if week is not None and not any(week[3 * d] != UNSET for d in range(DAYS_PER_WEEK)) and not odd:
+                record.drop_week(game)
+        if not extra:
+            self._extra.pop(user_id, None)
+        if not record.games and not extra:
+            self._users.pop(user_id, None)
+
+    # -----------------------
+    # Legacy layout
+    # -----------------------
+    def legacy_users(self, games: Iterable[str]) -> List[str]:
+        """Users whose record names none of ``games`` (pre multi-game data)."""
+        games = set(games)
+        legacy = []
+        for user_id, record in self._users.items():
+            extra = self._extra.get(user_id) or {}
+            if None in extra or not (games.intersection(record.games) or games.intersection(extra)):
+                legacy.append(user_id)
+        return legacy
+
+    def user_json(self, user_id: str):
+        """One user's record in the on-disk shape."""
+        return self._user_json(user_id, self._users[user_id])
+
+    def replace_user(self, user_id: str, user_data):
+        """Swap in ``user_data`` (on-disk shape) for one user."""
+        self._users.pop(user_id, None)
+        self._extra.pop(user_id, None)
+        self._load_user(user_id, user_data)
+
+
+def _lenient_span(entry) -> Tuple[Optional[int], Optional[int]]:
+    """Old readers' parse of a non-canonical entry: int(h) * 60 + int(m) on each side."""
+    try:
+        st, et = entry[0], entry[1]
+        h1, m1 = st.split(':')
+        h2, m2 = et.split(':')
+        start, end = int(h1) * 60 + int(m1), int(h2) * 60 + int(m2)
+    except (TypeError, ValueError, IndexError, AttributeError, KeyError):
+        return None, None
+    if not (-32768 < start < 32768 and -32768 < end < 32768):
+        return None, None
+    return start, end
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Name Cache — display names without the member cache
+# =========================================================
+# In lean-memory mode the bot doesn't chunk or cache guild
+# members. Reports still need display names, so names are
+# remembered as users show up (message authors, reaction
+# members) in a bounded LRU with a TTL, and the few that are
+# missing when a report runs are looked up in batches of 100
+# over the gateway (no members intent needed for ID lookups).
+# =========================================================
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('availability_bot')
+
+# Discord caps a member lookup by ID at 100 users per request
+QUERY_BATCH = 100
+# Remembered for users who weren't found (left the server), so they aren't re-queried every report
+GONE = ''
+
+
+class NameCache:
+    """
+    ``(guild_id, user_id) -> display name`` with LRU eviction beyond
+    ``max_entries`` and expiry after ``ttl`` seconds, so renames show up
+    within a day even for users who never post again. ``reserve`` grows
+    the bound to fit a roster that must stay cached as a whole.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._names: 'OrderedDict[Tuple[int, int], Tuple[str, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fetched = 0
+
+    def reserve(self, entries: int):
+        """Raise the bound to at least ``entries`` (never shrinks)."""
+        if entries > self.max_entries:
+            logger.info(f"Name cache bound raised from {self.max_entries} to {entries}")
+            self.max_entries = entries
+
+    def remember(self, guild_id: Optional[int], user_id: int, name: str):
+        if guild_id is None:
+            return
+        key = (guild_id, int(user_id))
+        self._names[key] = (name, time.monotonic() + self.ttl)
+        self._names.move_to_end(key)
+        while len(self._names) > self.max_entries:
+            self._names.popitem(last=False)
+
+    def remember_member(self, member):
+        """Record a Member seen in an event payload (users outside a guild are skipped)."""
+        guild = getattr(member, 'guild', None)
+        if guild is not None:
+            self.remember(guild.id, member.id, member.display_name)
+
+    def get(self, guild_id: Optional[int], user_id) -> Optional[str]:
+        """Cached name, GONE for users known to have left, None if unknown or expired."""
+        key = (guild_id, int(user_id))
+        entry = self._names.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._names[key]
+            self.misses += 1
+            return None
+        self._names.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    async def resolve(self, guild, user_ids: Iterable, timeout: float = 10.0) -> int:
+        """Look up every uncached user of ``user_ids`` in ``guild``; returns how many were found."""
+        if guild is None:
+            return 0
+        missing = [int(uid) for uid in user_ids
+                   if self.get(guild.id, uid) is None and guild.get_member(int(uid)) is None]
+        found = 0
+        for i in range(0, len(missing), QUERY_BATCH):
+            chunk = missing[i:i + QUERY_BATCH]
+            try:
+                members = await asyncio.wait_for(
+                    guild.query_members(user_ids=chunk, limit=len(chunk), cache=False), timeout)
+            except (asyncio.TimeoutError, discord.ClientException, discord.HTTPException) as e:
+                logger.warning(f"Name lookup for {len(missing) - i} users in guild {guild.id} failed: {e}")
+                break
+            seen = set()
+            for member in members:
+                self.remember(guild.id, member.id, member.display_name)
+                seen.add(member.id)
+            for uid in chunk:
+                if uid not in seen:
+                    self.remember(guild.id, uid, GONE)
+            found += len(members)
+        self.fetched += found
+        return found
+
+    def __len__(self) -> int:
+        return len(self._names)
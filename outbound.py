@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Outbound — prioritized, rate-limit-aware Discord actions
+# =========================================================
+# Handlers enqueue reactions/DMs/posts instead of awaiting
+# them inline. A small worker pool drains the queue in
+# priority order; each route has a token bucket that backs
+# off when Discord answers 429 and recovers on success.
+# Jobs that find their route out of tokens are parked on
+# that route in (priority, submit order); one timer per
+# route releases them a token at a time.
+# =========================================================
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger('availability_bot')
+
+# Priority classes, lowest first
+ACK = 0     # ✅/❌ on the user's own message
+POLL = 1    # poll posts and their 1️⃣-7️⃣ reactions
+DM = 2      # confirmation / help DMs
+BULK = 3    # anything that can wait
+
+# Route kind -> (tokens per second, burst). Discord's reaction route allows
+# roughly one call per 0.25s per channel; message sends ~5 per 5s per channel.
+ROUTE_LIMITS: Dict[str, Tuple[float, float]] = {
+    'reaction': (4.0, 1.0),
+    'send': (1.0, 5.0),
+    'dm': (1.0, 5.0),
+    'dm_open': (2.0, 5.0),
+}
+DEFAULT_LIMIT = (1.0, 5.0)
+# A learned rate never drops below this fraction of the configured one
+MIN_RATE_FRACTION = 0.1
+
+
+class TokenBucket:
+    """
+    Classic token bucket with multiplicative back-off: a 429 pauses the route
+    for ``retry_after`` and halves its rate; each success adds back a little.
+    """
+
+    __slots__ = ('base_rate', 'rate', 'capacity', 'tokens', 'updated', 'paused_until')
+
+    def __init__(self, rate: float, capacity: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is now); takes nothing."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def reserve(self) -> float:
+        """Take a token if one is available and return 0, else the seconds until one is."""
+        wait = self.delay()
+        if not wait:
+            self.tokens -= 1.0
+        return wait
+
+    def rate_limited(self, retry_after: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+        # One call may go as soon as the pause ends; the rest follow at the reduced rate
+        self.tokens = 1.0
+        self.updated = self.paused_until
+
+    def succeeded(self):
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+
+class _Job:
+    __slots__ = ('priority', 'seq', 'route', 'factory', 'future', 'label', 'attempts', 'gate', 'booked')
+
+    def __init__(self, priority: int, seq: int, route: str, factory: Callable[[], Awaitable],
+                 future: asyncio.Future, label: str, gate: Optional[str] = None):
+        self.priority = priority
+        self.seq = seq  # submit order; kept across parking and retries
+        self.route = route
+        self.gate = gate  # second route the call also spends a token on (e.g. opening a DM)
+        self.factory = factory
+        self.future = future
+        self.label = label
+        self.attempts = 0
+        self.booked = set()  # routes whose token this job already holds
+
+    def routes(self) -> Tuple[str, ...]:
+        return (self.gate, self.route) if self.gate else (self.route,)
+
+
+class Outbound:
+    """
+    Central outbound queue. ``submit`` never blocks the caller; it returns a
+    future the caller may await if it needs the result (e.g. a posted poll).
+    """
+
+    def __init__(self, workers: int = 4, max_attempts: int = 3, dm_cache_size: int = 2048,
+                 create_dm: Optional[Callable[[discord.abc.Snowflake], Awaitable[discord.DMChannel]]] = None):
+        self.workers = workers
+        # Client.create_dm opens a DM from a bare ID (raw events carry no user object)
+        self._create_dm = create_dm
+        self.max_attempts = max_attempts
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._tasks = []
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._parked: Dict[str, List[Tuple[int, int, _Job]]] = {}  # route -> heap of jobs waiting for its tokens
+        self._wakeups: Dict[str, asyncio.TimerHandle] = {}          # route -> its single release timer
+        self._dm_channels: "OrderedDict[int, discord.DMChannel]" = OrderedDict()
+        self._dm_cache_size = dm_cache_size
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.deferred = 0
+        self._in_flight = 0
+
+    @property
+    def queue(self) -> asyncio.PriorityQueue:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        return self._queue
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def in_flight(self) -> int:
+        """Submitted calls not yet finished: queued, parked or running."""
+        return self._in_flight
+
+    def parked(self) -> int:
+        return sum(len(heap) for heap in self._parked.values())
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def close(self, timeout: float = 5.0):
+        """Give queued work ``timeout`` seconds to finish, then stop the workers."""
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Outbound: {self.depth()} actions dropped on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for handle in self._wakeups.values():
+            handle.cancel()
+        self._wakeups.clear()
+
+    # -----------------------
+    # Submitting
+    # -----------------------
+    def submit(self, priority: int, route: str, factory: Callable[[], Awaitable], label: str = '',
+               gate: Optional[str] = None) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight += 1
+        future.add_done_callback(self._finished)
+        self._put(_Job(priority, next(self._seq), route, factory, future, label or route, gate))
+        return future
+
+    def _finished(self, _future: asyncio.Future):
+        self._in_flight -= 1
+
+    def _put(self, job: _Job):
+        self.queue.put_nowait((job.priority, job.seq, job))
+
+    def react(self, message: discord.Message, emoji: str, priority: int = ACK) -> asyncio.Future:
+        return self.submit(priority, f"reaction:{message.channel.id}", lambda: message.add_reaction(emoji),
+                           f"react {emoji}")
+
+    def react_many(self, message: discord.Message, emojis, priority: int = POLL) -> asyncio.Future:
+        """Add several reactions in order as one job (poll 1️⃣-7️⃣ must appear in sequence)."""
+        route = f"reaction:{message.channel.id}"
+
+        async def _add_all():
+            bucket = self._bucket(route)
+            for i, emoji in enumerate(emojis):
+                if i:
+                    await self._take(bucket)
+                await message.add_reaction(emoji)
+        return self.submit(priority, route, _add_all, f"react x{len(emojis)}")
+
+    def send(self, channel, *args, priority: int = POLL, **kwargs) -> asyncio.Future:
+        return self.submit(priority, f"send:{channel.id}", lambda: channel.send(*args, **kwargs), "send")
+
+    def dm(self, user: discord.abc.Snowflake, content: str, priority: int = DM) -> asyncio.Future:
+        # A DM that has to open its channel waits for a dm_open token in the queue, not in a worker
+        opened = user.id in self._dm_channels or getattr(user, 'dm_channel', None) is not None
+        gate = None if opened else 'dm_open:global'
+
+        async def _send():
+            channel = await self.dm_channel(user, reserved=gate is not None)
+            return await channel.send(content)
+        return self.submit(priority, f"dm:{user.id}", _send, "dm", gate)
+
+    async def dm_channel(self, user: discord.abc.Snowflake, reserved: bool = False) -> discord.DMChannel:
+        """DM channel for ``user``, opened at most once per cache lifetime."""
+        channel = self._dm_channels.get(user.id) or getattr(user, 'dm_channel', None)
+        if channel is None:
+            if not reserved:
+                await self._take(self._bucket('dm_open:global'))
+            channel = await (self._create_dm(user) if self._create_dm else user.create_dm())
+        self._dm_channels[user.id] = channel
+        self._dm_channels.move_to_end(user.id)
+        if len(self._dm_channels) > self._dm_cache_size:
+            self._dm_channels.popitem(last=False)
+        return channel
+
+    # -----------------------
+    # Workers
+    # -----------------------
+    def _bucket(self, route: str) -> TokenBucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            rate, capacity = ROUTE_LIMITS.get(route.split(':', 1)[0], DEFAULT_LIMIT)
+            bucket = self._buckets[route] = TokenBucket(rate, capacity)
+        return bucket
+
+    @staticmethod
+    async def _take(bucket: TokenBucket):
+        """Wait for a token inside a running job."""
+        while True:
+            wait = bucket.reserve()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def _admit(self, job: _Job) -> bool:
+        """Book a token on each route the job needs, or park it behind that route's waiting jobs."""
+        for route in job.routes():
+            if route in job.booked:
+                continue
+            if route in self._parked or self._bucket(route).reserve():
+                self._park(route, job)
+                return False
+            job.booked.add(route)
+        return True
+
+    def _park(self, route: str, job: _Job):
+        # Park the job instead of the worker so other routes keep flowing
+        self.deferred += 1
+        heapq.heappush(self._parked.setdefault(route, []), (job.priority, job.seq, job))
+        if route not in self._wakeups:
+            self._wakeups[route] = asyncio.get_running_loop().call_later(
+                self._bucket(route).delay(), self._release, route)
+
+    def _release(self, route: str):
+        """Hand parked jobs back to the workers in order, one per token, then sleep until the next token."""
+        self._wakeups.pop(route, None)
+        heap = self._parked.get(route)
+        bucket = self._bucket(route)
+        while heap:
+            job = heap[0][2]
+            if job.future.done():
+                heapq.heappop(heap)
+                continue
+            wait = bucket.reserve()
+            if wait:
+                self._wakeups[route] = asyncio.get_running_loop().call_later(wait, self._release, route)
+                return
+            heapq.heappop(heap)
+            job.booked.add(route)
+            self._put(job)
+        self._parked.pop(route, None)
+
+    async def _worker(self, n: int):
+        queue = self.queue
+        while True:
+            priority, _, job = await queue.get()
+            try:
+                if job.future.cancelled():
+                    continue
+                if self._admit(job):
+                    await self._run(priority, job, self._bucket(job.route))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbound worker {n}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _run(self, priority: int, job: _Job, bucket: TokenBucket):
+        job.attempts += 1
+        try:
+            result = await job.factory()
+        except discord.RateLimited as e:
+            self._on_rate_limit(priority, job, bucket, e.retry_after)
+        except discord.HTTPException as e:
+            if e.status == 429:
+                retry_after = getattr(e, 'retry_after', None) or 1.0
+                self._on_rate_limit(priority, job, bucket, retry_after)
+            else:
+                self._fail(job, e)
+        except Exception as e:
+            self._fail(job, e)
+        else:
+            bucket.succeeded()
+            self.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+
+    def _on_rate_limit(self, priority: int, job: _Job, bucket: TokenBucket, retry_after: float):
+        self.rate_limited += 1
+        bucket.rate_limited(retry_after)
+        logger.warning(f"Outbound: 429 on {job.route}, retry in {retry_after:.1f}s (rate now {bucket.rate:.2f}/s)")
+        if job.attempts < self.max_attempts:
+            job.booked.discard(job.route)
+            self._park(job.route, job)
+        else:
+            self._fail(job, discord.RateLimited(retry_after))
+
+    def _fail(self, job: _Job, exc: BaseException):
+        self.failed += 1
+        if isinstance(exc, discord.Forbidden):
+            logger.debug(f"Outbound {job.label} on {job.route} forbidden: {exc}")
+        else:
+            logger.error(f"Outbound {job.label} on {job.route} failed: {exc}")
+        if not job.future.done():
+            job.future.set_exception(exc)
+            # Fire-and-forget callers never read the result; don't warn about it
+            job.future.exception()
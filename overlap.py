@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Overlap — vectorized best-time finder
+# =========================================================
+# Each game keeps a users × (7·96) quarter-hour availability
+# matrix in UTC, stored slot-major and bit-packed along the
+# user axis (64 users per word), so coverage and window
+# queries are a few NumPy reductions over a few MB even at
+# 50k users.
+# =========================================================
+
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from tzconvert import WeekConverter
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 1440 // SLOT_MINUTES
+WEEK_SLOTS = 7 * SLOTS_PER_DAY
+
+USERS_PER_WORD = 64
+
+# Number of set bits for every byte value (fallback for NumPy < 2.0)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# (day, start_minute, end_minute, tz_name) in the entry's own timezone
+Entry = Tuple[int, int, int, str]
+# Window in UTC slots since Monday 00:00 UTC: (start_slot, end_slot, players); end may exceed WEEK_SLOTS
+Window = Tuple[int, int, int]
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Set bits per slot row of a (slots × words) uint64 bitmap."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return _POPCOUNT[words.view(np.uint8)].sum(axis=1, dtype=np.int64)
+
+
+def _shift_and(acc: np.ndarray, shift: int) -> np.ndarray:
+    """acc[t] & acc[t + shift] with the week treated as circular."""
+    return acc & np.roll(acc, -shift, axis=0)
+
+
+def _window_and(words: np.ndarray, length: int) -> np.ndarray:
+    """AND of ``length`` consecutive slots for every (circular) start slot."""
+    acc = words
+    span = 1
+    # Doubling: acc[t] covers `span` slots; combine with itself shifted until it covers `length`
+    while span * 2 <= length:
+        acc = _shift_and(acc, span)
+        span *= 2
+    if span < length:
+        # Overlapping cover for the remainder
+        acc = _shift_and(acc, length - span)
+    return acc
+
+
+class OverlapEngine:
+    """
+    Maintained per-game availability bitmaps for one poll week.
+
+    Users share a row index across games so cross-game overlap is a plain
+    AND. Updates are lazy: ``mark_dirty`` records the user and the next
+    query recomputes only those rows from ``source``.
+    """
+
+    def __init__(self, monday: date, source: Callable[[str], Dict[str, List[Entry]]]):
+        self.monday = monday
+        self.converter = WeekConverter(monday)
+        self.source = source
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._capacity = 0
+        self._games: Dict[str, np.ndarray] = {}
+        self._dirty: Set[str] = set()
+
+    # -----------------------
+    # Maintenance
+    # -----------------------
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        new_cap = max(USERS_PER_WORD, self._capacity * 2)
+        while new_cap < rows:
+            new_cap *= 2
+        for game, words in self._games.items():
+            grown = np.zeros((WEEK_SLOTS, new_cap // USERS_PER_WORD), dtype=np.uint64)
+            grown[:, :words.shape[1]] = words
+            self._games[game] = grown
+        self._capacity = new_cap
+
+    def _game(self, game: str) -> np.ndarray:
+        words = self._games.get(game)
+        if words is None:
+            words = np.zeros((WEEK_SLOTS, self._capacity // USERS_PER_WORD), dtype=np.uint64)
+            self._games[game] = words
+        return words
+
+    def _row_for(self, user_id: str) -> int:
+        row = self._rows.get(user_id)
+        if row is None:
+            row = self._free.pop() if self._free else len(self._rows)
+            self._ensure_capacity(row + 1)
+            self._rows[user_id] = row
+        return row
+
+    def _slot_spans(self, entries: Iterable[Entry]) -> List[Tuple[int, int]]:
+        """UTC slot ranges covered by ``entries``; only fully-covered quarter hours count."""
+        spans = []
+        for day, start, end, tz_name in entries:
+            try:
+                us, ue = self.converter.span_to_utc(day, start, end, tz_name)
+            except Exception:
+                continue
+            first = -(-us // SLOT_MINUTES)
+            length = min(ue // SLOT_MINUTES - first, WEEK_SLOTS)
+            if length <= 0:
+                continue
+            s = first % WEEK_SLOTS
+            if s + length <= WEEK_SLOTS:
+                spans.append((s, s + length))
+            else:
+                # Wraps past Sunday 24:00 UTC into Monday
+                spans.append((s, WEEK_SLOTS))
+                spans.append((0, s + length - WEEK_SLOTS))
+        return spans
+
+    def _write_row(self, row: int, game_entries: Dict[str, List[Entry]]):
+        word, bit = row // USERS_PER_WORD, np.uint64(1 << (row % USERS_PER_WORD))
+        for game, words in self._games.items():
+            if game not in game_entries:
+                words[:, word] &= ~bit
+        for game, entries in game_entries.items():
+            words = self._game(game)
+            words[:, word] &= ~bit
+            for s, e in self._slot_spans(entries):
+                words[s:e, word] |= bit
+
+    def mark_dirty(self, user_id: str):
+        self._dirty.add(user_id)
+
+    def refresh(self):
+        """Recompute rows for users changed since the last query."""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        for user_id in dirty:
+            game_entries = self.source(user_id)
+            if not game_entries:
+                row = self._rows.pop(user_id, None)
+                if row is not None:
+                    self._write_row(row, {})
+                    self._free.append(row)
+                continue
+            self._write_row(self._row_for(user_id), game_entries)
+
+    def _utc_spans_batch(self, days: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                         tz_names: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized span_to_utc: one offset lookup per (tz, day), integer math per entry."""
+        tz_ids: Dict[str, int] = {}
+        tz_idx = np.fromiter((tz_ids.setdefault(t, len(tz_ids)) for t in tz_names), dtype=np.int64, count=len(tz_names))
+        # Offsets for days 0..7 (an overnight Sunday entry ends on day 7); NaN marks unknown/transition days
+        offsets = np.full((len(tz_ids), 8), np.nan)
+        for tz_name, i in tz_ids.items():
+            for day in range(8):
+                try:
+                    off = self.converter.day_offset(tz_name, day)
+                except Exception:
+                    continue
+                if off is not None:
+                    offsets[i, day] = off
+        ends = np.where(ends <= starts, ends + 1440, ends)
+        end_days = days + ends // 1440
+        off_s = offsets[tz_idx, days]
+        off_e = offsets[tz_idx, end_days]
+        us = days * 1440 + starts - np.nan_to_num(off_s).astype(np.int64)
+        ue = end_days * 1440 + ends % 1440 - np.nan_to_num(off_e).astype(np.int64)
+        valid = np.ones(len(days), dtype=bool)
+        # Entries touching a DST-transition day (or an unknown tz) take the exact scalar path
+        for i in np.flatnonzero(np.isnan(off_s) | np.isnan(off_e)):
+            try:
+                us[i], ue[i] = self.converter.span_to_utc(int(days[i]), int(starts[i]), int(ends[i]) % 1440, tz_names[i])
+            except Exception:
+                valid[i] = False
+        return us[valid], ue[valid], valid
+
+    def rebuild(self, user_ids: Iterable[str]):
+        """Full vectorized build for every user in ``user_ids``."""
+        self._rows, self._free, self._games, self._dirty = {}, [], {}, set()
+        self._capacity = 0
+        columns: Dict[str, Tuple[List[int], List[int], List[int], List[int], List[str]]] = {}
+        for user_id in user_ids:
+            game_entries = self.source(user_id)
+            if not game_entries:
+                continue
+            row = self._row_for(user_id)
+            for game, entries in game_entries.items():
+                rs, ds, ss, es, tzs = columns.setdefault(game, ([], [], [], [], []))
+                for day, start, end, tz_name in entries:
+                    rs.append(row)
+                    ds.append(day)
+                    ss.append(start)
+                    es.append(end)
+                    tzs.append(tz_name)
+        self._ensure_capacity(max(len(self._rows), 1))
+        for game, (rs, ds, ss, es, tzs) in columns.items():
+            us, ue, valid = self._utc_spans_batch(np.asarray(ds, dtype=np.int64), np.asarray(ss, dtype=np.int64),
+                                                  np.asarray(es, dtype=np.int64), tzs)
+            rows = np.asarray(rs, dtype=np.int64)[valid]
+            first = -(-us // SLOT_MINUTES)
+            length = np.minimum(ue // SLOT_MINUTES - first, WEEK_SLOTS)
+            keep = length > 0
+            rows, first, length = rows[keep], first[keep] % WEEK_SLOTS, length[keep]
+            last = first + length
+            # Spans wrapping past Sunday 24:00 UTC are split in two
+            wrap = last > WEEK_SLOTS
+            r_all = np.concatenate([rows, rows[wrap]])
+            s_all = np.concatenate([first, np.zeros(wrap.sum(), dtype=np.int64)])
+            e_all = np.concatenate([np.minimum(last, WEEK_SLOTS), last[wrap] - WEEK_SLOTS])
+            # Difference array over slots, prefix-summed into a dense slots × users bitmap
+            diff = np.zeros((WEEK_SLOTS + 1, self._capacity), dtype=np.int8)
+            np.add.at(diff, (s_all, r_all), 1)
+            np.add.at(diff, (e_all, r_all), -1)
+            # Row-by-row prefix sum: np.cumsum(axis=0) is pathologically slow on power-of-two widths
+            for slot in range(1, WEEK_SLOTS):
+                diff[slot] += diff[slot - 1]
+            dense = diff[:WEEK_SLOTS] > 0
+            packed = np.packbits(dense, axis=1, bitorder='little')
+            self._games[game] = packed.view('<u8').astype(np.uint64, copy=False)
+
+    # -----------------------
+    # Queries
+    # -----------------------
+    def _combined(self, games: Sequence[str]) -> Optional[np.ndarray]:
+        self.refresh()
+        mats = [self._games.get(g) for g in games]
+        if not mats or any(m is None for m in mats):
+            return None
+        combined = mats[0]
+        for m in mats[1:]:
+            combined = combined & m
+        return combined
+
+    def coverage(self, games: Sequence[str]) -> np.ndarray:
+        """Players available in each UTC quarter hour (for all ``games`` at once)."""
+        combined = self._combined(games)
+        if combined is None:
+            return np.zeros(WEEK_SLOTS, dtype=np.int64)
+        return _popcount_rows(combined)
+
+    def best_windows(self, games: Sequence[str], min_slots: int = 4, top_k: int = 5,
+                     min_players: int = 1) -> List[Window]:
+        """
+        Top-k non-overlapping windows of at least ``min_slots`` quarter hours,
+        scored by how many players are free for the whole window. Each window
+        is extended while every one of those players stays free.
+        """
+        combined = self._combined(games)
+        if combined is None:
+            return []
+        min_slots = max(1, min(min_slots, WEEK_SLOTS))
+        acc = _window_and(combined, min_slots)
+        scores = _popcount_rows(acc)
+        taken = np.zeros(WEEK_SLOTS, dtype=bool)
+        windows: List[Window] = []
+        order = np.argsort(-scores, kind='stable')
+        for start in order:
+            if len(windows) >= top_k:
+                break
+            score = int(scores[start])
+            if score < min_players:
+                break
+            idx = (start + np.arange(min_slots)) % WEEK_SLOTS
+            if taken[idx].any():
+                continue
+            players = acc[start]
+            end = start + min_slots
+            while end - start < WEEK_SLOTS and not taken[end % WEEK_SLOTS] \
+                    and not (players & ~combined[end % WEEK_SLOTS]).any():
+                end += 1
+            taken[(start + np.arange(end - start)) % WEEK_SLOTS] = True
+            windows.append((int(start), int(end), score))
+        return windows
+
+    def players_in(self, games: Sequence[str], start: int, end: int) -> List[str]:
+        """User IDs free across [start, end) UTC slots for all ``games``."""
+        combined = self._combined(games)
+        if combined is None:
+            return []
+        slots = np.arange(start, end) % WEEK_SLOTS
+        mask = np.bitwise_and.reduce(combined[slots], axis=0)
+        bits = np.unpackbits(mask.astype('<u8').view(np.uint8), bitorder='little')
+        by_row = {row: uid for uid, row in self._rows.items()}
+        return [by_row[r] for r in np.flatnonzero(bits) if r in by_row]
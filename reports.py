@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Reports — pure renderers + bounded worker pools
+# =========================================================
+# Heavy commands take a small snapshot on the event loop
+# (only the rows they need, names already resolved) and hand
+# it to a pool. Renderers here import nothing from the bot so
+# they can run in a worker process.
+# =========================================================
+
+import asyncio
+import logging
+import threading
+import time as _time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from datetime import date, time
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Sequence, Tuple
+
+from tzconvert import week_converter
+
+logger = logging.getLogger('availability_bot')
+
+DAY_ABBR = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# One summary row: (display name, start minute, end minute, timezone)
+SummaryRow = Tuple[str, int, int, str]
+
+
+def fmt_12h(t: time) -> str:
+    formatted = t.strftime("%I:%M %p").lstrip("0")
+    return formatted if formatted else "12:00 AM"
+
+
+def fmt_minutes_12h(minute: int) -> str:
+    minute %= 1440
+    return fmt_12h(time(minute // 60, minute % 60))
+
+
+def render_summary(game: str, display_tz: str, monday: date, days: Sequence[Sequence[SummaryRow]]) -> str:
+    """Summary text for one game with every entry converted to ``display_tz``."""
+    converter = week_converter(monday)
+    lines = [f"**{game} Availability Summary ({display_tz})**\n"]
+    total = 0
+    for di, day_rows in enumerate(days):
+        names, rows = [], []
+        for name, start, end, tz in day_rows:
+            names.append(name)
+            rows.append((di, start, end, tz))
+        entries = []
+        for name, row, span in zip(names, rows, converter.convert_batch(rows, display_tz)):
+            if span is None:
+                entries.append(f"{name}: {fmt_minutes_12h(row[1])}–{fmt_minutes_12h(row[2])} (raw)")
+            else:
+                entries.append(f"{name}: {fmt_minutes_12h(span[1])}–{fmt_minutes_12h(span[3])}")
+        if entries:
+            lines.append(f"**{DAY_ABBR[di]}** ({len(entries)}):")
+            lines.extend(entries)
+            lines.append("")
+            total += len(entries)
+        else:
+            lines.append(f"**{DAY_ABBR[di]}**: None\n")
+    lines.append(f"**Total**: {total}")
+    return "\n".join(lines)
+
+
+class RenderedSummary(NamedTuple):
+    text: str                # the whole report, for short replies and the .txt download
+    title: str               # header line, used as the embed title
+    pages: Tuple[str, ...]   # body split on line boundaries, each fits one embed
+
+
+def paginate_summary(text: str, page_chars: int = 3800) -> RenderedSummary:
+    header, _, body = text.partition("\n")
+    pages, page, size = [], [], 0
+    for line in body.strip("\n").split("\n"):
+        if page and size + len(line) + 1 > page_chars:
+            pages.append("\n".join(page).strip("\n"))
+            page, size = [], 0
+        page.append(line)
+        size += len(line) + 1
+    if page:
+        pages.append("\n".join(page).strip("\n"))
+    return RenderedSummary(text, header.strip('*'), tuple(pages) or ("",))
+
+
+def render_summary_pages(game: str, display_tz: str, monday: date,
+                         days: Sequence[Sequence[SummaryRow]]) -> RenderedSummary:
+    """render_summary plus pagination, in one worker round trip."""
+    return paginate_summary(render_summary(game, display_tz, monday, days))
+
+
+class SummaryCache:
+    """
+    LRU of rendered summaries. Keys include the game's data version, which
+    every mutation bumps, so a changed roster simply misses; nothing is
+    invalidated in place and stale keys age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, RenderedSummary]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._epoch = 0  # bumped for changes that touch every game (timezones, restores)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, game: str) -> Tuple[int, int]:
+        return self._epoch, self._versions.get(game, 0)
+
+    def bump(self, game: Optional[str] = None):
+        with self._lock:
+            if game is None:
+                self._epoch += 1
+            else:
+                self._versions[game] = self._versions.get(game, 0) + 1
+
+    def get(self, key: Hashable) -> Optional[RenderedSummary]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: RenderedSummary):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PoolBusy(Exception):
+    pass
+
+
+class ReportPool:
+    """
+    Runs blocking renderers on ``executor`` with at most ``max_concurrent``
+    jobs in flight and ``max_pending`` waiting for a slot (beyond that
+    ``run`` raises PoolBusy). A job that outlives ``timeout`` raises
+    asyncio.TimeoutError for the caller but keeps its slot until it really
+    finishes, so timeouts cannot pile work up behind the pool.
+    """
+
+    def __init__(self, name: str, executor: Executor, max_concurrent: int = 2,
+                 max_pending: int = 8, timeout: float = 30.0):
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._max_concurrent = max_concurrent
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_concurrent)
+        return self._slots
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        if self.waiting >= self.max_pending:
+            raise PoolBusy(f"{self.name} pool is busy")
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        started = _time.perf_counter()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        except BaseException:
+            self.running -= 1
+            self.slots.release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"{self.name} job {getattr(fn, '__name__', fn)} timed out after "
+                           f"{_time.perf_counter() - started:.1f}s; it keeps its slot until it ends")
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+
+    def _release(self, future):
+        self.running -= 1
+        self.completed += 1
+        self.slots.release()
+        if not future.cancelled() and future.exception() is not None:
+            # Retrieved here so a timed-out job's error is not reported as never retrieved
+            logger.debug(f"{self.name} job failed: {future.exception()}")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Poll Scheduler — per-game weekly deadlines
+# =========================================================
+# Each game has a weekly "DAY HH:MM" (UTC) poll deadline. The
+# scheduler sleeps until the earliest one, posts every game
+# that is due concurrently, and after downtime catches up on
+# deadlines it missed (within a configurable window). Whether
+# a game is due comes from its current poll's message ID:
+# Discord IDs are snowflakes that encode their creation time,
+# so nothing extra has to be persisted.
+# =========================================================
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger('availability_bot')
+
+WEEKDAYS = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+DEFAULT_SCHEDULE = 'SUN 00:00'
+# Longest single sleep, so a suspended host or a clock jump is noticed within the hour
+MAX_SLEEP = 3600.0
+# A post that failed (channel gone, Discord error) is retried this much later
+RETRY_DELAY = timedelta(minutes=5)
+
+
+class PollSchedule(NamedTuple):
+    weekday: int   # 0 = Monday
+    minute: int    # minutes after 00:00 UTC
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def parse(spec: str) -> 'PollSchedule':
+        """``"SUN 00:00"`` / ``"fri 18:30"`` → PollSchedule; ValueError otherwise."""
+        try:
+            day, hhmm = spec.split()
+            h, m = hhmm.split(':')
+            weekday, minute = WEEKDAYS.index(day[:3].upper()), int(h) * 60 + int(m)
+        except ValueError:
+            raise ValueError("Schedules look like `SUN 00:00` (weekday and 24h time, UTC)") from None
+        if not (0 <= int(h) < 24 and 0 <= int(m) < 60):
+            raise ValueError("Schedule time must be between 00:00 and 23:59 UTC")
+        return PollSchedule(weekday, minute)
+
+    def __str__(self) -> str:
+        return f"{WEEKDAYS[self.weekday]} {self.minute // 60:02d}:{self.minute % 60:02d}"
+
+    def previous(self, now: datetime) -> datetime:
+        """Latest deadline at or before ``now`` (naive UTC)."""
+        midnight = datetime(now.year, now.month, now.day)
+        deadline = midnight - timedelta(days=(now.weekday() - self.weekday) % 7, minutes=-self.minute)
+        return deadline if deadline <= now else deadline - timedelta(days=7)
+
+    def next(self, now: datetime) -> datetime:
+        """Earliest deadline strictly after ``now``."""
+        return self.previous(now) + timedelta(days=7)
+
+
+def poll_week(deadline: datetime) -> date:
+    """The week a poll collects: it starts on the first Monday on or after the deadline."""
+    day = deadline.date()
+    return day + timedelta(days=(7 - day.weekday()) % 7)
+
+
+class PollScheduler:
+    """
+    ``schedules()`` gives each active game's PollSchedule, ``last_posted(game)``
+    when its current poll was posted (None if it never had one), and
+    ``post(game, deadline)`` posts a poll, returning False if it couldn't.
+
+    A game is due once its latest deadline is newer than its current poll and
+    no more than ``catch_up`` old. Games that never had a poll wait for their
+    next deadline, so adding a game mid-week doesn't post straight away.
+    """
+
+    def __init__(self, schedules: Callable[[], Dict[str, PollSchedule]],
+                 last_posted: Callable[[str], Optional[datetime]],
+                 post: Callable[[str, datetime], Awaitable[bool]],
+                 catch_up: timedelta = timedelta(hours=48),
+                 clock: Callable[[], datetime] = datetime.utcnow):
+        self.schedules = schedules
+        self.last_posted = last_posted
+        self.post = post
+        self.catch_up = catch_up
+        self.clock = clock
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._retry_at: Dict[str, datetime] = {}
+        self._first_seen: Dict[str, datetime] = {}
+        self._skipped: Dict[str, datetime] = {}
+        self.posted = 0
+        self.caught_up = 0
+        self.failed = 0
+        self.next_deadline: Optional[datetime] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reschedule(self):
+        """Recompute deadlines now (a game or its schedule changed)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def due(self, now: datetime) -> List[Tuple[str, datetime]]:
+        out = []
+        for game, schedule in self.schedules().items():
+            deadline = schedule.previous(now)
+            last = self.last_posted(game)
+            if last is None:
+                # Never polled: start with the first deadline after we first saw the game
+                first_seen = self._first_seen.setdefault(game, now)
+                if deadline <= first_seen:
+                    continue
+            elif last >= deadline:
+                continue
+            if now - deadline > self.catch_up:
+                if self._skipped.get(game) != deadline:
+                    self._skipped[game] = deadline
+                    logger.warning(f"{game} poll due {deadline:%a %b %d %H:%M} UTC was missed by more than "
+                                   f"{self.catch_up}; waiting for the next deadline")
+                continue
+            retry = self._retry_at.get(game)
+            if retry is not None and now < retry:
+                continue
+            out.append((game, deadline))
+        return out
+
+    def next_wake(self, now: datetime) -> datetime:
+        wake = [s.next(now) for s in self.schedules().values()] + [t for t in self._retry_at.values() if t > now]
+        self.next_deadline = min(wake) if wake else None
+        return self.next_deadline or now + timedelta(seconds=MAX_SLEEP)
+
+    async def run_due(self, now: datetime):
+        due = self.due(now)
+        if not due:
+            return
+        results = await asyncio.gather(*(self.post(game, deadline) for game, deadline in due),
+                                       return_exceptions=True)
+        for (game, deadline), result in zip(due, results):
+            if result is True:
+                self.posted += 1
+                self._retry_at.pop(game, None)
+                if now - deadline > RETRY_DELAY:
+                    self.caught_up += 1
+                continue
+            self.failed += 1
+            self._retry_at[game] = now + RETRY_DELAY
+            reason = f": {result}" if isinstance(result, BaseException) else ""
+            logger.error(f"{game} poll due {deadline:%a %H:%M} UTC not posted{reason}; retrying in {RETRY_DELAY}")
+
+    async def run(self):
+        self._wake = asyncio.Event()
+        while True:
+            await self.run_due(self.clock())
+            wake = self.next_wake(self.clock())
+            delay = min(MAX_SLEEP, max(0.0, (wake - self.clock()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Startup — single-instance lock + phase timer
+# =========================================================
+# The instance guard is an flock on a pidfile in the working
+# directory: one syscall instead of walking every process on
+# the host, and the kernel drops the lock when the process
+# dies, so a crashed bot never leaves a stale lock behind.
+# The phase timer logs how long each part of a (re)start took
+# so systemd restarts can be kept short.
+# =========================================================
+
+import fcntl
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('availability_bot')
+
+
+class InstanceLock:
+    """
+    Exclusive, non-blocking flock on ``path``, which then holds our PID.
+    ``acquire`` retries for ``wait`` seconds so a restart can overlap the
+    old process's shutdown; it returns False if another instance keeps
+    the lock. The file descriptor stays open for the life of the process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fd: Optional[int] = None
+
+    def acquire(self, wait: float = 0.0) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    return False
+                time.sleep(0.1)
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self.fd = fd
+        return True
+
+    def owner(self) -> Optional[int]:
+        """PID written by whoever holds the lock (best effort)."""
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def release(self):
+        if self.fd is None:
+            return
+        try:
+            os.ftruncate(self.fd, 0)
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+
+class StartupTimer:
+    """
+    Wall-clock phases of one start, measured from ``origin`` (the process
+    start time). Phases may overlap (data loads during login); each is
+    recorded once, so reconnects don't overwrite the first start.
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.time()
+        self._open: Dict[str, float] = {}
+        self.phases: List[Tuple[str, float]] = []
+        self.done = False
+
+    def begin(self, phase: str, at: Optional[float] = None):
+        if not self.done and phase not in self._open and not self.recorded(phase):
+            self._open[phase] = time.time() if at is None else at
+
+    def end(self, phase: str):
+        started = self._open.pop(phase, None)
+        if started is not None:
+            self.phases.append((phase, time.time() - started))
+
+    def recorded(self, phase: str) -> bool:
+        return any(name == phase for name, _ in self.phases)
+
+    def elapsed(self) -> float:
+        return time.time() - self.origin
+
+    def finish(self) -> str:
+        """Close the timer and return the one-line report (logged as well)."""
+        self.done = True
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases)
+        report = f"Startup: {parts}; serving {self.elapsed():.2f}s after process start"
+        logger.info(report)
+        return report
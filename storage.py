@@ -0,0 +1,934 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# Storage — persistence backends for PixelB0T
+# =========================================================
+# Mutations happen in memory on the event loop; backends
+# persist them (JSON snapshot + journal, or SQLite rows)
+# without rewriting everything on every change.
+# =========================================================
+
+import glob
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time as _time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from model import AvailabilityModel
+
+logger = logging.getLogger('availability_bot')
+
+# -----------------------
+# Durability modes
+# -----------------------
+# always : write-through, every change is serialized + fsynced inline (legacy behaviour)
+# batch  : write-behind, one fsynced write per coalescing window (default)
+# lazy   : write-behind, no fsync per window; fsync only on close/explicit flush
+DURABILITY_MODES = ('always', 'batch', 'lazy')
+
+# Optional callback(target, seconds) run after every file write / commit (used for metrics)
+_write_observer: Optional[Callable[[str, float], None]] = None
+
+
+def set_write_observer(fn: Optional[Callable[[str, float], None]]):
+    global _write_observer
+    _write_observer = fn
+
+
+def _observe_write(target: str, started: float):
+    if _write_observer is not None:
+        try:
+            _write_observer(target, _time.perf_counter() - started)
+        except Exception:
+            pass
+
+
+def snapshot(obj):
+    """Copy nested dict/list containers so the copy can be serialized off-loop."""
+    if isinstance(obj, dict):
+        return {k: snapshot(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [snapshot(v) for v in obj]
+    return obj
+
+
+def _write_atomic(fname: str, write: Callable[[object], None], fsync: bool) -> bool:
+    """Run ``write(file)`` on a temp file, then rename it over ``fname``. Returns False on failure."""
+    tmp = f"{fname}.tmp"
+    started = _time.perf_counter()
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            write(f)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, fname)
+        _observe_write(os.path.basename(fname), started)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to save {fname}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return False
+
+
+def write_json_atomic(fname: str, obj, fsync: bool = True, indent: Optional[int] = None) -> bool:
+    """Serialize ``obj`` to ``fname`` via a temp file + rename. Returns False on failure."""
+    def write(f):
+        if indent is None:
+            json.dump(obj, f, separators=(',', ':'))
+        else:
+            json.dump(obj, f, indent=indent)
+    return _write_atomic(fname, write, fsync)
+
+
+def write_json_items(fname: str, items: Iterable[Tuple[str, object]], fsync: bool = True) -> bool:
+    """
+    Write a JSON object member by member from (key, value) pairs, so only one
+    member's containers exist at a time. Returns False on failure.
+    """
+    def write(f):
+        sep = '{'
+        for key, value in items:
+            f.write(f"{sep}{json.dumps(key)}:{json.dumps(value, separators=(',', ':'))}")
+            sep = ','
+        f.write('{}' if sep == '{' else '}')
+    return _write_atomic(fname, write, fsync)
+
+
+class Flusher:
+    """
+    Background thread that runs ``callback`` at most once per ``max_delay``
+    seconds after ``mark()`` is called. Multiple marks inside the window
+    collapse into a single callback run.
+    """
+
+    def __init__(self, name: str, callback: Callable[[], None], max_delay: float = 2.0):
+        self.name = name
+        self.callback = callback
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._dirty_since: Optional[float] = None
+        self._force = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"flusher-{name}", daemon=True)
+        self._thread.start()
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty_since is not None
+
+    def mark(self):
+        with self._cond:
+            if self._dirty_since is None:
+                self._dirty_since = _time.monotonic()
+                self._cond.notify()
+
+    def kick(self):
+        """Ask the worker to flush now instead of waiting out the window."""
+        with self._cond:
+            if self._dirty_since is not None:
+                self._force = True
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._dirty_since is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                deadline = self._dirty_since + self.max_delay
+                while not self._force and not self._closed:
+                    remaining = deadline - _time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                self._dirty_since = None
+                self._force = False
+            try:
+                self.callback()
+            except Exception as e:
+                logger.error(f"Flush {self.name} failed: {e}")
+
+    def close(self):
+        """Stop the worker thread. Pending work is NOT run; callers flush first."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+
+class WriteBehindFile:
+    """
+    Write-behind JSON document.
+
+    ``source`` returns the live object; it is snapshotted under ``lock`` (which
+    callers also hold while mutating) and serialized/written without the lock.
+    """
+
+    def __init__(self, fname: str, source: Callable[[], dict], lock: threading.RLock,
+                 max_delay: float = 2.0, durability: str = 'batch'):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode {durability!r}; use one of {DURABILITY_MODES}")
+        self.fname = fname
+        self.source = source
+        self.lock = lock
+        self.durability = durability
+        self.writes = 0
+        self._write_lock = threading.Lock()
+        self._flusher = None
+        if durability != 'always':
+            self._flusher = Flusher(os.path.basename(fname), self._flush_snapshot, max_delay)
+
+    def mark_dirty(self):
+        if self._flusher is None:
+            self.flush()
+        else:
+            self._flusher.mark()
+
+    def _flush_snapshot(self, fsync: Optional[bool] = None):
+        if fsync is None:
+            fsync = self.durability != 'lazy'
+        # Serialize writers so an older snapshot can never land after a newer one
+        with self._write_lock:
+            with self.lock:
+                data = snapshot(self.source())
+            if write_json_atomic(self.fname, data, fsync=fsync):
+                self.writes += 1
+
+    def flush(self):
+        """Synchronously write the current state (fsynced regardless of mode)."""
+        self._flush_snapshot(fsync=True)
+
+    def close(self):
+        if self._flusher is not None:
+            self._flusher.close()
+        self.flush()
+
+
+class Journal:
+    """
+    Append-only mutation log. Each record is one compact JSON line
+    ``[seq, op, *args]`` with a strictly increasing ``seq``; lines are buffered
+    and written + fsynced together (group commit) by a Flusher unless
+    durability is 'always'. Segment files are ``<base>.<first seq>`` and are
+    deleted once a snapshot covers them.
+
+    ``_lock`` only guards the buffer, so appends never wait on the disk; the
+    writes themselves are serialized by ``_write_lock``.
+    """
+
+    def __init__(self, base: str, max_delay: float = 2.0, durability: str = 'batch'):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode {durability!r}; use one of {DURABILITY_MODES}")
+        self.base = base
+        self.durability = durability
+        self.seq = 0
+        self.since_rotate = 0
+        self.commits = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._sealed: Optional[List[str]] = None  # records that close the current segment
+        self._file = None
+        self._flusher = None
+        if durability != 'always':
+            self._flusher = Flusher(os.path.basename(base), self._commit, max_delay)
+
+    def segments(self) -> List[str]:
+        return sorted(p for p in glob.glob(f"{glob.escape(self.base)}.*") if p.rsplit('.', 1)[-1].isdigit())
+
+    def replay(self, after_seq: int = 0) -> Iterator[list]:
+        """Yield records newer than ``after_seq``; a torn last line ends its segment."""
+        last = after_seq
+        for path in self.segments():
+            with open(path, 'r', encoding='utf-8') as f:
+                for lineno, line in enumerate(f, 1):
+                    try:
+                        record = json.loads(line)
+                        seq = record[0]
+                    except (ValueError, IndexError, TypeError, KeyError):
+                        logger.warning(f"Journal {path}: ignoring unreadable tail from line {lineno}")
+                        break
+                    if seq <= last:
+                        continue
+                    last = seq
+                    self.since_rotate += 1  # not in the snapshot yet
+                    yield record
+        self.seq = max(self.seq, last)
+
+    def append(self, op: str, *args) -> int:
+        with self._lock:
+            self.seq += 1
+            self.since_rotate += 1
+            self._buffer.append(json.dumps([self.seq, op, *args], separators=(',', ':')) + "\n")
+            seq = self.seq
+        if self._flusher is None:
+            self._commit()
+        else:
+            self._flusher.mark()
+        return seq
+
+    def _open(self, first: int):
+        if self._file is None:
+            self._file = open(f"{self.base}.{first:012d}", 'a', encoding='utf-8')
+
+    def _commit(self, fsync: Optional[bool] = None):
+        """Write every buffered record with one write (and one fsync)."""
+        if fsync is None:
+            fsync = self.durability != 'lazy'
+        with self._write_lock:
+            # Taken under the write lock, so batches reach the file in seq order
+            with self._lock:
+                sealed, self._sealed = self._sealed, None
+                lines, self._buffer = self._buffer, []
+                last = self.seq
+            if sealed is None and not lines:
+                return
+            started = _time.perf_counter()
+            first = last - len(lines) + 1
+            if sealed is not None:
+                if sealed:
+                    self._open(first - len(sealed))
+                    self._file.write("".join(sealed))
+                if self._file is not None:
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self._file.close()
+                    self._file = None
+            if lines:
+                self._open(first)
+                self._file.write("".join(lines))
+                self._file.flush()
+                if fsync:
+                    os.fsync(self._file.fileno())
+            self.commits += 1
+        _observe_write(os.path.basename(self.base), started)
+
+    def flush(self):
+        self._commit(fsync=True)
+
+    def rotate(self) -> int:
+        """
+        Seal the current segment: what is buffered still goes into it, the next
+        record starts a new one. Nothing is written here; the next commit (or
+        ``flush()``) writes and closes the sealed segment. Returns the last seq
+        in it.
+        """
+        with self._lock:
+            if self._sealed is None:
+                self._sealed = self._buffer
+            else:
+                self._sealed.extend(self._buffer)
+            self._buffer = []
+            self.since_rotate = 0
+            return self.seq
+
+    def drop_through(self, seq: int):
+        """Delete the segments closed by ``rotate()`` once a snapshot through ``seq`` is on disk."""
+        with self._write_lock:
+            current = getattr(self._file, 'name', None)
+            for path in self.segments():
+                if path == current or int(path.rsplit('.', 1)[-1]) > seq:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not remove journal segment {path}: {e}")
+
+    def close(self):
+        if self._flusher is not None:
+            self._flusher.close()
+        self._commit(fsync=True)
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# -----------------------
+# Loading & migration
+# -----------------------
+def load_json(fname: str) -> dict:
+    if os.path.exists(fname):
+        try:
+            with open(fname, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load {fname}: {e}")
+            shutil.copy(fname, f"{fname}.broken_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}")
+    return {}
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def iter_json_object(text: str) -> Iterator[Tuple[str, object]]:
+    """
+    The members of a top-level JSON object, decoded one at a time. Each decode
+    is short, so other threads get the GIL between members; json.loads holds
+    it for the whole document. Raises ValueError if ``text`` isn't an object.
+    """
+    ws = _WHITESPACE.match
+    idx = ws(text, 0).end()
+    if text[idx:idx + 1] != '{':
+        raise ValueError("not a JSON object")
+    idx = ws(text, idx + 1).end()
+    if text[idx:idx + 1] == '}':
+        idx += 1
+    else:
+        while True:
+            key, idx = _decoder.raw_decode(text, idx)
+            idx = ws(text, idx).end()
+            if not isinstance(key, str) or text[idx:idx + 1] != ':':
+                raise ValueError(f"bad object key at {idx}")
+            value, idx = _decoder.raw_decode(text, ws(text, idx + 1).end())
+            yield key, value
+            idx = ws(text, idx).end()
+            sep = text[idx:idx + 1]
+            idx = ws(text, idx + 1).end()
+            if sep == '}':
+                break
+            if sep != ',':
+                raise ValueError(f"expected ',' or '}}' at {idx}")
+    if ws(text, idx).end() != len(text):
+        raise ValueError(f"extra data at {idx}")
+
+
+def load_availability(fname: str) -> AvailabilityModel:
+    """
+    availability.json straight into a model, one user at a time, so a large
+    file neither holds the GIL for the whole parse nor keeps every parsed
+    record alive until the model is built.
+    """
+    if not os.path.exists(fname):
+        return AvailabilityModel()
+    try:
+        with open(fname, 'r', encoding='utf-8') as f:
+            return AvailabilityModel.from_items(iter_json_object(f.read()))
+    except (OSError, ValueError):
+        # load_json reports the problem and sets a broken file aside
+        return AvailabilityModel.from_json(load_json(fname))
+
+
+def migrate_multigame(data: dict, games: Iterable[str], default_game: str) -> Optional[dict]:
+    """
+    Convert legacy single-game records ({user: {day: [...]}}) to the multi-game
+    layout ({user: {game: {day: [...]}}}). Returns None when nothing needs migrating.
+    """
+    games = tuple(games)
+    if not data:
+        return None
+    needs_migration = any(
+        not isinstance(user_data, dict) or
+        not any(game in user_data for game in games)
+        for user_data in data.values()
+    )
+    if not needs_migration:
+        return None
+    new_data = {}
+    for user_id, user_data in data.items():
+        if isinstance(user_data, dict) and any(game in user_data for game in games):
+            new_data[user_id] = user_data
+        else:
+            new_data[user_id] = {default_game: user_data}
+    return new_data
+
+
+def iter_entries(avail) -> Iterator[Tuple[str, str, int, list]]:
+    """Yield (user_id, game, day, [start, end, tz]) for every well-formed entry of a dict or model."""
+    if isinstance(avail, AvailabilityModel):
+        yield from avail.iter_entries()
+        return
+    for user_id, user_data in avail.items():
+        if not isinstance(user_data, dict):
+            continue
+        for game, game_data in user_data.items():
+            if not isinstance(game_data, dict):
+                continue
+            for day, entry in game_data.items():
+                try:
+                    di = int(day)
+                    st, et, tz = (list(entry) + [''])[:3]
+                except (TypeError, ValueError):
+                    logger.warning(f"Skipping malformed entry {user_id}/{game}/{day}: {entry!r}")
+                    continue
+                yield user_id, game, di, [st, et, tz or '']
+
+
+# -----------------------
+# Backends
+# -----------------------
+class JsonBackend:
+    """
+    availability.json / user_tzs.json as a snapshot plus an append-only journal.
+
+    Every mutation appends one record to the journal (group-committed); a
+    background compaction folds the journal into fresh snapshot files once
+    ``compact_every`` records have accumulated. ``journal_state.json`` is
+    written last and names the seq the snapshot covers, so startup loads the
+    snapshot and replays only the newer records. Replayed operations set or
+    delete absolute values, so replaying a record the snapshot already holds
+    is harmless. Reads are served from the live model the bot mutates.
+    """
+    name = 'json'
+
+    def __init__(self, avail_file: str, tz_file: str, max_delay: float = 2.0, durability: str = 'batch',
+                 compact_every: int = 5000, processed_limit: int = 2000):
+        self.avail_file = avail_file
+        self.tz_file = tz_file
+        stem = os.path.splitext(avail_file)[0]
+        self.state_file = f"{stem}.state.json"
+        self.durability = durability
+        self.compact_every = compact_every
+        self.lock = threading.RLock()
+        self.avail = AvailabilityModel()
+        self.tzs: dict = {}
+        self.polls: Dict[str, int] = {}
+        self.processed = deque(maxlen=processed_limit)
+        self.compactions = 0
+        self._stale = True  # the snapshot files lag the journal (or were never written)
+        self.journal = Journal(f"{stem}.journal", max_delay, durability)
+        self._compact_lock = threading.RLock()
+        self._compactor = Flusher(f"{os.path.basename(stem)}-compact", self.compact, 0.0)
+
+    def load(self) -> Tuple[AvailabilityModel, dict]:
+        self.avail = load_availability(self.avail_file)
+        self.tzs = load_json(self.tz_file)
+        state = load_json(self.state_file)
+        self.polls = dict(state.get('polls') or {})
+        self.processed.extend(state.get('processed') or [])
+        after = int(state.get('seq') or 0)
+        self._stale = not os.path.exists(self.state_file)
+        replayed = 0
+        for record in self.journal.replay(after):
+            try:
+                self._apply(record[1], record[2:])
+            except (TypeError, ValueError, IndexError, AttributeError) as e:
+                logger.warning(f"Skipping bad journal record {record!r}: {e}")
+                continue
+            replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} journal records after snapshot seq {after}")
+            self._compactor.mark()
+        return self.avail, self.tzs
+
+    def load_runtime(self) -> Tuple[Dict[str, int], List[int]]:
+        """Poll message IDs per game and recently processed message IDs, as of load()."""
+        with self.lock:
+            return dict(self.polls), list(self.processed)
+
+    def _apply(self, op: str, args: list):
+        """Re-apply one journal record to the in-memory state."""
+        if op == 'set':
+            user_id, game, day, entry = args
+            self.avail.set_raw(user_id, game, day, entry)
+        elif op == 'setm':
+            user_id, game, entries = args
+            for day, entry in entries.items():
+                self.avail.set_raw(user_id, game, int(day), entry)
+        elif op == 'del':
+            user_id, game, days = args
+            self.avail.delete(user_id, game, days)
+        elif op == 'tz':
+            user_id, tz = args
+            self.tzs[user_id] = tz
+        elif op == 'poll':
+            game, msg_id = args
+            self.polls[game] = msg_id
+        elif op == 'seen':
+            self.processed.append(args[0])
+        else:
+            raise ValueError(f"unknown op {op!r}")
+
+    def _append(self, op: str, *args):
+        self.journal.append(op, *args)
+        if self.journal.since_rotate >= self.compact_every:
+            self._compactor.mark()
+
+    # Mutations: the caller has already updated the model under self.lock
+    def put_entry(self, user_id: str, game: str, day: int, entry: list):
+        self._append('set', user_id, game, int(day), list(entry))
+
+    def put_entries(self, user_id: str, game: str, entries: Dict[int, list]):
+        self._append('setm', user_id, game, {str(d): list(e) for d, e in entries.items()})
+
+    def delete_entries(self, user_id: str, game: Optional[str] = None, days: Optional[Iterable[int]] = None):
+        self._append('del', user_id, game, None if days is None else [int(d) for d in days])
+
+    def put_tz(self, user_id: str, tz: str):
+        self._append('tz', user_id, tz)
+
+    def record_poll(self, game: str, msg_id: int):
+        with self.lock:
+            self.polls[game] = msg_id
+        self._append('poll', game, msg_id)
+
+    def record_processed(self, msg_id: int):
+        with self.lock:
+            self.processed.append(msg_id)
+        self._append('seen', msg_id)
+
+    def replace_availability(self, avail: AvailabilityModel):
+        with self.lock:
+            self.avail = avail
+        self.compact(force=True)
+
+    def compact(self, force: bool = False) -> bool:
+        """
+        Fold the journal into the snapshot files. Under the lock this only seals
+        the journal segment and takes a copy-on-write snapshot of the model;
+        serializing and fsyncing happen after. The state file goes last; only
+        then are the covered segments deleted. Skipped when nothing was
+        journaled since the last compaction, unless ``force``. Returns False if
+        a write failed (the journal is kept and replay still covers everything).
+        """
+        with self._compact_lock:
+            started = _time.perf_counter()
+            with self.lock:
+                if not (force or self._stale or self.journal.since_rotate):
+                    return True
+                self._stale = True
+                seq = self.journal.rotate()
+                avail = self.avail.snapshot()
+                tzs = dict(self.tzs)
+                state = {'seq': seq, 'polls': dict(self.polls), 'processed': list(self.processed)}
+            self.journal.flush()
+            if not (write_json_items(self.avail_file, avail.iter_json()) and write_json_atomic(self.tz_file, tzs)
+                    and write_json_atomic(self.state_file, state)):
+                return False
+            self._stale = False
+            self.journal.drop_through(seq)
+            self.compactions += 1
+            logger.debug(f"Compacted journal through seq {seq} in {_time.perf_counter() - started:.2f}s")
+            return True
+
+    def user_count(self) -> int:
+        return len(self.avail)
+
+    def snapshot_files(self, work_dir: str) -> Dict[str, str]:
+        """Copy a consistent set of snapshot files (journal folded in) into ``work_dir``."""
+        out = {}
+        with self._compact_lock:
+            self.compact()
+            for fname in (self.avail_file, self.tz_file, self.state_file):
+                if os.path.exists(fname):
+                    dest = os.path.join(work_dir, os.path.basename(fname))
+                    shutil.copy(fname, dest)
+                    out[os.path.basename(fname)] = dest
+        return out
+
+    def restore_files(self, files: Dict[str, str]) -> Tuple[AvailabilityModel, dict]:
+        """
+        Replace availability/timezones with a backup's files and load them.
+        Blocking, but the storage lock is only taken to swap the model; the
+        journal is discarded, open polls and handled reply IDs are kept.
+        """
+        with self._compact_lock:
+            for fname in (self.avail_file, self.tz_file):
+                src = files.get(os.path.basename(fname))
+                if src is None:
+                    if os.path.exists(fname):
+                        os.remove(fname)
+                    continue
+                shutil.copy(src, f"{fname}.tmp")
+                os.replace(f"{fname}.tmp", fname)
+            avail = load_availability(self.avail_file)
+            tzs = load_json(self.tz_file)
+            with self.lock:
+                self.avail, self.tzs = avail, tzs
+            # The new state file covers every journal record so far, so none replays over the backup
+            self.compact(force=True)
+        return avail, tzs
+
+    def flush(self):
+        self.journal.flush()
+
+    def close(self):
+        self._compactor.close()
+        self.compact()
+        self.journal.close()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS availability (
+    user_id    TEXT    NOT NULL,
+    game       TEXT    NOT NULL,
+    day        INTEGER NOT NULL,
+    start_time TEXT    NOT NULL,
+    end_time   TEXT    NOT NULL,
+    tz         TEXT    NOT NULL DEFAULT '',
+    PRIMARY KEY (user_id, game, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_tzs (
+    user_id TEXT PRIMARY KEY,
+    tz      TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+-- Recently handled Discord message IDs, so replies are not applied twice across restarts
+CREATE TABLE IF NOT EXISTS processed_messages (
+    message_id INTEGER PRIMARY KEY
+);
+"""
+
+
+class SqliteBackend:
+    """
+    SQLite (WAL) store with one row per (user, game, weekday).
+
+    A mutation only queues its statement; the Flusher thread runs the queue
+    as one transaction, so writers on the event loop never wait on a COMMIT
+    (with durability 'always' the writer commits inline instead). The
+    connection belongs to whoever holds ``_db_lock``; the queue is handed
+    over under ``_pending_lock``, which is never held while waiting on
+    anything else. The bot still keeps the dicts returned by ``load()`` as
+    its in-memory working set.
+    """
+    name = 'sqlite'
+
+    def __init__(self, db_path: str, max_delay: float = 2.0, durability: str = 'batch',
+                 processed_limit: int = 2000):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode {durability!r}; use one of {DURABILITY_MODES}")
+        self.db_path = db_path
+        self.durability = durability
+        self.processed_limit = processed_limit
+        self._processed_since_trim = 0
+        self.lock = threading.RLock()
+        self.commits = 0
+        self._db_lock = threading.RLock()
+        self._pending_lock = threading.Lock()
+        self._pending: List[Tuple[str, object, bool]] = []  # (sql, params, executemany)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={'NORMAL' if durability == 'lazy' else 'FULL'}")
+        self.conn.executescript(_SQLITE_SCHEMA)
+        self._flusher = None
+        if durability != 'always':
+            self._flusher = Flusher(os.path.basename(db_path), self._commit, max_delay)
+
+    def _drain(self):
+        """Run every queued statement in one transaction. Caller holds ``_db_lock``."""
+        with self._pending_lock:
+            ops, self._pending = self._pending, []
+        if not ops:
+            return
+        started = _time.perf_counter()
+        self.conn.execute("BEGIN")
+        try:
+            for sql, params, many in ops:
+                if many:
+                    self.conn.executemany(sql, params)
+                else:
+                    self.conn.execute(sql, params)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.commits += 1
+        _observe_write(os.path.basename(self.db_path), started)
+
+    def _commit(self):
+        with self._db_lock:
+            self._drain()
+
+    def _write(self, sql: str, params=(), many: bool = False):
+        with self._pending_lock:
+            self._pending.append((sql, params, many))
+        if self._flusher is None:
+            self._commit()
+        else:
+            self._flusher.mark()
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._db_lock:
+            self._drain()
+            return self.conn.execute(sql, params).fetchall()
+
+    def is_empty(self) -> bool:
+        row = self._query("SELECT EXISTS(SELECT 1 FROM availability) OR EXISTS(SELECT 1 FROM user_tzs)")[0]
+        return not row[0]
+
+    def load(self) -> Tuple[AvailabilityModel, dict]:
+        avail = AvailabilityModel()
+        with self._db_lock:
+            self._drain()
+            for user_id, game, day, st, et, tz in self.conn.execute(
+                    "SELECT user_id, game, day, start_time, end_time, tz FROM availability"):
+                avail.set_raw(user_id, game, day, [st, et, tz])
+            tzs = dict(self.conn.execute("SELECT user_id, tz FROM user_tzs"))
+        return avail, tzs
+
+    _UPSERT = ("INSERT INTO availability (user_id, game, day, start_time, end_time, tz) VALUES (?, ?, ?, ?, ?, ?) "
+               "ON CONFLICT (user_id, game, day) DO UPDATE SET "
+               "start_time = excluded.start_time, end_time = excluded.end_time, tz = excluded.tz")
+
+    @staticmethod
+    def _row(user_id: str, game: str, day: int, entry: list) -> tuple:
+        st, et, tz = (list(entry) + [''])[:3]
+        return user_id, game, day, st, et, tz or ''
+
+    def put_entry(self, user_id: str, game: str, day: int, entry: list):
+        self._write(self._UPSERT, self._row(user_id, game, day, entry))
+
+    def put_entries(self, user_id: str, game: str, entries: Dict[int, list]):
+        """Upsert several days of one user/game in a single statement batch."""
+        self._write(self._UPSERT, [self._row(user_id, game, int(d), e) for d, e in entries.items()], many=True)
+
+    def delete_entries(self, user_id: str, game: Optional[str] = None, days: Optional[Iterable[int]] = None):
+        if game is None:
+            self._write("DELETE FROM availability WHERE user_id = ?", (user_id,))
+        elif days is None:
+            self._write("DELETE FROM availability WHERE user_id = ? AND game = ?", (user_id, game))
+        else:
+            self._write("DELETE FROM availability WHERE user_id = ? AND game = ? AND day = ?",
+                        [(user_id, game, int(d)) for d in days], many=True)
+
+    def put_tz(self, user_id: str, tz: str):
+        self._write("INSERT INTO user_tzs (user_id, tz) VALUES (?, ?) "
+                    "ON CONFLICT (user_id) DO UPDATE SET tz = excluded.tz", (user_id, tz))
+
+    def replace_availability(self, avail):
+        """``avail`` is the live model, or on-disk shaped JSON (the importer)."""
+        with self.lock:
+            rows = [(uid, game, day, st, et, tz) for uid, game, day, (st, et, tz) in iter_entries(avail)]
+        with self._pending_lock:
+            self._pending.append(("DELETE FROM availability", (), False))
+            self._pending.append(("INSERT OR REPLACE INTO availability (user_id, game, day, start_time, end_time, tz) "
+                                  "VALUES (?, ?, ?, ?, ?, ?)", rows, True))
+        self._commit()
+
+    def replace_tzs(self, tzs: dict):
+        rows = [(str(uid), str(tz)) for uid, tz in tzs.items()]
+        with self._pending_lock:
+            self._pending.append(("DELETE FROM user_tzs", (), False))
+            self._pending.append(("INSERT INTO user_tzs (user_id, tz) VALUES (?, ?)", rows, True))
+        self._commit()
+
+    def user_count(self) -> int:
+        return self._query("SELECT COUNT(DISTINCT user_id) FROM availability")[0][0]
+
+    def set_meta(self, key: str, value: str):
+        self._write("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def record_poll(self, game: str, msg_id: int):
+        self.set_meta(f"poll:{game}", str(msg_id))
+
+    def record_processed(self, msg_id: int):
+        self._write("INSERT OR IGNORE INTO processed_messages (message_id) VALUES (?)", (msg_id,))
+        self._processed_since_trim += 1
+        if self._processed_since_trim >= self.processed_limit:
+            self._trim_processed()
+
+    def _trim_processed(self):
+        # Snowflake IDs grow over time, so the newest N are the largest N
+        self._processed_since_trim = 0
+        self._write("DELETE FROM processed_messages WHERE message_id NOT IN "
+                    "(SELECT message_id FROM processed_messages ORDER BY message_id DESC LIMIT ?)",
+                    (self.processed_limit,))
+
+    def load_runtime(self) -> Tuple[Dict[str, int], List[int]]:
+        """Poll message IDs per game and recently processed message IDs."""
+        polls = {key.split(':', 1)[1]: int(value) for key, value in self._query(
+            "SELECT key, value FROM meta WHERE key LIKE 'poll:%'")}
+        processed = [row[0] for row in self._query(
+            "SELECT message_id FROM processed_messages ORDER BY message_id DESC LIMIT ?",
+            (self.processed_limit,))]
+        processed.reverse()
+        return polls, processed
+
+    def snapshot_files(self, work_dir: str) -> Dict[str, str]:
+        """Online copy of the database into ``work_dir`` for a backup."""
+        name = os.path.basename(self.db_path)
+        dest = os.path.join(work_dir, name)
+        with self._db_lock:
+            self._drain()
+            target = sqlite3.connect(dest)
+            try:
+                self.conn.backup(target)
+            finally:
+                target.close()
+        return {name: dest}
+
+    def restore_files(self, files: Dict[str, str]) -> Tuple[AvailabilityModel, dict]:
+        """Copy a backup database over the live one and reload; open polls and handled reply IDs are kept."""
+        src_path = files[os.path.basename(self.db_path)]
+        with self._db_lock:
+            polls, processed = self.load_runtime()
+            source = sqlite3.connect(src_path)
+            try:
+                source.backup(self.conn)
+            finally:
+                source.close()
+            with self._pending_lock:
+                self._pending.append(("DELETE FROM processed_messages", (), False))
+                self._pending.append(("INSERT INTO processed_messages (message_id) VALUES (?)",
+                                      [(m,) for m in processed], True))
+                self._pending.append(("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                      [(f"poll:{game}", str(msg_id)) for game, msg_id in polls.items()], True))
+            return self.load()
+
+    def flush(self):
+        self._commit()
+
+    def close(self):
+        if self._flusher is not None:
+            self._flusher.close()
+        with self._db_lock:
+            self._drain()
+            self.conn.close()
+
+
+def open_backend(kind: str, avail_file: str, tz_file: str, db_path: str,
+                 max_delay: float = 2.0, durability: str = 'batch',
+                 compact_every: int = 5000, processed_limit: int = 2000):
+    if kind == 'json':
+        return JsonBackend(avail_file, tz_file, max_delay, durability, compact_every, processed_limit)
+    if kind == 'sqlite':
+        return SqliteBackend(db_path, max_delay, durability, processed_limit)
+    raise ValueError(f"Unknown storage backend {kind!r}; use 'json' or 'sqlite'")
+
+
+def import_json_to_sqlite(backend: SqliteBackend, avail_file: str, tz_file: str,
+                          games: Iterable[str], default_game: str) -> Tuple[int, int]:
+    """One-shot import of availability.json / user_tzs.json. Returns (entries, timezones)."""
+    avail = load_json(avail_file)
+    avail = migrate_multigame(avail, games, default_game) or avail
+    tzs = load_json(tz_file)
+    backend.replace_availability(avail)
+    backend.replace_tzs(tzs)
+    backend.set_meta('imported_from', f"{avail_file},{tz_file}@{datetime.utcnow().isoformat()}")
+    backend.flush()
+    return sum(1 for _ in iter_entries(avail)), len(tzs)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import PixelB0T JSON data into SQLite")
+    parser.add_argument('--json', default='availability.json')
+    parser.add_argument('--tz', default='user_tzs.json')
+    parser.add_argument('--db', default='availability.db')
+    parser.add_argument('--games', default='BF6,ARC', help="comma-separated game keys")
+    parser.add_argument('--default-game', default='BF6')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    db = SqliteBackend(args.db, durability='always')
+    entries, tz_count = import_json_to_sqlite(db, args.json, args.tz, args.games.split(','), args.default_game)
+    db.close()
+    logger.info(f"Imported {entries} entries and {tz_count} timezones into {args.db}")
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# =========================================================
+# TZ Convert — shortcuts, cached lookups, week conversion
+# =========================================================
+# Offsets are resolved once per (tz, date) of the poll week,
+# then whole batches of entries convert with integer math.
+# =========================================================
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pytz
+
+MINUTES_PER_DAY = 1440
+
+# (day, start_minute, end_minute, tz_name) in the entry's own timezone
+Row = Tuple[int, int, int, str]
+# (start_day, start_minute, end_day, end_minute) in the target timezone; days may be -1..7
+Span = Tuple[int, int, int, int]
+
+
+# -----------------------
+# GLOBAL TIMEZONE SHORTCUTS (100+)
+# -----------------------
+TZ_SHORTCUTS = {
+    'PH': 'Asia/Manila', 'PHK': 'Asia/Manila', 'PHT': 'Asia/Manila',
+    'JP': 'Asia/Tokyo', 'JST': 'Asia/Tokyo',
+    'KR': 'Asia/Seoul', 'KST': 'Asia/Seoul',
+    'CN': 'Asia/Shanghai', 'CST': 'Asia/Shanghai',
+    'HK': 'Asia/Hong_Kong', 'HKT': 'Asia/Hong_Kong',
+    'SG': 'Asia/Singapore', 'SGT': 'Asia/Singapore',
+    'MY': 'Asia/Kuala_Lumpur', 'MYT': 'Asia/Kuala_Lumpur',
+    'ID': 'Asia/Jakarta', 'WIB': 'Asia/Jakarta',
+    'TH': 'Asia/Bangkok', 'ICT': 'Asia/Bangkok',
+    'VN': 'Asia/Ho_Chi_Minh',
+    'IN': 'Asia/Kolkata', 'IST': 'Asia/Kolkata',
+    'PK': 'Asia/Karachi', 'PKT': 'Asia/Karachi',
+    'BD': 'Asia/Dhaka', 'BDT': 'Asia/Dhaka',
+    'LK': 'Asia/Colombo',
+    'NP': 'Asia/Kathmandu',
+    'AF': 'Asia/Kabul',
+    'AE': 'Asia/Dubai', 'GST': 'Asia/Dubai',
+    'IR': 'Asia/Tehran', 'IRST': 'Asia/Tehran',
+    'RU': 'Europe/Moscow', 'MSK': 'Europe/Moscow',
+    'KZ': 'Asia/Almaty',
+    'GB': 'Europe/London', 'GMT': 'Europe/London', 'BST': 'Europe/London',
+    'FR': 'Europe/Paris', 'CET': 'Europe/Paris', 'CEST': 'Europe/Paris',
+    'DE': 'Europe/Berlin',
+    'IT': 'Europe/Rome',
+    'ES': 'Europe/Madrid',
+    'NL': 'Europe/Amsterdam',
+    'SE': 'Europe/Stockholm',
+    'NO': 'Europe/Oslo',
+    'DK': 'Europe/Copenhagen',
+    'FI': 'Europe/Helsinki',
+    'PL': 'Europe/Warsaw',
+    'GR': 'Europe/Athens', 'EET': 'Europe/Athens',
+    'TR': 'Europe/Istanbul',
+    'UA': 'Europe/Kiev',
+    'RO': 'Europe/Bucharest',
+    'US': 'America/New_York', 'EST': 'America/New_York', 'EDT': 'America/New_York',
+    'US/PACIFIC': 'America/Los_Angeles', 'PST': 'America/Los_Angeles', 'PDT': 'America/Los_Angeles',
+    'US/CENTRAL': 'America/Chicago', 'CDT': 'America/Chicago',
+    'US/MOUNTAIN': 'America/Denver', 'MST': 'America/Denver', 'MDT': 'America/Denver',
+    'CA': 'America/Toronto',
+    'MX': 'America/Mexico_City',
+    'BR': 'America/Sao_Paulo', 'BRT': 'America/Sao_Paulo',
+    'AR': 'America/Argentina/Buenos_Aires',
+    'CL': 'America/Santiago',
+    'CO': 'America/Bogota',
+    'PE': 'America/Lima',
+    'VE': 'America/Caracas',
+    'AU': 'Australia/Sydney', 'AEST': 'Australia/Sydney', 'AEDT': 'Australia/Sydney',
+    'NZ': 'Pacific/Auckland', 'NZST': 'Pacific/Auckland',
+    'FJ': 'Pacific/Fiji',
+    'ZA': 'Africa/Johannesburg', 'SAST': 'Africa/Johannesburg',
+    'EG': 'Africa/Cairo',
+    'NG': 'Africa/Lagos', 'WAT': 'Africa/Lagos',
+    'MA': 'Africa/Casablanca',
+    'KE': 'Africa/Nairobi', 'EAT': 'Africa/Nairobi',
+    'UTC': 'UTC', 'ZULU': 'UTC', 'GMT+0': 'UTC', 'GMT-0': 'UTC',
+}
+
+
+@lru_cache(maxsize=None)
+def get_tz(name: str):
+    """pytz lookup, cached. Raises pytz.UnknownTimeZoneError like pytz.timezone."""
+    return pytz.timezone(name)
+
+
+@lru_cache(maxsize=4096)
+def is_valid_tz(name: str) -> bool:
+    try:
+        get_tz(name)
+        return True
+    except Exception:
+        return False
+
+
+def validate_timezone(tz_input: str) -> Optional[str]:
+    key = tz_input.strip().upper()
+    if key in TZ_SHORTCUTS:
+        return TZ_SHORTCUTS[key]
+    return tz_input.strip() if is_valid_tz(tz_input.strip()) else None
+
+
+def hhmm_to_minutes(ts: str) -> int:
+    h, m = ts.split(':')
+    return int(h) * 60 + int(m)
+
+
+class WeekConverter:
+    """
+    Converts weekday/minute entries between timezones for one concrete week.
+
+    UTC offsets are computed once per (tz, day) and memoized. A day that
+    contains a DST transition falls back to an exact per-minute localize, so
+    conversions stay correct across transition weeks.
+    """
+
+    def __init__(self, monday: date):
+        self.monday = monday
+        # (tz, day) -> offset minutes, or None when the day has a transition
+        self._day_offsets: Dict[Tuple[str, int], Optional[int]] = {}
+        self._exact: Dict[Tuple[str, int, int], int] = {}
+        self.lookups = 0
+
+    def _localize_offset(self, tz_name: str, day: int, minute: int) -> int:
+        tz = get_tz(tz_name)
+        naive = datetime.combine(self.monday + timedelta(days=day), datetime.min.time()) + timedelta(minutes=minute)
+        return int(tz.localize(naive).utcoffset().total_seconds() // 60)
+
+    def day_offset(self, tz_name: str, day: int) -> Optional[int]:
+        """Whole-day offset for (tz, day), or None when the day contains a DST transition."""
+        self.offset(tz_name, day)
+        return self._day_offsets[(tz_name, day)]
+
+    def offset(self, tz_name: str, day: int, minute: int = 720) -> int:
+        """Minutes east of UTC for local wall time ``minute`` on ``day`` (0 = Monday)."""
+        key = (tz_name, day)
+        if key not in self._day_offsets:
+            self.lookups += 1
+            first = self._localize_offset(tz_name, day, 0)
+            last = self._localize_offset(tz_name, day, MINUTES_PER_DAY - 1)
+            self._day_offsets[key] = first if first == last else None
+        off = self._day_offsets[key]
+        if off is not None:
+            return off
+        exact_key = (tz_name, day, minute)
+        if exact_key not in self._exact:
+            self._exact[exact_key] = self._localize_offset(tz_name, day, minute)
+        return self._exact[exact_key]
+
+    def to_utc(self, day: int, minute: int, tz_name: str) -> int:
+        """Minutes since this week's Monday 00:00 UTC (may be negative)."""
+        day += minute // MINUTES_PER_DAY
+        minute %= MINUTES_PER_DAY
+        return day * MINUTES_PER_DAY + minute - self.offset(tz_name, day, minute)
+
+    def from_utc(self, utc_minute: int, tz_name: str) -> Tuple[int, int]:
+        """(day, minute) wall time in ``tz_name`` for a minute since Monday 00:00 UTC."""
+        # The offset depends on the local day, which depends on the offset: settle in two steps
+        guess = utc_minute + self.offset(tz_name, utc_minute // MINUTES_PER_DAY)
+        local = utc_minute + self.offset(tz_name, guess // MINUTES_PER_DAY, guess % MINUTES_PER_DAY)
+        return local // MINUTES_PER_DAY, local % MINUTES_PER_DAY
+
+    def span_to_utc(self, day: int, start: int, end: int, tz_name: str) -> Tuple[int, int]:
+        """UTC [start, end) minutes since Monday for a local span; end <= start means it runs past midnight."""
+        if end <= start:
+            end += MINUTES_PER_DAY
+        return self.to_utc(day, start, tz_name), self.to_utc(day, end, tz_name)
+
+    def convert_batch(self, rows: Iterable[Row], to_tz: str) -> List[Optional[Span]]:
+        """Convert many rows to ``to_tz``. Rows with an unknown timezone yield None."""
+        out: List[Optional[Span]] = []
+        for day, start, end, from_tz in rows:
+            try:
+                us, ue = self.span_to_utc(day, start, end, from_tz)
+                sd, sm = self.from_utc(us, to_tz)
+                ed, em = self.from_utc(ue, to_tz)
+            except Exception:
+                out.append(None)
+                continue
+            out.append((sd, sm, ed, em))
+        return out
+
+
+@lru_cache(maxsize=4)
+def week_converter(monday: date) -> WeekConverter:
+    return WeekConverter(monday)